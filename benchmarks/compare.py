@@ -0,0 +1,53 @@
+# compare.py
+# Compare two run_benchmarks.py result files and flag regressions
+#
+# Usage:
+#   python benchmarks/compare.py baseline.json candidate.json [--threshold 0.10]
+#
+# Exits with status 1 when any benchmark's median wall time grew by more
+# than the threshold, so it can gate a CI job.
+import argparse
+import json
+import sys
+
+
+def _index(report):
+    return {(r["scale"], r["benchmark"], r["engine"]): r for r in report["results"]}
+
+
+def compare(baseline, candidate, threshold=0.10):
+    """Rows of (key, baseline median s, candidate median s, ratio, regressed)"""
+    old, new = _index(baseline), _index(candidate)
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        before = old[key]["wall_s"]["median"]
+        after = new[key]["wall_s"]["median"]
+        ratio = after / before if before else float("inf")
+        rows.append((key, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed median slowdown before flagging (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.candidate) as handle:
+        candidate = json.load(handle)
+
+    print(f"baseline  {baseline['meta'].get('commit')}  candidate  {candidate['meta'].get('commit')}")
+    rows = compare(baseline, candidate, args.threshold)
+    for (scale, benchmark, engine), before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{scale:>10,} {benchmark:<26} {engine:<9} {before * 1000:10.2f} ms -> "
+              f"{after * 1000:10.2f} ms  x{ratio:5.2f}{flag}")
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
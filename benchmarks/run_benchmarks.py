@@ -0,0 +1,247 @@
+# run_benchmarks.py
+# Times eval_agent, calculate_overlap_matrix, predict_agent, optimize_agent and
+# run() on synthetic rosters and saves the results as JSON
+#
+# Usage:
+#   python benchmarks/run_benchmarks.py                          # 1k, 100k, 1m
+#   python benchmarks/run_benchmarks.py --scales 1k,10m --repeat 5 --output before.json
+#   python benchmarks/run_benchmarks.py --import-only        # cold-start budget check only
+#   python benchmarks/compare.py before.json after.json
+#
+# Scales up to --max-records also get the per-creator (python engine) paths
+# and a dict roster; larger scales are scored columnar-only from a store
+# generated straight into NumPy columns.
+#
+# Cold start is checked too: each module in IMPORT_BUDGETS is imported in a
+# fresh interpreter under `python -X importtime`; the run fails (exit 1) when
+# one takes longer than its budget or eagerly imports a module listed in
+# LAZY_MODULES. `--import-only` runs just that check.
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from synthetic_roster import generate_records, generate_store
+
+import instrumentation  # noqa: E402  (src/ is on sys.path via synthetic_roster)
+import marketmuse_sim  # noqa: E402
+from creator_registry import CreatorRegistry  # noqa: E402
+from overlap_engine import overlap_matrix  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(REPO_DIR, "src")
+QUERY = ("Identify the optimal influencers and predict campaign outcomes for launching "
+         "a new sustainable skincare brand targeting Gen Z audiences")
+
+
+def parse_scale(text):
+    """'1k' / '100k' / '1m' / '10m' / '2500' -> row count"""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def measure(fn, repeat):
+    """Time ``fn`` ``repeat`` times, then once more under tracemalloc for peak allocation"""
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "wall_s": {"min": min(runs), "median": statistics.median(runs), "runs": runs},
+        "peak_alloc_mb": round(peak / 2**20, 2),
+    }
+
+
+# Cumulative import time allowed per module (ms, best of --repeat cold imports)
+IMPORT_BUDGETS = {"marketmuse_sim": 60, "marketmuse_worker": 90}
+
+# Heavy or optional modules that must only load on first use, never on import
+LAZY_MODULES = (
+    "numpy", "sqlite3", "cProfile", "pstats", "tracemalloc", "csv", "gzip",
+    "agent_prompts", "query_parser", "roster_loader", "creator_store", "overlap_engine", "forecast_sim",
+    "sensitivity_sweep", "campaign_simulator", "parallel_scoring", "similarity_index", "batch_runner",
+)
+
+
+def import_profile(module):
+    """(cumulative import time in ms, names of every module imported) for one cold import"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=SRC_DIR, env=dict(os.environ, PYTHONPATH=SRC_DIR),
+                               capture_output=True, text=True, check=True)
+    total_us, imported = None, set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # column header
+        imported.add(name.strip())
+        if name.strip() == module and not name.startswith("  "):
+            total_us = int(cumulative)
+    return total_us / 1000, imported
+
+
+def bench_imports(args, results):
+    """Time cold imports against IMPORT_BUDGETS; returns a list of failure messages"""
+    failures = []
+    for module, budget_ms in IMPORT_BUDGETS.items():
+        import_profile(module)  # first run may compile .pyc files
+        runs, imported = [], set()
+        for _ in range(args.repeat):
+            elapsed_ms, imported = import_profile(module)
+            runs.append(elapsed_ms / 1000)
+        eager = sorted(name for name in LAZY_MODULES if name in imported)
+        best_ms = min(runs) * 1000
+        results.append({
+            "scale": 0, "benchmark": f"import {module}", "engine": "-", "items": None,
+            "wall_s": {"min": min(runs), "median": statistics.median(runs), "runs": runs},
+            "modules_imported": len(imported), "budget_ms": budget_ms, "eager_imports": eager,
+        })
+        print(f"  import {module:<20} best {best_ms:8.2f} ms  budget {budget_ms} ms  "
+              f"{len(imported)} modules", file=sys.stderr)
+        if best_ms > budget_ms:
+            failures.append(f"import {module} took {best_ms:.1f} ms (budget {budget_ms} ms)")
+        if eager:
+            failures.append(f"import {module} eagerly loads {', '.join(eager)}")
+    return failures
+
+
+def bench_scale(n, args, results):
+    plan = marketmuse_sim.decompose(QUERY)
+    task = plan["evaluate"]
+    with_records = n <= args.max_records
+
+    def record(name, engine, items, fn):
+        entry = {"scale": n, "benchmark": name, "engine": engine, "items": items}
+        entry.update(measure(fn, args.repeat))
+        entry["throughput_per_s"] = round(items / entry["wall_s"]["median"], 1) if items else None
+        entry["peak_rss_mb"] = peak_rss_mb()
+        results.append(entry)
+        print(f"  {name:<26} {engine:<9} median {entry['wall_s']['median'] * 1000:10.2f} ms  "
+              f"peak alloc {entry['peak_alloc_mb']:9.2f} MB", file=sys.stderr)
+
+    started = time.perf_counter()
+    if with_records:
+        records = generate_records(n, seed=args.seed)
+        marketmuse_sim.use_roster(records)
+        store = marketmuse_sim.get_creator_store()
+    else:
+        marketmuse_sim.use_roster([])
+        store = marketmuse_sim.use_creator_store(generate_store(n, seed=args.seed))
+    generation = {"scale": n, "records": with_records, "generate_s": round(time.perf_counter() - started, 3),
+                  "peak_rss_mb": peak_rss_mb()}
+
+    engines = ["python", "columnar", "parallel"] if with_records else ["columnar", "parallel"]
+    for engine in engines:
+        record("eval_agent", engine, n, lambda: marketmuse_sim.eval_agent(task, engine=engine))
+
+    eval_out = marketmuse_sim.eval_agent(task, engine="columnar")
+    top_ids = [c["candidate_id"] for c in eval_out["top"]]
+    if not with_records:
+        # predict/optimize only look up the shortlisted creators
+        marketmuse_sim.REGISTRY = CreatorRegistry(store.record(row) for row in store.rows_for(top_ids))
+
+    for engine in engines:
+        record("calculate_overlap_matrix", engine, len(top_ids),
+               lambda: marketmuse_sim.calculate_overlap_matrix(top_ids, engine=engine))
+    rows = np.arange(min(n, args.overlap_size))
+    record("overlap_matrix_block", "columnar", len(rows) * (len(rows) - 1) // 2,
+           lambda: overlap_matrix(store, rows))
+
+    pred_out = marketmuse_sim.predict_agent(plan["predict"], eval_out)
+    record("predict_agent", "-", len(top_ids), lambda: marketmuse_sim.predict_agent(plan["predict"], eval_out))
+    record("optimize_agent", "-", len(top_ids),
+           lambda: marketmuse_sim.optimize_agent(plan["optimize"], eval_out, pred_out))
+    for engine in engines:
+        record("run", engine, n, lambda: marketmuse_sim.run(QUERY, engine=engine, verbose=False))
+    return generation
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MarketMuse scoring / overlap / forecast benchmarks")
+    parser.add_argument("--scales", default="1k,100k,1m", help="Comma-separated roster sizes (e.g. 1k,100k,1m,10m)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic roster seed")
+    parser.add_argument("--max-records", type=parse_scale, default=parse_scale("200k"),
+                        help="Largest scale that also builds a dict roster and runs the python engine")
+    parser.add_argument("--overlap-size", type=int, default=500,
+                        help="Creators in the all-pairs overlap block benchmark")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--import-only", action="store_true",
+                        help="Only run the cold-start import check (exit 1 on a budget or laziness failure)")
+    args = parser.parse_args(argv)
+
+    # Timings are what is measured here; keep per-request instrumentation out of it
+    instrumentation.configure(enabled=False)
+    info = git_info()
+    results, generation = [], []
+    print("cold imports", file=sys.stderr)
+    failures = bench_imports(args, results)
+    scales = [] if args.import_only else list(map(parse_scale, args.scales.split(",")))
+    for n in scales:
+        print(f"scale {n:,}", file=sys.stderr)
+        generation.append(bench_scale(n, args, results))
+
+    report = {
+        "meta": {
+            **info,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "argv": sys.argv[1:] if argv is None else list(argv),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "generation": generation,
+        "results": results,
+    }
+    output = args.output or os.path.join(BENCH_DIR, "results", f"{(info['commit'] or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"wrote {output}", file=sys.stderr)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# synthetic_roster.py
+# Synthetic INFLUENCERS-shaped rosters for benchmarks (1k .. 10M creators)
+#
+# Rows are generated column-wise in NumPy chunks, each chunk from its own
+# seeded generator, so generate_records() and generate_store() produce the
+# same creators for the same seed and chunk size. generate_store() builds the
+# CreatorStore directly from the columns and never materializes dicts, which
+# is what makes the 1M/10M scales fit in memory.
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from creator_schema import AGE_BUCKETS, FRAUD_FIELDS, GEO_REGIONS, HISTORY_FIELDS  # noqa: E402
+from creator_store import CreatorStore, TopicVocabulary, _topic_bitmask  # noqa: E402
+
+# Topics the scoring rules look at, followed by generic long-tail niches
+CORE_TOPICS = [
+    "skincare", "beauty", "sustainable", "dermatology", "eco", "cruelty-free", "clean-beauty",
+    "zero-waste", "eco-friendly", "dermatologist-tested", "lifestyle", "wellness", "vegan",
+    "science", "natural-skincare", "organic-beauty", "makeup", "haircare", "fashion", "fitness",
+]
+
+# Dirichlet concentration over AGE_BUCKETS per audience profile
+AUDIENCE_PROFILES = {
+    "genz": (2.0, 5.0, 2.0, 0.6),
+    "millennial": (0.6, 2.5, 4.0, 1.5),
+    "broad": (1.2, 3.0, 3.0, 2.0),
+}
+
+DEFAULT_CONFIG = {
+    "niche_topics": 60,          # long-tail topics added after CORE_TOPICS
+    "topic_zipf": 1.1,           # topic popularity ~ 1 / rank ** topic_zipf
+    "topics_mean": 3.0,          # mean topics per creator (1..8)
+    "audience_mix": {"genz": 0.4, "millennial": 0.4, "broad": 0.2},
+    "geo_alpha": (4.0, 1.2, 1.8, 1.0, 1.0),
+    "followers_median": 60_000,
+    "followers_sigma": 1.2,      # lognormal spread of follower counts
+    "safety_mix": {"clean": 0.8, "minor-flags": 0.15, "flagged": 0.05},
+    "platform_mix": {"instagram": 0.6, "tiktok": 0.3, "youtube": 0.1},
+    "fraud_share": 0.05,         # share of creators with inflated fraud indicators
+}
+
+MAX_TOPICS = 8
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def roster_config(**overrides):
+    """DEFAULT_CONFIG with ``overrides`` applied (unknown keys are rejected)"""
+    unknown = set(overrides) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown roster settings: {sorted(unknown)}")
+    return dict(DEFAULT_CONFIG, **overrides)
+
+
+def topic_vocabulary(config):
+    return CORE_TOPICS + [f"niche-{i}" for i in range(config["niche_topics"])]
+
+
+def _mix(rng, mix, n):
+    labels = list(mix)
+    weights = np.array([mix[label] for label in labels], dtype=np.float64)
+    return labels, rng.choice(len(labels), size=n, p=weights / weights.sum())
+
+
+def generate_chunk(n, seed, start_id, config):
+    """Columns for ``n`` creators with ids start_id.. (plain NumPy arrays)"""
+    rng = np.random.default_rng(seed)
+    vocab = topic_vocabulary(config)
+
+    followers = np.clip(
+        rng.lognormal(np.log(config["followers_median"]), config["followers_sigma"], n), 1_000, 20_000_000
+    ).astype(np.int64)
+    # Bigger accounts engage less
+    er = np.exp(np.log(0.045) - 0.15 * np.log10(followers / 10_000) + rng.normal(0, 0.35, n))
+    er = np.round(np.clip(er, 0.002, 0.25), 4)
+
+    profiles, profile_of = _mix(rng, config["audience_mix"], n)
+    aud = np.empty((n, len(AGE_BUCKETS)))
+    for code, profile in enumerate(profiles):
+        rows = np.flatnonzero(profile_of == code)
+        aud[rows] = rng.dirichlet(AUDIENCE_PROFILES[profile], len(rows))
+    aud = np.round(aud, 3)
+    geo = np.round(rng.dirichlet(config["geo_alpha"], n), 3)
+
+    reel = np.round(np.clip(er * 2.6 + rng.normal(0, 0.02, n), 0.01, 0.3), 3)
+    history = np.column_stack([
+        reel,
+        np.round(reel * rng.uniform(0.3, 0.5, n), 3),
+        np.round(reel * rng.uniform(0.6, 0.8, n), 3),
+        np.round(followers * rng.uniform(0.08, 0.25, n)),
+    ])
+
+    fraud = rng.beta(1.2, 30, (n, len(FRAUD_FIELDS)))
+    suspicious = rng.random(n) < config["fraud_share"]
+    fraud[suspicious] = rng.beta(2, 8, (int(suspicious.sum()), len(FRAUD_FIELDS)))
+    fraud = np.round(fraud, 3)
+
+    safety_labels, safety = _mix(rng, config["safety_mix"], n)
+    platform_labels, platform = _mix(rng, config["platform_mix"], n)
+
+    # Weighted topic sampling without replacement via the Gumbel top-k trick
+    counts = np.clip(1 + rng.poisson(config["topics_mean"] - 1, n), 1, min(MAX_TOPICS, len(vocab)))
+    log_weights = -config["topic_zipf"] * np.log(np.arange(1, len(vocab) + 1))
+    keys = log_weights + rng.gumbel(size=(n, len(vocab)))
+    top = np.argpartition(-keys, MAX_TOPICS - 1, axis=1)[:, :MAX_TOPICS]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+    keep = np.arange(MAX_TOPICS) < counts[:, None]
+    topic_ids = top[keep].astype(np.int32)
+    topic_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=topic_ptr[1:])
+
+    return {
+        "id": np.arange(start_id, start_id + n, dtype=np.int64),
+        "followers": followers, "er": er, "aud": aud, "geo": geo, "history": history, "fraud": fraud,
+        "safety": safety.astype(np.int16), "safety_labels": safety_labels,
+        "platform": platform.astype(np.int16), "platform_labels": platform_labels,
+        "topic_ptr": topic_ptr, "topic_ids": topic_ids, "vocab": vocab,
+    }
+
+
+def _chunks(n, seed, chunk_size, config):
+    for index, start in enumerate(range(0, n, chunk_size)):
+        yield generate_chunk(min(chunk_size, n - start), [seed, index], start + 1, config)
+
+
+def chunk_records(chunk):
+    """INFLUENCERS-shaped dicts for one generated chunk"""
+    vocab = chunk["vocab"]
+    ptr = chunk["topic_ptr"]
+    topic_ids = chunk["topic_ids"].tolist()
+    columns = {key: chunk[key].tolist() for key in ("id", "followers", "er", "aud", "geo", "history", "fraud")}
+    safety = chunk["safety"].tolist()
+    platform = chunk["platform"].tolist()
+    for row, creator_id in enumerate(columns["id"]):
+        yield {
+            "id": creator_id,
+            "name": f"creator{creator_id}",
+            "handle": f"@creator{creator_id}",
+            "platform": chunk["platform_labels"][platform[row]],
+            "followers": columns["followers"][row],
+            "er": columns["er"][row],
+            "topics": [vocab[t] for t in topic_ids[ptr[row]:ptr[row + 1]]],
+            "aud": dict(zip(AGE_BUCKETS, columns["aud"][row])),
+            "geo": dict(zip(GEO_REGIONS, columns["geo"][row])),
+            "safety": chunk["safety_labels"][safety[row]],
+            "history": dict(zip(HISTORY_FIELDS, columns["history"][row])),
+            "fraud_indicators": dict(zip(FRAUD_FIELDS, columns["fraud"][row])),
+        }
+
+
+def iter_records(n, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **config):
+    """Yield ``n`` synthetic creator records, one generated chunk at a time"""
+    config = roster_config(**config)
+    for chunk in _chunks(n, seed, chunk_size, config):
+        yield from chunk_records(chunk)
+
+
+def generate_records(n, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **config):
+    return list(iter_records(n, seed, chunk_size, **config))
+
+
+class GeneratedNames:
+    """Lazy "<prefix><id>" strings, so 10M-row stores don't hold 20M str objects"""
+
+    def __init__(self, ids, prefix):
+        self.ids = ids
+        self.prefix = prefix
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        return f"{self.prefix}{self.ids[row]}"
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+
+def generate_store(n, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, **config):
+    """CreatorStore for the same creators generate_records() would return"""
+    config = roster_config(**config)
+    vocab = TopicVocabulary(topic_vocabulary(config))
+    safety_labels = list(config["safety_mix"])
+    platform_labels = list(config["platform_mix"])
+    parts = {key: [] for key in ("id", "followers", "er", "aud", "geo", "history", "fraud",
+                                 "safety", "platform", "topic_counts", "topic_ids")}
+    for chunk in _chunks(n, seed, chunk_size, config):
+        for key in ("id", "followers", "er", "aud", "geo", "history", "fraud", "topic_ids"):
+            parts[key].append(chunk[key])
+        # Chunks share label order with the config, so codes line up across chunks
+        parts["safety"].append(chunk["safety"])
+        parts["platform"].append(chunk["platform"])
+        parts["topic_counts"].append(np.diff(chunk["topic_ptr"]))
+
+    columns = {key: np.concatenate(values) for key, values in parts.items()}
+    topic_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(columns.pop("topic_counts"), out=topic_ptr[1:])
+    columns["topic_ptr"] = topic_ptr
+    columns["topic_bits"] = _topic_bitmask(topic_ptr, columns["topic_ids"], vocab.words)
+    return CreatorStore(
+        columns, GeneratedNames(columns["id"], "creator"), GeneratedNames(columns["id"], "@creator"),
+        vocab, safety_labels, platform_labels,
+    )
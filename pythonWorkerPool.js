@@ -0,0 +1,171 @@
+// Pool of resident Python analysis workers (src/marketmuse_worker.py).
+// Each worker speaks length-prefixed JSON over stdin/stdout, so requests reuse
+// a warm interpreter instead of spawning Python per call.
+//
+// A worker that exits (or whose stdin breaks) fails its pending requests and
+// is replaced after an exponential backoff, so one that crashes on startup
+// does not turn into a fork loop. A request that gets no reply within
+// requestTimeoutMs fails, and its worker is killed and replaced.
+import { spawn } from "child_process";
+
+export class PythonWorkerPool {
+  constructor({
+    pythonExecutable,
+    workerScript,
+    size = 2,
+    engine = "python",
+    requestTimeoutMs = 120_000,
+    respawnDelayMs = 250,
+    maxRespawnDelayMs = 30_000,
+  }) {
+    this.pythonExecutable = pythonExecutable;
+    this.workerScript = workerScript;
+    this.engine = engine;
+    this.requestTimeoutMs = requestTimeoutMs;
+    this.respawnDelayMs = respawnDelayMs;
+    this.maxRespawnDelayMs = maxRespawnDelayMs;
+    this.nextId = 1;
+    this.workers = [];
+    for (let i = 0; i < size; i++) {
+      this.workers.push(this.startWorker(0));
+    }
+  }
+
+  // ``failures`` counts the crashes in a row that led to this start
+  startWorker(failures) {
+    const proc = spawn(this.pythonExecutable, [
+      this.workerScript,
+      "--engine",
+      this.engine,
+    ]);
+    const worker = {
+      proc,
+      buffer: Buffer.alloc(0),
+      pending: new Map(),
+      alive: true,
+      failures,
+      startedAt: Date.now(),
+    };
+
+    proc.stdout.on("data", (data) => {
+      worker.buffer = Buffer.concat([worker.buffer, data]);
+      // Drain every complete frame: 4-byte big-endian length + JSON body
+      while (worker.buffer.length >= 4) {
+        const length = worker.buffer.readUInt32BE(0);
+        if (worker.buffer.length < 4 + length) break;
+        const body = worker.buffer.subarray(4, 4 + length).toString("utf8");
+        worker.buffer = worker.buffer.subarray(4 + length);
+        this.settle(worker, JSON.parse(body));
+      }
+    });
+
+    // Progress output from run() goes to stderr; keep it for debugging
+    proc.stderr.on("data", (data) => {
+      process.stderr.write(data);
+    });
+
+    // Writes to a worker that just exited fail with EPIPE; without a
+    // listener that 'error' event would crash the server
+    proc.stdin.on("error", (error) => {
+      console.error(`Python worker ${proc.pid} stdin error:`, error.message);
+      this.retire(worker, new Error(`Python worker stdin error: ${error.message}`));
+    });
+
+    proc.on("exit", (code, signal) => {
+      console.error(`Python worker ${proc.pid} exited with code ${code}${signal ? ` (${signal})` : ""}`);
+      this.retire(worker, new Error("Python worker exited"));
+    });
+
+    proc.on("error", (error) => {
+      console.error("Python worker error:", error);
+      this.retire(worker, error);
+    });
+
+    return worker;
+  }
+
+  // Fail a worker's pending requests and schedule its replacement (once)
+  retire(worker, error) {
+    if (!worker.alive) return;
+    worker.alive = false;
+    for (const entry of worker.pending.values()) {
+      clearTimeout(entry.timer);
+      entry.reject(error);
+    }
+    worker.pending.clear();
+    if (worker.proc.exitCode === null && worker.proc.signalCode === null) {
+      worker.proc.kill("SIGKILL");
+    }
+    if (this.closed) return;
+
+    // A worker that stayed up for a while resets the backoff
+    const stable = Date.now() - worker.startedAt > this.maxRespawnDelayMs;
+    const failures = stable ? 0 : worker.failures + 1;
+    const delay = Math.min(this.maxRespawnDelayMs, this.respawnDelayMs * 2 ** (failures - 1));
+    worker.respawn = setTimeout(() => {
+      const index = this.workers.indexOf(worker);
+      if (index !== -1 && !this.closed) {
+        this.workers[index] = this.startWorker(failures);
+      }
+    }, stable ? 0 : delay);
+  }
+
+  settle(worker, reply) {
+    const entry = worker.pending.get(reply.id);
+    if (!entry) return;
+    // Streamed partial result; the final reply for this id follows later
+    if (reply.event !== undefined) {
+      if (entry.onEvent) entry.onEvent(reply.event);
+      return;
+    }
+    clearTimeout(entry.timer);
+    worker.pending.delete(reply.id);
+    if (reply.ok) {
+      entry.resolve(reply.result);
+    } else {
+      entry.reject(new Error(reply.error));
+    }
+  }
+
+  request(payload, onEvent) {
+    // Least-busy dispatch across the live workers
+    const live = this.workers.filter((w) => w.alive);
+    if (live.length === 0) {
+      return Promise.reject(new Error("No Python worker available (restarting)"));
+    }
+    const worker = live.reduce((best, w) =>
+      w.pending.size < best.pending.size ? w : best
+    );
+    const id = this.nextId++;
+    const body = Buffer.from(JSON.stringify({ id, ...payload }), "utf8");
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(body.length, 0);
+
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        // A hung worker would hold every later request too; replace it
+        this.retire(worker, new Error(`Python worker timed out after ${this.requestTimeoutMs} ms`));
+      }, this.requestTimeoutMs);
+      worker.pending.set(id, { resolve, reject, onEvent, timer });
+      worker.proc.stdin.write(Buffer.concat([header, body]));
+    });
+  }
+
+  analyze(query) {
+    return this.request({ op: "analyze", query });
+  }
+
+  // Calls onEvent with each partial result (plan, creators, overlap,
+  // forecast, recommendations, summary) as the agents finish
+  analyzeStream(query, onEvent) {
+    return this.request({ op: "analyze", query, stream: true }, onEvent);
+  }
+
+  close() {
+    this.closed = true;
+    for (const worker of this.workers) {
+      clearTimeout(worker.respawn);
+      worker.proc.stdin.end();
+    }
+  }
+}
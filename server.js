@@ -1,8 +1,8 @@
 import express from "express";
 import cors from "cors";
-import { spawn } from "child_process";
 import path from "path";
 import { fileURLToPath } from "url";
+import { PythonWorkerPool } from "./pythonWorkerPool.js";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -10,6 +10,13 @@ const __dirname = path.dirname(__filename);
 const app = express();
 const PORT = 3001;
 
+// Warm Python workers are started once and reused for every request
+const workerPool = new PythonWorkerPool({
+  pythonExecutable: path.join(__dirname, ".venv/bin/python"),
+  workerScript: path.join(__dirname, "src/marketmuse_worker.py"),
+  size: Number(process.env.MARKETMUSE_WORKERS || 2),
+});
+
 app.use(cors());
 app.use(express.json());
 
@@ -27,106 +34,21 @@ app.post("/api/analyze", async (req, res) => {
 
     console.log("Analyzing query:", query);
 
-    // Path to Python executable and script
-    const pythonExecutable = path.join(__dirname, ".venv/bin/python");
-    // const pythonScript = path.join(__dirname, "src/marketmuse_sim.py");
-
-    // Create a modified version of the script that accepts query as command line argument
-    const modifiedScript = `
-import sys
-import os
-sys.path.append('${path.join(__dirname, "src")}')
-
-# Set the query from command line argument
-query_arg = sys.argv[1] if len(sys.argv) > 1 else "Sustainable skincare for Gen Z"
-
-# Import and run the analysis
-from marketmuse_sim import run
-import json
-
-# Run the analysis with the query
-result = run(query_arg)
-
-# Output only the essential data for the UI
-output = {
-    "evaluation": result["evaluation"],
-    "prediction": result["prediction"], 
-    "optimization": result["optimization"],
-    "summary": result["summary"]
-}
-
-print("===JSON_START===")
-print(json.dumps(output, indent=2))
-print("===JSON_END===")
-`;
-
-    const pythonProcess = spawn(pythonExecutable, [
-      "-c",
-      modifiedScript,
-      query,
-    ]);
-
-    let stdout = "";
-    let stderr = "";
-
-    pythonProcess.stdout.on("data", (data) => {
-      stdout += data.toString();
-    });
-
-    pythonProcess.stderr.on("data", (data) => {
-      stderr += data.toString();
-    });
-
-    pythonProcess.on("close", (code) => {
-      if (code !== 0) {
-        console.error("Python script error:", stderr);
-        return res.status(500).json({
-          error: "Analysis failed",
-          details: stderr,
-        });
-      }
-
-      try {
-        // Extract JSON between markers
-        const jsonMatch = stdout.match(
-          /===JSON_START===\s*([\s\S]*?)\s*===JSON_END===/
-        );
-
-        if (!jsonMatch) {
-          console.error("No JSON markers found in output:", stdout);
-          return res.status(500).json({
-            error: "No valid JSON output found",
-            rawOutput: stdout.substring(0, 500),
-          });
-        }
-
-        const jsonString = jsonMatch[1].trim();
-        const result = JSON.parse(jsonString);
-
-        res.json({
-          success: true,
-          data: result,
-          query: query,
-          timestamp: new Date().toISOString(),
-        });
-      } catch (parseError) {
-        console.error("JSON parse error:", parseError);
-        console.error("Raw output:", stdout);
-        res.status(500).json({
-          error: "Failed to parse analysis results",
-          details: parseError.message,
-          rawOutput: stdout.substring(0, 500),
-        });
-      }
-    });
-
-    pythonProcess.on("error", (error) => {
-      console.error("Python process error:", error);
+    try {
+      const result = await workerPool.analyze(query);
+      res.json({
+        success: true,
+        data: result,
+        query: query,
+        timestamp: new Date().toISOString(),
+      });
+    } catch (analysisError) {
+      console.error("Python worker error:", analysisError);
       res.status(500).json({
-        error: "Failed to start Python analysis",
-        details: error.message,
+        error: "Analysis failed",
+        details: analysisError.message,
       });
-    });
+    }
   } catch (error) {
     console.error("Server error:", error);
     res.status(500).json({
@@ -136,6 +58,41 @@ print("===JSON_END===")
   }
 });
 
+// Server-sent events: one SSE message per finished agent, named after the
+// event ("plan", "creators", "overlap", "forecast", "recommendations",
+// "summary"), then "done" - or "error" if the analysis fails
+app.get("/api/analyze/stream", async (req, res) => {
+  const query = req.query.query;
+  if (!query) {
+    return res.status(400).json({ error: "Query is required" });
+  }
+
+  res.set({
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    Connection: "keep-alive",
+  });
+  res.flushHeaders();
+
+  let open = true;
+  req.on("close", () => {
+    open = false;
+  });
+  const send = (event, data) => {
+    if (open) res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+  };
+
+  console.log("Streaming analysis for query:", query);
+  try {
+    await workerPool.analyzeStream(query, (event) => send(event.event, event));
+    send("done", { query, timestamp: new Date().toISOString() });
+  } catch (analysisError) {
+    console.error("Python worker error:", analysisError);
+    send("error", { error: "Analysis failed", details: analysisError.message });
+  }
+  res.end();
+});
+
 app.get("/health", (req, res) => {
   res.json({ status: "OK", timestamp: new Date().toISOString() });
 });
@@ -145,4 +102,7 @@ app.listen(PORT, () => {
   console.log(
     `📊 Analysis endpoint: POST http://localhost:${PORT}/api/analyze`
   );
+  console.log(
+    `📡 Streaming endpoint: GET http://localhost:${PORT}/api/analyze/stream?query=...`
+  );
 });
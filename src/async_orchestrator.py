@@ -0,0 +1,146 @@
+# async_orchestrator.py
+# Asyncio orchestrator - runs the agent pipeline as a dependency graph
+#
+#   rank ─┬─ overlap ── evaluation ─┐
+#         └─ forecast ──────────────┴─ mix ── prediction
+#   evaluation + prediction ─┬─ one stage per recommendation builder
+#                            └─ portfolio ──────────────────────────── optimization
+#
+# Each stage starts as soon as the stages it depends on finish, so the
+# overlap matrix is built while the forecast runs and the recommendation
+# generators inside optimize_agent run side by side. Blocking stage
+# functions run in worker threads; coroutine functions (e.g. LLM-backed
+# agents) are awaited directly.
+import asyncio
+
+import marketmuse_sim
+from instrumentation import recording, span
+
+
+class StageTimeoutError(asyncio.TimeoutError):
+    """A pipeline stage ran longer than its timeout"""
+
+    def __init__(self, stage, timeout):
+        super().__init__(f"Stage '{stage}' timed out after {timeout}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class Stage:
+    """One node of the pipeline: ``fn(*results of deps)`` with an optional timeout"""
+
+    def __init__(self, name, fn, deps=(), timeout=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+
+async def _call(fn, args):
+    if asyncio.iscoroutinefunction(fn):
+        return await fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+async def run_graph(stages):
+    """Run ``stages`` (listed after their dependencies) with maximum concurrency.
+
+    Returns {stage name: result}. If any stage fails or times out, every
+    other pending stage is cancelled and the error is re-raised; the same
+    happens when the caller cancels run_graph itself. A stage already
+    running in a thread finishes in the background, but its result is
+    dropped.
+    """
+    tasks = {}
+
+    async def execute(stage):
+        args = [await tasks[dep] for dep in stage.deps]
+        try:
+            return await asyncio.wait_for(_call(stage.fn, args), stage.timeout)
+        except asyncio.TimeoutError:
+            raise StageTimeoutError(stage.name, stage.timeout) from None
+
+    for stage in stages:
+        missing = [dep for dep in stage.deps if dep not in tasks]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown or later stages: {missing}")
+        tasks[stage.name] = asyncio.ensure_future(execute(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    return {name: task.result() for name, task in tasks.items()}
+
+
+def build_pipeline(plan, engine="python", timeouts=None, default_timeout=None):
+    """Stages computing run()'s evaluation, prediction and optimization for ``plan``.
+
+    ``timeouts`` maps stage names (rank, overlap, forecast, mix, portfolio,
+    one per RECOMMENDATION_BUILDERS function, ...) to seconds; stages not
+    listed get ``default_timeout``.
+    """
+    timeouts = timeouts or {}
+    sim = marketmuse_sim
+    evaluate, predict, optimize = plan["evaluate"], plan["predict"], plan["optimize"]
+
+    def stage(name, fn, deps=()):
+        return Stage(name, fn, deps, timeouts.get(name, default_timeout))
+
+    async def evaluation(ranking, overlap_matrix):
+        return {
+            "top": ranking["top"],
+            "overlap_matrix": overlap_matrix,
+            "overlap_factor": ranking["overlap_factor"],
+            "total_evaluated": ranking["total_evaluated"],
+        }
+
+    async def prediction(forecast, mix):
+        return sim.with_mix_comparison(forecast[0], mix)
+
+    async def optimization(portfolio, *recommendations):
+        recommendations = [rec for rec in recommendations if rec]
+        recommendations.append(sim.budget_recommendation(optimize, portfolio))
+        return sim.optimization_plan(recommendations, portfolio)
+
+    recommenders = [builder.__name__ for builder in sim.RECOMMENDATION_BUILDERS]
+    return [
+        stage("rank", lambda: sim.rank_creators(evaluate, engine=engine)),
+        stage("overlap", lambda ranking: sim.calculate_overlap_matrix(
+            [c["candidate_id"] for c in ranking["top"]], engine=engine), ["rank"]),
+        stage("forecast", lambda ranking: sim.forecast_campaign(predict, ranking), ["rank"]),
+        stage("evaluation", evaluation, ["rank", "overlap"]),
+        stage("mix", lambda eval_out, forecast: sim.compare_mix(eval_out, forecast[1]),
+              ["evaluation", "forecast"]),
+        stage("prediction", prediction, ["forecast", "mix"]),
+        *[
+            stage(name, lambda eval_out, pred_out, build=builder: build(optimize, eval_out, pred_out),
+                  ["evaluation", "prediction"])
+            for name, builder in zip(recommenders, sim.RECOMMENDATION_BUILDERS)
+        ],
+        stage("portfolio", lambda eval_out, pred_out: sim.solve_budget_portfolio(optimize, eval_out, pred_out),
+              ["evaluation", "prediction"]),
+        stage("optimization", optimization, ["portfolio", *recommenders]),
+    ]
+
+
+async def run_async(query, engine="python", timeouts=None, default_timeout=None):
+    """Async counterpart of run(): same final output, independent stages run concurrently
+
+    Raises StageTimeoutError when a stage exceeds its timeout (see
+    build_pipeline). Progress is not printed and the stage cache is not used;
+    per-stage timings are attached under "timings" as in run().
+    """
+    with recording() as recorder:
+        with span("decompose"):
+            plan = marketmuse_sim.decompose(query)
+        results = await run_graph(build_pipeline(plan, engine, timeouts, default_timeout))
+    output = marketmuse_sim.compose_output(
+        query, results["evaluation"], results["prediction"], results["optimization"]
+    )
+    if recorder is not None:
+        output["timings"] = recorder.report()
+    return output
@@ -0,0 +1,157 @@
+# batch_runner.py
+# Batch analysis: run many briefs in one call with shared precomputation
+#
+# Queries are decomposed once each and grouped by plan: the roster is scored
+# (and the overlap matrix built) once per distinct ``evaluate`` plan, and
+# predict/optimize run once per distinct (evaluate, predict, optimize) plan,
+# spread over a process pool. Results are yielded as (index, result) pairs,
+# either in submission order or as each plan finishes.
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import marketmuse_sim
+from stage_cache import cache_key
+
+
+def _plan_key(*parts):
+    return cache_key("plan", list(parts))
+
+
+def _predict_optimize(predict_task, optimize_task, eval_output, pred_output=None):
+    """Pool job: the predict and optimize stages for one plan"""
+    if pred_output is None:
+        pred_output = marketmuse_sim.predict_agent(predict_task, eval_output)
+    return pred_output, marketmuse_sim.optimize_agent(optimize_task, eval_output, pred_output)
+
+
+def _cache_lookup(cache, stage, entry):
+    payload, tags = entry
+    if cache is None or tags is None:
+        return False, None
+    return cache.get(marketmuse_sim.stage_key(stage, payload))
+
+
+def _cache_store(cache, stage, entry, value):
+    payload, tags = entry
+    if cache is not None and tags is not None:
+        cache.put(marketmuse_sim.stage_key(stage, payload), value, tags)
+
+
+def _pool(workers):
+    # Forked workers inherit the loaded roster, weights and campaign history
+    if "fork" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork"))
+    return ProcessPoolExecutor(workers)
+
+
+def run_batch(queries, engine="python", workers=None, ordered=True, progress=None, cache=None):
+    """Analyze many queries, sharing work between identical plans.
+
+    Yields ``(index, result)`` with ``result`` shaped like run()'s output -
+    in submission order when ``ordered`` is true, otherwise as soon as each
+    plan's forecast finishes. ``progress`` is called with event dicts
+    ({"stage", "done", "total"}) instead of printing. ``workers`` sizes the
+    predict/optimize process pool (default: CPU count; 0 or 1 runs inline).
+    Stage outputs are read from and written to ``cache`` (default
+    STAGE_CACHE) in this process.
+    """
+    queries = list(queries)
+    cache = cache if cache is not None else marketmuse_sim.STAGE_CACHE
+    report = progress or (lambda event: None)
+    workers = (os.cpu_count() or 1) if workers is None else workers
+
+    # Decompose every query and group identical plans
+    plans = {}  # query -> plan
+    evaluations = {}  # evaluate key -> evaluate task
+    jobs = {}  # job key -> (evaluate key, plan)
+    job_of = []  # query index -> job key
+    for query in queries:
+        if query not in plans:
+            plans[query] = marketmuse_sim.decompose(query)
+        plan = plans[query]
+        eval_key = _plan_key(plan["evaluate"])
+        evaluations.setdefault(eval_key, plan["evaluate"])
+        job_key = _plan_key(plan["evaluate"], plan["predict"], plan["optimize"])
+        jobs.setdefault(job_key, (eval_key, plan))
+        job_of.append(job_key)
+    report({"stage": "decompose", "done": len(queries), "total": len(queries),
+            "distinct_evaluations": len(evaluations), "distinct_plans": len(jobs)})
+
+    # Score the roster once per distinct evaluate plan
+    eval_outputs = {}
+    for done, (eval_key, task) in enumerate(evaluations.items(), start=1):
+        eval_outputs[eval_key] = marketmuse_sim.run_evaluate(task, engine=engine, cache=cache)
+        report({"stage": "evaluate", "done": done, "total": len(evaluations)})
+
+    # Predict/optimize once per distinct plan, reusing cached stage outputs
+    outputs = {}  # job key -> (predict output, optimize output)
+    pending = {}  # job key -> (args, predict cache entry)
+    for job_key, (eval_key, plan) in jobs.items():
+        eval_output = eval_outputs[eval_key]
+        predict_entry = marketmuse_sim.predict_cache_entry(plan["predict"], eval_output)
+        hit, pred_output = _cache_lookup(cache, "predict", predict_entry)
+        if hit:
+            optimize_entry = marketmuse_sim.optimize_cache_entry(plan["optimize"], eval_output, pred_output)
+            hit, opt_output = _cache_lookup(cache, "optimize", optimize_entry)
+            if hit:
+                outputs[job_key] = (pred_output, opt_output)
+                continue
+        args = (plan["predict"], plan["optimize"], eval_output, pred_output)
+        pending[job_key] = (args, predict_entry)
+
+    waiting = {}  # job key -> query indexes not yet yielded
+    for index, job_key in enumerate(job_of):
+        waiting.setdefault(job_key, []).append(index)
+    total = len(jobs)
+    next_index = 0
+
+    def finish(job_key, result):
+        args, predict_entry = pending.pop(job_key)
+        pred_output, opt_output = result
+        if args[3] is None:
+            _cache_store(cache, "predict", predict_entry, pred_output)
+        eval_output = args[2]
+        optimize_entry = marketmuse_sim.optimize_cache_entry(args[1], eval_output, pred_output)
+        _cache_store(cache, "optimize", optimize_entry, opt_output)
+        outputs[job_key] = result
+
+    def ready():
+        """Results that can be yielded now, respecting ``ordered``"""
+        nonlocal next_index
+        if ordered:
+            while next_index < len(queries) and job_of[next_index] in outputs:
+                yield next_index
+                next_index += 1
+        else:
+            for job_key in list(waiting):
+                if job_key in outputs:
+                    yield from waiting.pop(job_key)
+
+    def result_for(index):
+        query = queries[index]
+        eval_key, _ = jobs[job_of[index]]
+        pred_output, opt_output = outputs[job_of[index]]
+        return marketmuse_sim.compose_output(query, eval_outputs[eval_key], pred_output, opt_output)
+
+    report({"stage": "forecast", "done": len(outputs), "total": total})
+    for index in ready():
+        yield index, result_for(index)
+
+    if workers <= 1 or len(pending) <= 1:
+        for job_key in list(pending):
+            finish(job_key, _predict_optimize(*pending[job_key][0]))
+            report({"stage": "forecast", "done": len(outputs), "total": total})
+            for index in ready():
+                yield index, result_for(index)
+        return
+
+    with _pool(min(workers, len(pending))) as pool:
+        futures = {pool.submit(_predict_optimize, *args): job_key for job_key, (args, _) in pending.items()}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(futures.pop(future), future.result())
+                report({"stage": "forecast", "done": len(outputs), "total": total})
+            for index in ready():
+                yield index, result_for(index)
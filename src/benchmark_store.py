@@ -0,0 +1,236 @@
+# benchmark_store.py
+# Calibrated CPM/CTR/CVR benchmarks: a pre-aggregated cube over historical post results
+#
+# Post-level results (one row per published post) are streamed in chunks and
+# summed into cells of a cube: for every rollup level in LEVELS, a dict from
+# the level's dimension values to [posts, impressions, clicks, conversions,
+# spend]. A lookup walks the levels from most to least specific - one dict
+# probe each, so O(1) for a fixed hierarchy - and answers from the first cell
+# with at least MIN_SAMPLES posts. Levels needing a dimension the lookup did
+# not give are skipped, so benchmark_for(vertical, season) falls back
+# vertical+season -> vertical -> season -> global.
+#
+# Rates are pooled, not averaged: CTR = clicks / impressions, CVR =
+# conversions / clicks, CPM = spend / impressions * 1000. Appending closed
+# campaigns only adds to cell sums, and every append chains ``version`` so
+# cached forecasts keyed on it go stale.
+#
+# Summary benchmark rows (the CAMPAIGN_HISTORY shape, avg_cpm/avg_ctr/avg_cvr)
+# can seed the cube via add_benchmarks(). Seeds are a prior kept in separate
+# cells: each row counts as ``samples`` posts of SEED_POST_IMPRESSIONS
+# impressions, pooled with real posts only while a cell has fewer than
+# MIN_SAMPLES of them and dropped once it has enough.
+import hashlib
+import json
+from itertools import islice
+
+from creator_registry import follower_band
+
+DIMENSIONS = ("vertical", "season", "post_type", "platform", "follower_band", "region")
+MEASURES = ("impressions", "clicks", "conversions", "spend")
+
+# Rollups from most to least specific; () is the global cell
+LEVELS = (
+    DIMENSIONS,
+    DIMENSIONS[:5],
+    DIMENSIONS[:4],
+    DIMENSIONS[:3],
+    ("vertical", "season"),
+    ("vertical",),
+    ("season",),
+    (),
+)
+
+# Posts a cell needs before its rates are trusted
+MIN_SAMPLES = 50
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Impressions of one typical post; a seeded row of ``samples`` posts weighs samples * this
+SEED_POST_IMPRESSIONS = 10_000.0
+
+
+def _number(value):
+    return 0.0 if value is None or value == "" else float(value)
+
+
+def _dimension_key(row):
+    get = row.get
+    band = get("follower_band") or None
+    if band is None and get("followers") not in (None, ""):
+        band = follower_band(float(get("followers")))
+    return (get("vertical") or None, get("season") or None, get("post_type") or None,
+            get("platform") or None, band, get("region") or None)
+
+
+class BenchmarkStore:
+    """Cube of summed post results with hierarchical-fallback lookups"""
+
+    def __init__(self, levels=LEVELS, min_samples=MIN_SAMPLES):
+        self.levels = tuple(tuple(level) for level in levels)
+        self.min_samples = min_samples
+        self.cells = {level: {} for level in self.levels}
+        self.priors = {level: {} for level in self.levels}
+        self._positions = {level: [DIMENSIONS.index(dim) for dim in level] for level in self.levels}
+        self.version = "empty"
+        self.rows_ingested = 0
+
+    @classmethod
+    def from_benchmarks(cls, rows, samples=None, **options):
+        """Store seeded with summary benchmark rows (see add_benchmarks)"""
+        store = cls(**options)
+        store.add_benchmarks(rows, samples)
+        return store
+
+    # -- ingestion ---------------------------------------------------------
+
+    def add_benchmarks(self, rows, samples=None):
+        """Seed prior cells from rows with avg_cpm/avg_ctr/avg_cvr, each worth ``samples`` posts"""
+        samples = self.min_samples if samples is None else samples
+        impressions = samples * SEED_POST_IMPRESSIONS
+        groups = {}
+        for row in rows:
+            clicks = row["avg_ctr"] * impressions
+            _accumulate(groups, _dimension_key(row), [
+                float(samples), impressions, clicks, clicks * row["avg_cvr"],
+                row["avg_cpm"] * impressions / 1000,
+            ])
+        self._merge(groups, 0, self.priors)
+
+    def ingest(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream post-level result dicts into the cube; returns the number of rows added.
+
+        Rows carry the DIMENSIONS (follower_band may be given as "followers"
+        instead; missing dimensions are None) and the MEASURES impressions,
+        clicks, conversions and spend (same currency as avg_cpm).
+        """
+        rows = iter(rows)
+        total = 0
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return total
+            # Sum the chunk into its most specific cells first; rollups then
+            # only touch one entry per distinct cell, not per row
+            groups = {}
+            for row in chunk:
+                key = _dimension_key(row)
+                sums = (_number(row.get("impressions")), _number(row.get("clicks")),
+                        _number(row.get("conversions")), _number(row.get("spend")))
+                cell = groups.get(key)
+                if cell is None:
+                    groups[key] = [1.0, *sums]
+                else:
+                    cell[0] += 1.0
+                    cell[1] += sums[0]
+                    cell[2] += sums[1]
+                    cell[3] += sums[2]
+                    cell[4] += sums[3]
+            self._merge(groups, len(chunk))
+            total += len(chunk)
+
+    append = ingest
+
+    def ingest_file(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream an NDJSON or CSV results export (optionally .gz) into the cube"""
+        import csv
+        from roster_loader import open_text
+        with open_text(path) as handle:
+            name = str(path)[:-3] if str(path).endswith(".gz") else str(path)
+            if name.endswith(".csv"):
+                rows = csv.DictReader(handle)
+            else:
+                rows = (json.loads(line) for line in handle if line.strip())
+            return self.ingest(rows, chunk_size)
+
+    def _merge(self, groups, rows, target=None):
+        target = self.cells if target is None else target
+        hasher = hashlib.sha256(self.version.encode("utf-8"))
+        hasher.update(b"prior" if target is self.priors else b"posts")
+        for key in sorted(groups, key=lambda key: json.dumps(key)):
+            hasher.update(json.dumps([key, groups[key]]).encode("utf-8"))
+        for level in self.levels:
+            cells, positions = target[level], self._positions[level]
+            for key, sums in groups.items():
+                _accumulate(cells, tuple(key[i] for i in positions), sums)
+        self.version = hasher.hexdigest()[:16]
+        self.rows_ingested += rows
+
+    # -- lookups -----------------------------------------------------------
+
+    def lookup(self, **dims):
+        """Benchmark row for the given dimension values from the most specific trusted cell.
+
+        Returns the dims plus avg_cpm, avg_ctr, avg_cvr, the cell's post
+        count ("samples") and the dimensions of the level that answered. When
+        no cell has enough samples the best-populated candidate answers.
+        """
+        unknown = set(dims) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown benchmark dimensions: {sorted(unknown)}")
+        best = None
+        for level in self.levels:
+            if any(dims.get(dim) is None for dim in level):
+                continue
+            cell = self._cell(level, tuple(dims[dim] for dim in level))
+            if cell is None or cell[1] <= 0:
+                continue
+            if cell[0] >= self.min_samples:
+                return self._row(dims, level, cell)
+            if best is None or cell[0] > best[1][0]:
+                best = (level, cell)
+        if best is None:
+            raise LookupError(f"No benchmark data for {dims}")
+        return self._row(dims, *best)
+
+    def benchmarks(self, level=("vertical", "season")):
+        """Benchmark rows for every trusted cell of one rollup level"""
+        level = tuple(level)
+        rows = []
+        for key in {**self.cells[level], **self.priors[level]}:
+            cell = self._cell(level, key)
+            if cell[0] >= self.min_samples and cell[1] > 0:
+                rows.append(self._row(dict(zip(level, key)), level, cell))
+        return rows
+
+    def _cell(self, level, key):
+        """Sums of real posts, plus the seeded prior until there are MIN_SAMPLES real posts"""
+        cell = self.cells[level].get(key)
+        if cell is not None and cell[0] >= self.min_samples:
+            return cell
+        prior = self.priors[level].get(key)
+        if prior is None:
+            return cell
+        if cell is None:
+            return prior
+        return [real + seeded for real, seeded in zip(cell, prior)]
+
+    @staticmethod
+    def _row(dims, level, cell):
+        posts, impressions, clicks, conversions, spend = cell
+        row = {dim: value for dim, value in dims.items() if value is not None}
+        row.update({
+            "avg_cpm": round(spend / impressions * 1000, 4),
+            "avg_ctr": round(clicks / impressions, 6),
+            "avg_cvr": round(conversions / clicks, 6) if clicks else 0.0,
+            "samples": int(posts),
+            "level": list(level),
+        })
+        return row
+
+    def stats(self):
+        return {
+            "rows_ingested": self.rows_ingested,
+            "cells": {"/".join(level) or "global": len(cells) for level, cells in self.cells.items()},
+            "seeded_cells": {"/".join(level) or "global": len(cells) for level, cells in self.priors.items()},
+            "version": self.version,
+        }
+
+
+def _accumulate(cells, key, sums):
+    cell = cells.get(key)
+    if cell is None:
+        cells[key] = list(sums)
+    else:
+        for i, value in enumerate(sums):
+            cell[i] += value
@@ -0,0 +1,376 @@
+# campaign_simulator.py
+# Day-by-day campaign simulation: pacing, saturation, creative fatigue and budget burn
+#
+# Every quantity is an (n creators, days) array, so a 12-week, 500-creator
+# plan is a few dozen array operations:
+#
+#   schedule     reels/stories per creator-day; FRONT_LOAD of each creator's
+#                content lands in week 1 (the Timing lever), the rest is
+#                spread over the remaining days, staggered across creators
+#   budget       creator fees are paid on posting day; content past the
+#                budget (in posting order) is dropped
+#   exposure     E = cumulative impressions per follower, plus the exposure
+#                overlapping creators deliver to the same audience
+#                (PAIR_DEDUP_RATE * overlap, as in portfolio_optimizer)
+#   reach        followers * (1 - exp(-E)) per creator, discounted by its
+#                shared-audience share - so reach saturates with frequency
+#   fatigue      CTR decays as exp(-FATIGUE_RATE * (frequency - 1)), where
+#                frequency counts exposures since the last creative refresh
+#
+# replay_contingencies() re-runs the plan with optimize_agent's contingency
+# rules ("Low performance week 1", "High CPM inflation", creative refresh on
+# a 25% week-over-week CTR drop) applied when their checks fire, and reports
+# the outcome with and without them.
+import numpy as np
+
+import marketmuse_sim
+from forecast_sim import REEL_MULTIPLIER, STORY_MULTIPLIER
+from portfolio_optimizer import PAIR_DEDUP_RATE, package_cost
+from sensitivity_sweep import CREATIVE_QUALITY_UPLIFT
+
+# Share of each creator's content posted in week 1
+FRONT_LOAD = 0.6
+# CTR multiplier per extra exposure of an already reached follower
+FATIGUE_RATE = 0.15
+# Fee cut negotiated with the creators kept on after a CPM inflation pause
+NEGOTIATED_DISCOUNT = 0.10
+
+# Thresholds from optimization_plan's performance_management section
+CTR_MINIMUM = 0.012
+CVR_MINIMUM = 0.022
+CPM_INFLATION = 1.30
+CTR_DROP = 0.25
+
+# Multipliers a what-if scenario may set (all default to 1)
+SCENARIO_KEYS = ("reach_scale", "ctr_scale", "cvr_scale", "cost_scale")
+
+_GOLDEN = 0.6180339887498949
+
+
+def front_loaded_days(count, days, offsets, front_load=FRONT_LOAD):
+    """(n, days) content counts: ``count`` pieces per creator placed by a front-loaded schedule.
+
+    ``offsets`` (n,) in [0, 1) stagger the slots between creators.
+    """
+    n = len(offsets)
+    schedule = np.zeros((n, days))
+    count = int(count)
+    if count <= 0 or days <= 0:
+        return schedule
+    quantile = (np.arange(count)[None, :] + offsets[:, None]) / count
+    first_week = min(7, days)
+    if days <= first_week:
+        day = quantile * days
+    else:
+        later = first_week + (quantile - front_load) / (1 - front_load) * (days - first_week)
+        day = np.where(quantile < front_load, quantile / front_load * first_week, later)
+    day = np.minimum(day.astype(np.int64), days - 1)
+    np.add.at(schedule, (np.repeat(np.arange(n), count), day.ravel()), 1)
+    return schedule
+
+
+class CampaignPlan:
+    """Mutable content schedule and fee scale that contingency actions edit"""
+
+    def __init__(self, posts, stories):
+        self.posts = posts
+        self.stories = stories
+        self.fee_scale = np.ones_like(posts)
+        self.refresh = np.zeros(posts.shape[1], dtype=bool)
+
+    def copy(self):
+        plan = CampaignPlan(self.posts.copy(), self.stories.copy())
+        plan.fee_scale = self.fee_scale.copy()
+        plan.refresh = self.refresh.copy()
+        return plan
+
+
+class CampaignSimulator:
+    """Deterministic day-level simulator for one shortlist and predict plan.
+
+    ``creators`` are INFLUENCERS records, ``overlap`` the eval_agent overlap
+    matrix (dict of dicts or an n x n array).
+    """
+
+    def __init__(self, creators, overlap, task, benchmark, budget_inr=None, front_load=FRONT_LOAD):
+        self.creators = list(creators)
+        self.ids = [c["id"] for c in self.creators]
+        self.names = [c["name"] for c in self.creators]
+        self.days = 7 * int(task["duration_weeks"])
+        self.budget = np.inf if budget_inr is None else float(budget_inr)
+
+        self.followers = np.array([c["followers"] for c in self.creators], dtype=np.float64)
+        er = np.array([c["er"] for c in self.creators], dtype=np.float64)
+        self.reach_rate = np.clip(0.45 + (er - 0.03) * 2, 0.2, 0.8)
+        self.reel_fee = np.array([package_cost(c, 1, 0) for c in self.creators])
+        self.story_fee = np.array([package_cost(c, 0, 1) for c in self.creators])
+
+        if isinstance(overlap, dict):
+            overlap = [[overlap[a][b] for b in self.ids] for a in self.ids]
+        cross = PAIR_DEDUP_RATE * np.asarray(overlap, dtype=np.float64).reshape(len(self.ids), len(self.ids))
+        np.fill_diagonal(cross, 0.0)
+        self.cross = cross
+        self.share = 1.0 / (1.0 + cross.sum(axis=1))
+
+        sustainability_uplift = 0.003 if task.get("sustainability_focus", False) else 0
+        self.ctr = benchmark["avg_ctr"] + sustainability_uplift + CREATIVE_QUALITY_UPLIFT
+        self.cvr = task["baseline_cvr"]
+
+        offsets = (np.arange(len(self.ids)) * _GOLDEN) % 1.0
+        self.plan = CampaignPlan(
+            front_loaded_days(task["posts_per_creator"], self.days, offsets, front_load),
+            front_loaded_days(task["stories_per_creator"], self.days, (offsets + 0.5) % 1.0, front_load),
+        )
+
+    def run(self, plan=None, scenario=None):
+        """Simulate ``plan`` (default: the initial schedule) under a what-if ``scenario``.
+
+        ``scenario`` may scale reach, CTR, CVR and creator fees (SCENARIO_KEYS).
+        Returns the raw (n, days) and (days,) arrays.
+        """
+        plan = plan or self.plan
+        scenario = scenario or {}
+        unknown = set(scenario) - set(SCENARIO_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown scenario keys: {sorted(unknown)}")
+        reach_scale, ctr_scale, cvr_scale, cost_scale = (scenario.get(key, 1.0) for key in SCENARIO_KEYS)
+
+        # Budget burn: fees in posting order (day by day), content past the budget is dropped
+        cost = (self.reel_fee[:, None] * plan.posts + self.story_fee[:, None] * plan.stories) \
+            * plan.fee_scale * cost_scale
+        paid = np.cumsum(cost.T.ravel()).reshape(cost.T.shape).T <= self.budget + 1e-9
+        posts, stories, cost = plan.posts * paid, plan.stories * paid, cost * paid
+
+        impressions = (self.followers * self.reach_rate * reach_scale)[:, None] \
+            * (REEL_MULTIPLIER * posts + STORY_MULTIPLIER * stories)
+        exposure = np.cumsum(impressions / self.followers[:, None], axis=1)
+        exposure = exposure + self.cross @ exposure
+        reach = (self.followers * self.share)[:, None] * -np.expm1(-exposure)
+
+        # Exposures since the last creative refresh drive fatigue
+        days = np.arange(self.days)
+        last_refresh = np.maximum.accumulate(np.where(plan.refresh, days, 0))
+        before = np.hstack([np.zeros((len(self.ids), 1)), exposure[:, :-1]])[:, last_refresh]
+        fresh = exposure - before
+        frequency = np.where(fresh > 1e-12, fresh / -np.expm1(-np.maximum(fresh, 1e-12)), 1.0)
+        ctr = self.ctr * ctr_scale * np.exp(-FATIGUE_RATE * (frequency - 1.0))
+
+        clicks = impressions * ctr
+        return {
+            "posts": posts,
+            "stories": stories,
+            "impressions": impressions,
+            "reach": reach,
+            "clicks": clicks,
+            "conversions": clicks * self.cvr * cvr_scale,
+            "spend": cost,
+        }
+
+    # -- reporting ---------------------------------------------------------
+
+    def summarize(self, raw, as_lists=False):
+        """Daily, weekly, per-creator and total metrics from run()'s arrays"""
+        daily = {
+            "impressions": raw["impressions"].sum(axis=0),
+            "unique_reach": raw["reach"].sum(axis=0),
+            "clicks": raw["clicks"].sum(axis=0),
+            "conversions": raw["conversions"].sum(axis=0),
+            "spend_inr": raw["spend"].sum(axis=0),
+        }
+        daily["cumulative_spend_inr"] = np.cumsum(daily["spend_inr"])
+        daily["ctr"] = _ratio(daily["clicks"], daily["impressions"])
+        daily["frequency"] = _ratio(np.cumsum(daily["impressions"]), daily["unique_reach"])
+
+        weeks = self.days // 7
+        by_week = {key: daily[key].reshape(weeks, 7).sum(axis=1)
+                   for key in ("impressions", "clicks", "conversions", "spend_inr")}
+        by_week["unique_reach"] = daily["unique_reach"].reshape(weeks, 7)[:, -1]
+        by_week["ctr"] = _ratio(by_week["clicks"], by_week["impressions"])
+        by_week["cpm_inr"] = _ratio(by_week["spend_inr"], by_week["impressions"]) * 1000
+
+        impressions = float(daily["impressions"].sum())
+        unique_reach = float(daily["unique_reach"][-1]) if self.days else 0.0
+        clicks = float(daily["clicks"].sum())
+        conversions = float(daily["conversions"].sum())
+        spend = float(daily["spend_inr"].sum())
+        totals = {
+            "impressions": int(impressions),
+            "unique_reach": int(unique_reach),
+            "frequency": round(impressions / unique_reach, 2) if unique_reach else None,
+            "clicks": int(clicks),
+            "ctr": round(clicks / impressions, 4) if impressions else None,
+            "conversions": int(conversions),
+            "spend_inr": int(round(spend)),
+            "cpa_inr": round(spend / conversions, 2) if conversions else None,
+        }
+        creators = [
+            {
+                "candidate_id": creator_id,
+                "name": name,
+                "posts": round(float(posts), 2),
+                "stories": round(float(stories), 2),
+                "impressions": int(impressions),
+                "clicks": int(clicks),
+                "spend_inr": int(round(spend)),
+            }
+            for creator_id, name, posts, stories, impressions, clicks, spend in zip(
+                self.ids, self.names, raw["posts"].sum(axis=1), raw["stories"].sum(axis=1),
+                raw["impressions"].sum(axis=1), raw["clicks"].sum(axis=1), raw["spend"].sum(axis=1))
+        ]
+        result = {"totals": totals, "daily": daily, "weekly": by_week, "creators": creators}
+        if as_lists:
+            result["daily"] = {key: np.round(values, 6).tolist() for key, values in daily.items()}
+            result["weekly"] = {key: np.round(values, 6).tolist() for key, values in by_week.items()}
+        return result
+
+    # -- contingency replay ------------------------------------------------
+
+    def replay(self, scenario=None, rules=None):
+        """(plan, raw arrays, triggered rules) after applying contingency ``rules`` as they fire.
+
+        Rules are checked in day order against the simulated outcome so far;
+        a fired rule edits the plan from its action day on and the campaign
+        is re-simulated, so later checks see its effect.
+        """
+        rules = CONTINGENCY_RULES if rules is None else rules
+        reference = self.run()  # the plan as forecast, for relative thresholds
+        plan = self.plan.copy()
+        checks = sorted((day, order, rule) for order, rule in enumerate(rules)
+                        for day in rule["check_days"](self.days))
+        triggered = []
+        raw = self.run(plan, scenario)
+        for day, _, rule in checks:
+            if not rule["when"](self, raw, reference, day):
+                continue
+            start = min(self.days, day + rule["delay_days"])
+            rule["apply"](self, plan, raw, day, start)
+            triggered.append({"scenario": rule["scenario"], "check_day": day, "action_day": start,
+                              "action": rule["action"]})
+            raw = self.run(plan, scenario)
+        return plan, raw, triggered
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros(np.shape(numerator)), where=denominator > 0)
+
+
+def _window(raw, key, start, stop):
+    return float(raw[key][:, start:stop].sum())
+
+
+def _low_week_one(sim, raw, reference, day):
+    impressions = _window(raw, "impressions", 0, day)
+    clicks = _window(raw, "clicks", 0, day)
+    if impressions <= 0:
+        return False
+    ctr = clicks / impressions
+    cvr = _window(raw, "conversions", 0, day) / clicks if clicks else 0.0
+    return ctr < CTR_MINIMUM or cvr < CVR_MINIMUM
+
+
+def _cpm(raw, stop):
+    impressions = _window(raw, "impressions", 0, stop)
+    return _window(raw, "spend", 0, stop) / impressions * 1000 if impressions else 0.0
+
+
+def _cpm_inflation(sim, raw, reference, day):
+    planned = _cpm(reference, day)
+    return planned > 0 and _cpm(raw, day) > CPM_INFLATION * planned
+
+
+def _ctr_drop(sim, raw, reference, day):
+    this_week = _ratio(_window(raw, "clicks", day - 7, day), _window(raw, "impressions", day - 7, day))
+    last_week = _ratio(_window(raw, "clicks", day - 14, day - 7), _window(raw, "impressions", day - 14, day - 7))
+    return last_week > 0 and this_week < (1 - CTR_DROP) * last_week
+
+
+def _remaining_cost(sim, plan, rows, start):
+    return float((sim.reel_fee[rows, None] * plan.posts[rows, start:]
+                  + sim.story_fee[rows, None] * plan.stories[rows, start:]).sum())
+
+
+def _shift_to_top_performers(sim, plan, raw, day, start):
+    """Move every other creator's remaining fees to the top 2 by clicks, and refresh creative"""
+    clicks = raw["clicks"][:, :day].sum(axis=1)
+    top = np.argsort(-clicks, kind="stable")[:2]
+    others = np.setdiff1d(np.arange(len(sim.ids)), top)
+    freed = _remaining_cost(sim, plan, others, start)
+    plan.posts[others, start:] = 0
+    plan.stories[others, start:] = 0
+    remaining = sim.days - start
+    if remaining > 0 and freed > 0:
+        # Extra reels for the top performers, spread evenly over the remaining days
+        extra = freed / len(top) / sim.reel_fee[top]
+        plan.posts[top, start:] += (extra / remaining)[:, None]
+    _refresh_creative(sim, plan, raw, day, start)
+
+
+def _pause_underperformers(sim, plan, raw, day, start):
+    """Stop the costlier half of creators (spend per click so far) and discount the rest"""
+    spend = raw["spend"][:, :day].sum(axis=1)
+    clicks = raw["clicks"][:, :day].sum(axis=1)
+    cost_per_click = np.divide(spend, clicks, out=np.full(len(spend), np.inf), where=clicks > 0)
+    order = np.argsort(cost_per_click, kind="stable")
+    keep = order[:max(1, (len(order) + 1) // 2)]
+    paused = order[len(keep):]
+    plan.posts[paused, start:] = 0
+    plan.stories[paused, start:] = 0
+    plan.fee_scale[keep, start:] *= 1 - NEGOTIATED_DISCOUNT
+
+
+def _refresh_creative(sim, plan, raw, day, start):
+    if start < sim.days:
+        plan.refresh[start] = True
+
+
+# optimize_agent's contingency_plans and optimization_triggers as executable rules
+CONTINGENCY_RULES = (
+    {
+        "scenario": "Low performance week 1",
+        "action": "Shift budget to top 2 performers, refresh creative with stronger hook",
+        "check_days": lambda days: [7] if days > 7 else [],
+        "delay_days": 2,
+        "when": _low_week_one,
+        "apply": _shift_to_top_performers,
+    },
+    {
+        "scenario": "High CPM inflation",
+        "action": "Pause underperformers, negotiate better rates with top creators",
+        "check_days": lambda days: [3] if days > 3 else [],
+        "delay_days": 0,
+        "when": _cpm_inflation,
+        "apply": _pause_underperformers,
+    },
+    {
+        "scenario": "Creative fatigue",
+        "action": "Creative refresh (CTR dropped 25% week-over-week)",
+        "check_days": lambda days: list(range(14, days, 7)),
+        "delay_days": 1,
+        "when": _ctr_drop,
+        "apply": _refresh_creative,
+    },
+)
+
+
+def simulate_plan(plan, eval_out, scenario=None, contingencies=False, budget_inr=None, front_load=FRONT_LOAD,
+                  as_lists=False):
+    """Day-by-day simulation of a decompose() plan over eval_agent's shortlist.
+
+    The budget defaults to plan["optimize"]["budget_inr"]. With
+    ``contingencies`` the result also holds the replayed outcome
+    ("with_contingencies") and the rules that fired ("triggered").
+    """
+    # Same task, benchmark and uplift rule as forecast_campaign, so the baseline replays the forecast
+    task = plan["predict"]
+    benchmark = marketmuse_sim.benchmark_for(task.get("vertical", "skincare"), task.get("season", "winter"))
+    creators = [marketmuse_sim.REGISTRY.get(c["candidate_id"]) for c in eval_out["top"]]
+    if budget_inr is None:
+        budget_inr = plan.get("optimize", {}).get("budget_inr")
+    sim = CampaignSimulator(creators, eval_out["overlap_matrix"], task, benchmark, budget_inr, front_load)
+
+    result = sim.summarize(sim.run(scenario=scenario), as_lists)
+    if contingencies:
+        _, raw, triggered = sim.replay(scenario)
+        result["with_contingencies"] = sim.summarize(raw, as_lists)
+        result["triggered"] = triggered
+    return result
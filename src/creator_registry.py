@@ -0,0 +1,177 @@
+# creator_registry.py
+# Creator registry - id index plus secondary indexes for candidate lookups
+from collections import defaultdict
+
+# Follower bands as (name, lower bound inclusive, upper bound exclusive)
+FOLLOWER_BANDS = [
+    ("nano", 0, 10_000),
+    ("micro", 10_000, 100_000),
+    ("mid", 100_000, 500_000),
+    ("macro", 500_000, 1_000_000),
+    ("mega", 1_000_000, None),
+]
+
+
+def follower_band(followers):
+    """Name of the follower band a follower count falls into"""
+    for name, low, high in FOLLOWER_BANDS:
+        if followers >= low and (high is None or followers < high):
+            return name
+    return FOLLOWER_BANDS[0][0]
+
+
+class CreatorRegistry:
+    """Indexes creator records by id, topic, platform, safety tier and follower band.
+
+    Built once from the roster and kept up to date with add()/remove(), so
+    lookups never scan the full creator list. Records keep their roster
+    position, which select() uses to return candidates in roster order.
+    """
+
+    def __init__(self, records=()):
+        self.by_id = {}
+        self.by_topic = defaultdict(set)
+        self.by_platform = defaultdict(set)
+        self.by_safety = defaultdict(set)
+        self.by_band = defaultdict(set)
+        self._position = {}
+        self._next_position = 0
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, creator_id):
+        return creator_id in self.by_id
+
+    def __iter__(self):
+        return iter(self.by_id.values())
+
+    def get(self, creator_id):
+        """Record for ``creator_id``; raises KeyError for unknown ids"""
+        return self.by_id[creator_id]
+
+    def position(self, creator_id):
+        """Roster position of ``creator_id`` (kept when its record is replaced)"""
+        return self._position[creator_id]
+
+    def add(self, record):
+        """Index a record, replacing any existing record with the same id"""
+        creator_id = record["id"]
+        if creator_id in self.by_id:
+            self._unindex(self.by_id[creator_id])
+        else:
+            self._position[creator_id] = self._next_position
+            self._next_position += 1
+        self.by_id[creator_id] = record
+        for topic in record["topics"]:
+            self.by_topic[topic].add(creator_id)
+        self.by_platform[record["platform"]].add(creator_id)
+        self.by_safety[record["safety"]].add(creator_id)
+        self.by_band[follower_band(record["followers"])].add(creator_id)
+
+    def remove(self, creator_id):
+        """Drop a record from every index and return it"""
+        record = self.by_id.pop(creator_id)
+        self._unindex(record)
+        del self._position[creator_id]
+        return record
+
+    def _unindex(self, record):
+        creator_id = record["id"]
+        for topic in record["topics"]:
+            _discard(self.by_topic, topic, creator_id)
+        _discard(self.by_platform, record["platform"], creator_id)
+        _discard(self.by_safety, record["safety"], creator_id)
+        _discard(self.by_band, follower_band(record["followers"]), creator_id)
+
+    def select(self, topics=None, platforms=None, safety=None, bands=None):
+        """Records matching every given filter, in roster order.
+
+        Each filter is an iterable of accepted values (e.g. bands=["micro"]);
+        a creator matches a filter if it matches any of its values. Omitted
+        filters accept everything.
+        """
+        matched = None
+        for index, values in ((self.by_topic, topics), (self.by_platform, platforms),
+                              (self.by_safety, safety), (self.by_band, bands)):
+            if values is None:
+                continue
+            ids = set().union(*(index.get(value, ()) for value in values))
+            matched = ids if matched is None else matched & ids
+        if matched is None:
+            return list(self)
+        return [self.by_id[i] for i in sorted(matched, key=self._position.__getitem__)]
+
+
+class StoreBackedRegistry(CreatorRegistry):
+    """CreatorRegistry over a CreatorStore whose records are built on first use.
+
+    get(), ``in`` and position() answer from the store's id column and build
+    only the records asked for (``build`` turns a store row into a record).
+    Anything needing the whole roster - iteration, select(), add(), remove()
+    - builds every record once, after which this is a plain CreatorRegistry.
+    """
+
+    def __init__(self, store, build):
+        super().__init__()
+        self._store = store
+        self._build = build
+
+    @property
+    def pending(self):
+        """True until every record has been built"""
+        return self._store is not None
+
+    def __len__(self):
+        return len(self._store) if self.pending else super().__len__()
+
+    def __contains__(self, creator_id):
+        if not self.pending or creator_id in self.by_id:
+            return super().__contains__(creator_id)
+        return self._store.rows_for([creator_id], missing=-1)[0] >= 0
+
+    def __iter__(self):
+        self.records()
+        return super().__iter__()
+
+    def get(self, creator_id):
+        if self.pending and creator_id not in self.by_id:
+            self.by_id[creator_id] = self._build(int(self._store.rows_for([creator_id])[0]))
+        return super().get(creator_id)
+
+    def position(self, creator_id):
+        if self.pending:
+            return int(self._store.rows_for([creator_id])[0])
+        return super().position(creator_id)
+
+    def add(self, record):
+        self.records()
+        super().add(record)
+
+    def remove(self, creator_id):
+        self.records()
+        return super().remove(creator_id)
+
+    def select(self, topics=None, platforms=None, safety=None, bands=None):
+        self.records()
+        return super().select(topics, platforms, safety, bands)
+
+    def records(self):
+        """Every record in store order, building the ones not built yet"""
+        if self.pending:
+            store, built = self._store, self.by_id
+            self._store, self.by_id = None, {}
+            for row, creator_id in enumerate(store.id.tolist()):
+                record = built.get(creator_id)
+                super().add(record if record is not None else self._build(row))
+        return list(self.by_id.values())
+
+
+def _discard(index, key, creator_id):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(creator_id)
+        if not ids:
+            del index[key]
@@ -0,0 +1,6 @@
+# creator_schema.py
+# Fixed bucket order for the nested fields of a creator record
+AGE_BUCKETS = ("13-17", "18-24", "25-34", "35+")
+GEO_REGIONS = ("US", "CA", "UK", "AU", "other")
+HISTORY_FIELDS = ("reel", "static", "story", "avg_views")
+FRAUD_FIELDS = ("spike_frequency", "bot_ratio", "repetitive_comments")
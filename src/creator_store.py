@@ -0,0 +1,194 @@
+# creator_store.py
+# Columnar creator store - keeps the roster as NumPy arrays for batched scoring
+import hashlib
+
+import numpy as np
+
+from creator_schema import AGE_BUCKETS, FRAUD_FIELDS, GEO_REGIONS, HISTORY_FIELDS
+from records import TopicVocabulary  # noqa: F401  (re-exported)
+
+
+class CreatorStore:
+    """Struct-of-arrays view of the creator roster.
+
+    Numeric columns live in ``columns`` (one row per creator); topics are kept
+    twice - as a uint64 bitmask for fast membership tests and as CSR arrays
+    (``topic_ptr``/``topic_ids``) that preserve each creator's topic order.
+    """
+
+    def __init__(self, columns, names, handles, vocab, safety_labels, platform_labels):
+        self.columns = columns
+        self.names = names
+        self.handles = handles
+        self.vocab = vocab
+        self.safety_labels = safety_labels
+        self.platform_labels = platform_labels
+        self._row_index = None
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def from_records(cls, records, vocab=None):
+        """Build a store from INFLUENCERS-shaped dicts"""
+        builder = CreatorStoreBuilder(vocab)
+        builder.append(records)
+        return builder.build()
+
+    def topics(self, row):
+        """Topic names for one creator, in their original order"""
+        lo, hi = self.topic_ptr[row], self.topic_ptr[row + 1]
+        return [self.vocab.names[t] for t in self.topic_ids[lo:hi]]
+
+    def has_topic(self, topic):
+        """Boolean column: which creators list ``topic``"""
+        topic_id = self.vocab.ids.get(topic)
+        if topic_id is None:
+            return np.zeros(len(self), dtype=bool)
+        word, bit = divmod(topic_id, 64)
+        return (self.topic_bits[:, word] >> np.uint64(bit)) & np.uint64(1) == 1
+
+    def count_topics(self, topics):
+        """Integer column: how many of ``topics`` each creator lists"""
+        counts = np.zeros(len(self), dtype=np.int64)
+        for topic in topics:
+            counts += self.has_topic(topic)
+        return counts
+
+    def rows_for(self, creator_ids, missing=None):
+        """Store row numbers for a sequence of creator ids.
+
+        Unknown ids raise KeyError, or map to ``missing`` when it is given.
+        """
+        if self._row_index is None:
+            self._row_index = {int(cid): row for row, cid in enumerate(self.id)}
+        if missing is not None:
+            return np.array([self._row_index.get(cid, missing) for cid in creator_ids], dtype=np.int64)
+        return np.array([self._row_index[cid] for cid in creator_ids], dtype=np.int64)
+
+    def digest(self):
+        """Content hash of the columns, names, handles and label tables"""
+        hasher = hashlib.sha256()
+        for name in sorted(self.columns):
+            column = np.ascontiguousarray(self.columns[name])
+            hasher.update(f"{name}:{column.dtype.str}:{column.shape}".encode("utf-8"))
+            hasher.update(column.reshape(-1).view(np.uint8))
+        for values in (self.names, self.handles, self.vocab.names, self.safety_labels, self.platform_labels):
+            if hasattr(values, "blob"):
+                # Snapshot string tables: hash the mapped offsets and bytes directly
+                hasher.update(np.ascontiguousarray(values.offsets).view(np.uint8))
+                hasher.update(np.ascontiguousarray(values.blob))
+            else:
+                hasher.update("\0".join(values).encode("utf-8"))
+            hasher.update(b"\1")
+        return hasher.hexdigest()[:16]
+
+    def safety_label(self, row):
+        return self.safety_labels[self.safety[row]]
+
+    def record(self, row):
+        """Rebuild the INFLUENCERS-shaped dict for one row"""
+        return {
+            "id": int(self.id[row]),
+            "name": self.names[row],
+            "handle": self.handles[row],
+            "platform": self.platform_labels[self.platform[row]],
+            "followers": int(self.followers[row]),
+            "er": float(self.er[row]),
+            "topics": self.topics(row),
+            "aud": dict(zip(AGE_BUCKETS, self.aud[row].tolist())),
+            "geo": dict(zip(GEO_REGIONS, self.geo[row].tolist())),
+            "safety": self.safety_label(row),
+            "history": dict(zip(HISTORY_FIELDS, self.history[row].tolist())),
+            "fraud_indicators": dict(zip(FRAUD_FIELDS, self.fraud[row].tolist())),
+        }
+
+
+class CreatorStoreBuilder:
+    """Builds a CreatorStore from record chunks, so callers never hold every dict at once.
+
+    Each append() converts one chunk to arrays; the topic vocabulary and the
+    safety/platform label tables are shared across chunks.
+    """
+
+    def __init__(self, vocab=None):
+        self.vocab = vocab if vocab is not None else TopicVocabulary()
+        self.safety_codes = {}
+        self.platform_codes = {}
+        self._chunks = []
+        self.names = []
+        self.handles = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def append(self, records):
+        """Convert a chunk of INFLUENCERS-shaped dicts to columns"""
+        records = list(records)
+        n = len(records)
+        ids = np.empty(n, dtype=np.int64)
+        followers = np.empty(n, dtype=np.int64)
+        er = np.empty(n, dtype=np.float64)
+        aud = np.empty((n, len(AGE_BUCKETS)), dtype=np.float64)
+        geo = np.empty((n, len(GEO_REGIONS)), dtype=np.float64)
+        history = np.empty((n, len(HISTORY_FIELDS)), dtype=np.float64)
+        fraud = np.empty((n, len(FRAUD_FIELDS)), dtype=np.float64)
+        safety = np.empty(n, dtype=np.int16)
+        platform = np.empty(n, dtype=np.int16)
+        topic_counts = np.empty(n, dtype=np.int64)
+        topic_ids = []
+
+        for row, inf in enumerate(records):
+            ids[row] = inf["id"]
+            followers[row] = inf["followers"]
+            er[row] = inf["er"]
+            aud[row] = [inf["aud"][k] for k in AGE_BUCKETS]
+            geo[row] = [inf["geo"].get(k, 0.0) for k in GEO_REGIONS]
+            history[row] = [inf["history"].get(k, 0.0) for k in HISTORY_FIELDS]
+            fraud[row] = [inf["fraud_indicators"][k] for k in FRAUD_FIELDS]
+            safety[row] = self.safety_codes.setdefault(inf["safety"], len(self.safety_codes))
+            platform[row] = self.platform_codes.setdefault(inf["platform"], len(self.platform_codes))
+            topic_ids.extend(self.vocab.intern(t) for t in inf["topics"])
+            topic_counts[row] = len(inf["topics"])
+            self.names.append(inf["name"])
+            self.handles.append(inf["handle"])
+
+        self._chunks.append({
+            "id": ids, "followers": followers, "er": er,
+            "aud": aud, "geo": geo, "history": history, "fraud": fraud,
+            "safety": safety, "platform": platform,
+            "topic_counts": topic_counts, "topic_ids": np.asarray(topic_ids, dtype=np.int32),
+        })
+
+    def build(self):
+        """Concatenate the appended chunks into a CreatorStore"""
+        if not self._chunks:
+            self.append([])
+        columns = {
+            key: np.concatenate([chunk[key] for chunk in self._chunks])
+            for key in self._chunks[0]
+        }
+        topic_ptr = np.zeros(len(columns["id"]) + 1, dtype=np.int64)
+        np.cumsum(columns.pop("topic_counts"), out=topic_ptr[1:])
+        columns["topic_ptr"] = topic_ptr
+        columns["topic_bits"] = _topic_bitmask(topic_ptr, columns["topic_ids"], self.vocab.words)
+        return CreatorStore(
+            columns, list(self.names), list(self.handles), self.vocab,
+            list(self.safety_codes), list(self.platform_codes),
+        )
+
+
+def _topic_bitmask(topic_ptr, topic_ids, words):
+    """Pack CSR topic ids into an (n, words) uint64 bitmask"""
+    n = len(topic_ptr) - 1
+    bits = np.zeros((n, words), dtype=np.uint64)
+    rows = np.repeat(np.arange(n), np.diff(topic_ptr))
+    word, bit = np.divmod(topic_ids.astype(np.int64), 64)
+    np.bitwise_or.at(bits, (rows, word), np.left_shift(np.uint64(1), bit.astype(np.uint64)))
+    return bits
@@ -0,0 +1,116 @@
+# forecast_sim.py
+# Monte Carlo KPI forecast - batched NumPy trials behind predict_agent's simulation mode
+import time
+
+import numpy as np
+
+DEFAULT_TRIALS = 100_000
+CHUNK_TRIALS = 25_000
+PERCENTILES = (10, 50, 90)
+
+# Reach multipliers per content type (same as predict_agent's point estimate)
+REEL_MULTIPLIER = 1.4
+STORY_MULTIPLIER = 0.6
+
+# Beta concentration for per-creator reach rates (higher = tighter)
+REACH_RATE_CONCENTRATION = 40.0
+# Lower bound on lognormal spreads when the benchmark table has too few rows
+MIN_LOG_SIGMA = 0.10
+
+
+def benchmark_spreads(campaign_history):
+    """Log-scale spread of CPM, CTR and CVR across the benchmark table"""
+    spreads = {}
+    for key in ("avg_cpm", "avg_ctr", "avg_cvr"):
+        values = np.log([row[key] for row in campaign_history])
+        sigma = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+        spreads[key] = max(MIN_LOG_SIGMA, sigma)
+    return spreads
+
+
+def _percentiles(samples, digits=None, as_int=False):
+    values = np.percentile(samples, PERCENTILES)
+    if as_int:
+        return {f"p{p}": int(v) for p, v in zip(PERCENTILES, values)}
+    return {f"p{p}": round(float(v), digits) for p, v in zip(PERCENTILES, values)}
+
+
+def simulate_forecast(creators, task, benchmark, campaign_history, overlap_factor,
+                      ctr_p50, trials=DEFAULT_TRIALS, seed=None, time_budget_s=None):
+    """Run Monte Carlo trials of the reach -> clicks -> conversions funnel.
+
+    ``creators`` are INFLUENCERS records. Each trial draws, per creator, a
+    reach rate (Beta around the ER-based rate), a CTR (lognormal around
+    ``ctr_p50`` scaled by the creator's reel history, or ``ctr_p50`` itself
+    when no creator has reel history) and a CVR and CPM (lognormal, spread
+    taken from ``campaign_history``); campaign CVR and CPM are the click-
+    and impression-weighted means. Trials run in chunks until ``trials``
+    are done or ``time_budget_s`` is spent, whichever comes first; at least
+    one chunk always runs.
+    """
+    if trials < 1:
+        raise ValueError(f"trials must be at least 1, got {trials}")
+    rng = np.random.default_rng(seed)
+    spreads = benchmark_spreads(campaign_history)
+
+    followers = np.array([c["followers"] for c in creators], dtype=np.float64)
+    er = np.array([c["er"] for c in creators], dtype=np.float64)
+    reel = np.array([c["history"]["reel"] for c in creators], dtype=np.float64)
+
+    reach_rate_mean = np.clip(0.45 + (er - 0.03) * 2, 0.2, 0.8)
+    alpha = reach_rate_mean * REACH_RATE_CONCENTRATION
+    beta = (1 - reach_rate_mean) * REACH_RATE_CONCENTRATION
+    impressions_per_rate = followers * (
+        REEL_MULTIPLIER * task["posts_per_creator"] + STORY_MULTIPLIER * task["stories_per_creator"]
+    )
+    mean_reel = reel.mean() if len(reel) else 0.0
+    ctr_median = ctr_p50 * reel / mean_reel if mean_reel > 0 else np.full(len(reel), ctr_p50)
+    dedup = 1 - 0.5 * overlap_factor
+
+    started = time.perf_counter()
+    chunks = []
+    done = 0
+    while done < trials:
+        size = min(CHUNK_TRIALS, trials - done)
+        shape = (size, len(creators))
+        reach_rate = np.clip(rng.beta(alpha, beta, size=shape), 0.2, 0.8)
+        creator_reach = reach_rate * impressions_per_rate
+        creator_clicks = creator_reach * ctr_median * rng.lognormal(0.0, spreads["avg_ctr"], size=shape)
+        creator_cvr = task["baseline_cvr"] * rng.lognormal(0.0, spreads["avg_cvr"], size=shape)
+        creator_cpm = benchmark["avg_cpm"] * rng.lognormal(0.0, spreads["avg_cpm"], size=shape)
+
+        gross = creator_reach.sum(axis=1)
+        reach = gross * dedup
+        clicks = creator_clicks.sum(axis=1) * dedup
+        conversions = (creator_clicks * creator_cvr).sum(axis=1) * dedup
+        cpm = (creator_reach * creator_cpm).sum(axis=1) / gross
+        ctr = clicks / reach
+        chunks.append({
+            "reach": reach,
+            "clicks": clicks,
+            "ctr": ctr,
+            "cvr": conversions / clicks,
+            "conversions": conversions,
+            "cpm": cpm,
+            "cpc": cpm / (ctr * 1000),
+        })
+        done += size
+        if time_budget_s is not None and time.perf_counter() - started >= time_budget_s:
+            break
+
+    samples = {key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]}
+    forecast = {
+        "reach": _percentiles(samples["reach"], as_int=True),
+        "clicks": _percentiles(samples["clicks"], as_int=True),
+        "ctr": _percentiles(samples["ctr"], 4),
+        "cvr": _percentiles(samples["cvr"], 4),
+        "conversions": _percentiles(samples["conversions"], as_int=True),
+        "cpm": _percentiles(samples["cpm"], 2),
+        "cpc": _percentiles(samples["cpc"], 2),
+    }
+    return forecast, {
+        "trials_requested": trials,
+        "trials_run": done,
+        "seed": seed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
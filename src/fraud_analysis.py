@@ -0,0 +1,280 @@
+# fraud_analysis.py
+# Fraud indicators from raw daily series - the numbers eval_agent's fraud risk reads
+#
+# FraudAnalyzer keeps a small rolling state per creator and is fed new days
+# only (days it has already seen are skipped), in chunks of creators:
+#
+#   spike_frequency      share of evaluated days whose follower gain has a
+#                        rolling z-score above SPIKE_Z against the previous
+#                        WINDOW_DAYS (std floored at Poisson noise, sqrt(mean))
+#   bot_ratio            excess followers gained on spike days that brought no
+#                        matching engagement lift, as a share of followers
+#   repetitive_comments  share of comments that near-duplicate an earlier one
+#                        on the same creator (MinHash over the comment's
+#                        shingle hashes, LSH bands; remembered for
+#                        COMMENT_MEMORY_DAYS)
+#
+# Every step is array arithmetic over a (creators, days) block or a batch of
+# comments, so a daily pass over millions of creators is a few chunked NumPy
+# passes. write_back() pushes the changed creators' indicators into the roster
+# and the columnar store via marketmuse_sim.update_fraud_indicators().
+import hashlib
+
+import numpy as np
+
+import marketmuse_sim
+from creator_schema import FRAUD_FIELDS
+
+# Rolling window for follower-gain and engagement baselines
+WINDOW_DAYS = 28
+# Prior days a z-score needs before a day is evaluated
+MIN_HISTORY_DAYS = 7
+SPIKE_Z = 3.0
+# Engagement rise (over its rolling mean) that fully accounts for a follower spike
+ENGAGEMENT_LIFT = 0.5
+
+MINHASH_PERMUTATIONS = 32
+MINHASH_BANDS = 8  # 4 rows per band: pairs above ~0.6 Jaccard usually collide
+MINHASH_SEED = 20240601
+COMMENT_MEMORY_DAYS = 7
+
+CHUNK_ROWS = 100_000
+COMMENT_CHUNK = 20_000
+
+_NEVER = -(2 ** 62)  # last_day of a creator with no series yet
+_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+
+
+def comment_shingles(texts, k=3):
+    """(shingle_ptr, shingles) CSR of word k-gram hashes for raw comment texts"""
+    ptr = [0]
+    shingles = []
+    for text in texts:
+        words = text.lower().split()
+        grams = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))} if words else set()
+        shingles.extend(int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little")
+                        for g in grams)
+        ptr.append(len(shingles))
+    return np.array(ptr, dtype=np.int64), np.array(shingles, dtype=np.uint64)
+
+
+def minhash_signatures(shingle_ptr, shingles, permutations=MINHASH_PERMUTATIONS, seed=MINHASH_SEED):
+    """(comments, permutations) MinHash signatures; comments without shingles get all-ones rows"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=permutations, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=permutations, dtype=np.uint64)
+    shingle_ptr = np.asarray(shingle_ptr, dtype=np.int64)
+    lengths = np.diff(shingle_ptr)
+    signatures = np.full((len(lengths), permutations), np.iinfo(np.uint64).max, dtype=np.uint64)
+    present = lengths > 0
+    if present.any():
+        # Multiply-shift hashing; uint64 products wrap, which is what we want
+        hashed = (np.asarray(shingles, dtype=np.uint64)[:, None] * a + b) >> np.uint64(16)
+        signatures[present] = np.minimum.reduceat(hashed, shingle_ptr[:-1][present], axis=0)
+    return signatures
+
+
+def band_keys(signatures, owners, bands=MINHASH_BANDS):
+    """(comments, bands) uint64 keys: equal keys = same creator, same band, same band values"""
+    rows = signatures.shape[1] // bands
+    banded = signatures[:, :rows * bands].reshape(len(signatures), bands, rows)
+    keys = (banded * (_MIX[0] + np.arange(rows, dtype=np.uint64) * _MIX[2])).sum(axis=2, dtype=np.uint64)
+    keys ^= np.asarray(owners, dtype=np.uint64)[:, None] * _MIX[1]
+    keys ^= np.arange(bands, dtype=np.uint64) * _MIX[2]
+    return keys
+
+
+def _rolling(history, days):
+    """Mean, std and sample count of the WINDOW_DAYS values before each of the last ``days`` columns"""
+    valid = ~np.isnan(history)
+    values = np.where(valid, history, 0.0)
+    if days <= 4:
+        # Daily updates: summing the few windows directly beats prefix sums over the whole history
+        windows = np.lib.stride_tricks.sliding_window_view
+        values = windows(values, WINDOW_DAYS, axis=1)[:, -(days + 1):-1]
+        n = windows(valid, WINDOW_DAYS, axis=1)[:, -(days + 1):-1].sum(axis=2).astype(np.float64)
+        total, squares = values.sum(axis=2), (values * values).sum(axis=2)
+    else:
+        zero = np.zeros((len(history), 1))
+        end = np.arange(history.shape[1] - days, history.shape[1])
+        start = end - WINDOW_DAYS
+        prefix = np.hstack([zero, np.cumsum(values, axis=1)])
+        total = prefix[:, end] - prefix[:, start]
+        prefix = np.hstack([zero, np.cumsum(values * values, axis=1)])
+        squares = prefix[:, end] - prefix[:, start]
+        prefix = np.hstack([zero, np.cumsum(valid, axis=1)])
+        n = prefix[:, end] - prefix[:, start]
+    mean = np.divide(total, n, out=np.zeros_like(n), where=n > 0)
+    square = np.divide(squares, n, out=np.zeros_like(n), where=n > 0)
+    return mean, np.sqrt(np.maximum(square - mean * mean, 0.0)), n
+
+
+class FraudAnalyzer:
+    """Rolling per-creator fraud state, updated with new daily data only"""
+
+    def __init__(self, memory_days=COMMENT_MEMORY_DAYS):
+        self.memory_days = memory_days
+        self.rows = {}
+        self.ids = np.empty(0, dtype=np.int64)
+        self.last_day = np.empty(0, dtype=np.int64)
+        self.last_followers = np.empty(0)
+        self.gains = np.empty((0, WINDOW_DAYS))
+        self.engagement = np.empty((0, WINDOW_DAYS))
+        self.days = np.empty(0, dtype=np.int64)
+        self.spikes = np.empty(0, dtype=np.int64)
+        self.bot_followers = np.empty(0)
+        self.comments = np.empty(0, dtype=np.int64)
+        self.repeats = np.empty(0, dtype=np.int64)
+        self.dirty = np.empty(0, dtype=bool)
+        self._seen_keys = np.empty(0, dtype=np.uint64)
+        self._seen_days = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _rows_for(self, creator_ids):
+        """State rows for ``creator_ids``, adding rows for creators seen for the first time"""
+        creator_ids = np.asarray(creator_ids, dtype=np.int64).tolist()
+        new = [cid for cid in dict.fromkeys(creator_ids) if cid not in self.rows]
+        if new:
+            start = len(self.ids)
+            self.rows.update((cid, start + i) for i, cid in enumerate(new))
+            grow = len(new)
+            self.ids = np.concatenate([self.ids, np.array(new, dtype=np.int64)])
+            self.last_day = np.concatenate([self.last_day, np.full(grow, _NEVER)])
+            self.last_followers = np.concatenate([self.last_followers, np.full(grow, np.nan)])
+            self.gains = np.vstack([self.gains, np.full((grow, WINDOW_DAYS), np.nan)])
+            self.engagement = np.vstack([self.engagement, np.full((grow, WINDOW_DAYS), np.nan)])
+            for name in ("days", "spikes", "comments", "repeats"):
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(grow, dtype=np.int64)]))
+            self.bot_followers = np.concatenate([self.bot_followers, np.zeros(grow)])
+            self.dirty = np.concatenate([self.dirty, np.zeros(grow, dtype=bool)])
+        return np.array(list(map(self.rows.__getitem__, creator_ids)), dtype=np.int64)
+
+    def update(self, day, creator_ids, followers, engagement, comments=None):
+        """Fold in daily data for a chunk of creators.
+
+        ``followers`` and ``engagement`` are (creators, d) arrays for days
+        ``day`` .. ``day + d - 1`` (follower counts and likes + comments per
+        day; NaN = missing). Days a creator already has are skipped. After a
+        gap the first new day's gain is unknown and not evaluated.
+
+        ``comments`` is (owner_ids, shingle_ptr, shingles): each comment's
+        creator and a CSR array of its shingle hashes (comment_shingles()
+        builds one from text). They are dated to the last day of the block.
+        """
+        followers = np.atleast_2d(np.asarray(followers, dtype=np.float64))
+        engagement = np.atleast_2d(np.asarray(engagement, dtype=np.float64))
+        rows = self._rows_for(creator_ids)
+        width = followers.shape[1]
+        for lo in range(0, len(rows), CHUNK_ROWS):
+            chunk = rows[lo:lo + CHUNK_ROWS]
+            # Columns this creator has already been fed are skipped
+            skip = np.clip(self.last_day[chunk] - day + 1, 0, width)
+            for offset in np.unique(skip).tolist():
+                if offset == width:
+                    continue
+                pick = np.flatnonzero(skip == offset)
+                self._update_series(day + offset, chunk[pick], followers[lo + pick, offset:],
+                                    engagement[lo + pick, offset:])
+        if comments is not None:
+            self._update_comments(day + width - 1, *comments)
+
+    def _update_series(self, day, rows, followers, engagement):
+        days = followers.shape[1]
+        previous = np.where(self.last_day[rows] == day - 1, self.last_followers[rows], np.nan)
+        gains = np.diff(np.hstack([previous[:, None], followers]), axis=1)
+        gain_history = np.hstack([self.gains[rows], gains])
+        engagement_history = np.hstack([self.engagement[rows], engagement])
+
+        mean, std, n = _rolling(gain_history, days)
+        std = np.maximum(std, np.sqrt(np.maximum(mean, 1.0)))
+        evaluated = (n >= MIN_HISTORY_DAYS) & ~np.isnan(gains)
+        z = np.where(evaluated, (np.nan_to_num(gains) - mean) / std, 0.0)
+        spike = evaluated & (z > SPIKE_Z)
+
+        # Spike followers that came without an engagement lift are counted as bots
+        engagement_mean, _, engagement_n = _rolling(engagement_history, days)
+        lift = np.divide(engagement, engagement_mean, out=np.ones_like(engagement),
+                         where=(engagement_mean > 0) & (engagement_n > 0) & ~np.isnan(engagement))
+        unengaged = np.clip(1.0 - (lift - 1.0) / ENGAGEMENT_LIFT, 0.0, 1.0)
+        bots = np.where(spike, (gains - mean) * unengaged, 0.0).sum(axis=1)
+
+        self.gains[rows] = gain_history[:, -WINDOW_DAYS:]
+        self.engagement[rows] = engagement_history[:, -WINDOW_DAYS:]
+        latest = followers[:, -1]
+        self.last_followers[rows] = np.where(np.isnan(latest), self.last_followers[rows], latest)
+        self.last_day[rows] = day + days - 1
+        self.days[rows] += evaluated.sum(axis=1)
+        self.spikes[rows] += spike.sum(axis=1)
+        self.bot_followers[rows] += bots
+        self.dirty[rows] = True
+
+    def _update_comments(self, day, owner_ids, shingle_ptr, shingles):
+        # Forget band keys older than the memory window
+        fresh = self._seen_days > day - self.memory_days
+        self._seen_keys, self._seen_days = self._seen_keys[fresh], self._seen_days[fresh]
+
+        owners = self._rows_for(owner_ids)
+        shingle_ptr = np.asarray(shingle_ptr, dtype=np.int64)
+        for lo in range(0, len(owners), COMMENT_CHUNK):
+            hi = min(lo + COMMENT_CHUNK, len(owners))
+            ptr = shingle_ptr[lo:hi + 1]
+            signatures = minhash_signatures(ptr - ptr[0], shingles[ptr[0]:ptr[-1]])
+            keys = band_keys(signatures, self.ids[owners[lo:hi]])
+            has_text = np.diff(ptr) > 0
+
+            flat = keys.ravel()
+            _, first, inverse = np.unique(flat, return_index=True, return_inverse=True)
+            repeated = np.arange(len(flat)) != first[inverse.reshape(-1)]
+            if len(self._seen_keys):
+                at = np.minimum(np.searchsorted(self._seen_keys, flat), len(self._seen_keys) - 1)
+                repeated |= self._seen_keys[at] == flat
+            repeat = repeated.reshape(keys.shape).any(axis=1) & has_text
+
+            chunk_owners = owners[lo:hi][has_text]
+            np.add.at(self.comments, chunk_owners, 1)
+            np.add.at(self.repeats, owners[lo:hi][repeat], 1)
+            self.dirty[chunk_owners] = True
+            self._remember(keys[has_text].ravel(), day)
+
+    def _remember(self, keys, day):
+        keys = np.concatenate([self._seen_keys, keys])
+        days = np.concatenate([self._seen_days, np.full(len(keys) - len(self._seen_days), day)])
+        order = np.lexsort((-days, keys))
+        keys, days = keys[order], days[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = keys[1:] != keys[:-1]
+        self._seen_keys, self._seen_days = keys[keep], days[keep]
+
+    def indicators(self, creator_ids=None):
+        """(creator ids, (n, 3) array in FRAUD_FIELDS order); NaN where there is no data yet"""
+        rows = np.arange(len(self.ids)) if creator_ids is None else self._rows_for(creator_ids)
+        values = np.full((len(rows), len(FRAUD_FIELDS)), np.nan)
+        days, comments = self.days[rows], self.comments[rows]
+        followers = self.last_followers[rows]
+        fields = {
+            "spike_frequency": np.divide(self.spikes[rows], days, out=np.full(len(rows), np.nan),
+                                         where=days > 0),
+            "bot_ratio": np.clip(np.divide(self.bot_followers[rows], followers, out=np.full(len(rows), np.nan),
+                                           where=(days > 0) & (followers > 0)), 0.0, 1.0),
+            "repetitive_comments": np.divide(self.repeats[rows], comments, out=np.full(len(rows), np.nan),
+                                             where=comments > 0),
+        }
+        for i, field in enumerate(FRAUD_FIELDS):
+            values[:, i] = fields[field]
+        return self.ids[rows], values
+
+    def write_back(self):
+        """Push indicators of creators changed since the last write_back() into the scoring store.
+
+        Returns the number of creators updated; fields without data keep
+        their current value.
+        """
+        rows = np.flatnonzero(self.dirty)
+        if len(rows) == 0:
+            return 0
+        ids, values = self.indicators(self.ids[rows])
+        updated = marketmuse_sim.update_fraud_indicators(ids, values)
+        self.dirty[rows] = False
+        return updated
@@ -0,0 +1,249 @@
+# incremental_eval.py
+# Incremental evaluation - keeps per-creator component scores materialized per plan
+#
+# An IncrementalEvaluator scores every eligible creator once with score_columns
+# and keeps the component arrays. Only the best top_k ranking keys are kept in
+# order; the rest of the roster lives in the arrays. After that:
+#   - a creator update rescores that creator only; the top-K list takes it
+#     with insort, and a top creator that gets worse (or is removed) triggers
+#     a partition of the composite array to find its replacement,
+#   - a weight change recombines every composite from the stored components
+#     in array operations (no rescoring) and re-partitions for the new top-K.
+# Evaluators created with watch=True follow add_creator / remove_creator /
+# use_roster / set_weights in marketmuse_sim automatically.
+from bisect import bisect_left, insort
+
+import marketmuse_sim
+from creator_registry import follower_band
+from records import CreatorScore
+from stage_cache import cache_key
+
+# Component -> WEIGHTS key, in the order score_creator sums them
+COMPONENT_WEIGHTS = (
+    ("relevance", "relevance"),
+    ("audience_fit", "audience"),
+    ("engagement", "engagement"),
+    ("safety", "safety"),
+    ("consistency", "consistency"),
+)
+
+
+class IncrementalEvaluator:
+    """eval_agent for one plan, kept current as creators and weights change.
+
+    ``weights`` pins the evaluator to its own weights; by default it follows
+    the module-level WEIGHTS.
+    """
+
+    def __init__(self, task, weights=None, watch=True):
+        self.task = task
+        self.top_k = task.get("top_k", 6)
+        if self.top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {self.top_k}")
+        self.follow_global_weights = weights is None
+        self.weights = dict(weights or marketmuse_sim.WEIGHTS)
+        self.rescored = 0
+        self.rebuild()
+        if watch:
+            marketmuse_sim.watch_roster(self)
+
+    def rebuild(self):
+        """Score every eligible creator from scratch"""
+        import numpy as np
+
+        store = marketmuse_sim.get_creator_store()
+        rows = marketmuse_sim.tier_rows(store, self.task)
+        # tier_candidates falls back to the whole roster when a tier's bands are empty
+        if rows is not None and len(rows) == 0:
+            rows = None
+        self.bands = None if rows is None else marketmuse_sim.TIER_BANDS[self.task["tier"]]
+        scores = marketmuse_sim.score_columns(store, self.task, self.weights, rows)
+        rows = np.arange(len(store)) if rows is None else rows
+
+        # One slot per scored creator; slots of removed creators go inactive
+        self._store = store
+        self.components = np.column_stack([scores[component] for component, _ in COMPONENT_WEIGHTS])
+        self.composite = scores["composite"].astype(np.float64)
+        self.fraud_level = scores["fraud_level"].astype(np.int8)
+        self.alignment = scores["alignment"].astype(np.float64)
+        self.ids = store.id[rows].astype(np.int64)
+        # Store rows keep roster order, so they double as the tie-break position
+        self.positions = rows.astype(np.int64)
+        self.store_rows = rows.astype(np.int64)
+        self.active = np.ones(len(rows), dtype=bool)
+        self.size = len(rows)
+        self.slots = dict(zip(self.ids.tolist(), range(self.size)))
+        self.records = {}  # creators updated since the rebuild
+        self.rescored += self.size
+        self._select_top()
+
+    def _eligible(self, record):
+        return self.bands is None or follower_band(record["followers"]) in self.bands
+
+    def _key(self, slot):
+        return (-round(float(self.composite[slot]), 2), int(self.positions[slot]), int(self.ids[slot]))
+
+    def _select_top(self):
+        """Rebuild the sorted top-K keys from the composite array"""
+        import numpy as np
+
+        live = np.flatnonzero(self.active[:self.size])
+        rounded = np.round(self.composite[live], 2)
+        if len(live) > self.top_k:
+            kth = np.partition(-rounded, self.top_k - 1)[self.top_k - 1]
+            # np.round can differ from round() in the last place; keep a margin
+            # and order the survivors by their exact keys
+            live = live[-rounded <= kth + 0.01]
+        self.ranking = sorted(self._key(slot) for slot in live.tolist())[:self.top_k]
+
+    def _grow(self):
+        import numpy as np
+
+        capacity = max(16, 2 * len(self.ids))
+        for name in ("components", "composite", "fraud_level", "alignment", "ids",
+                     "positions", "store_rows", "active"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _slot_for(self, creator_id):
+        slot = self.slots.get(creator_id)
+        if slot is None:
+            if self.size == len(self.ids):
+                self._grow()
+            slot = self.slots[creator_id] = self.size
+            self.size += 1
+            self.ids[slot] = creator_id
+            self.positions[slot] = marketmuse_sim.REGISTRY.position(creator_id)
+            self.store_rows[slot] = -1
+        return slot
+
+    def _drop(self, creator_id):
+        """Deactivate a creator's slot; True when the top-K must be refilled"""
+        slot = self.slots.pop(creator_id, None)
+        if slot is None:
+            return False
+        self.records.pop(creator_id, None)
+        self.active[slot] = False
+        key = self._key(slot)
+        index = bisect_left(self.ranking, key)
+        if index < len(self.ranking) and self.ranking[index] == key:
+            del self.ranking[index]
+            return True
+        return False
+
+    def update_creator(self, record):
+        """Rescore one added or changed creator and reposition it in the top-K"""
+        creator_id = record["id"]
+        slot = self.slots.get(creator_id)
+        old_key = self._key(slot) if slot is not None else None
+        if not self._eligible(record):
+            if self._drop(creator_id):
+                self._select_top()
+            return
+
+        score = marketmuse_sim.score_creator(record, self.task, self.weights)
+        self.rescored += 1
+        slot = self._slot_for(creator_id)
+        self.components[slot] = [score[component] for component, _ in COMPONENT_WEIGHTS]
+        self.composite[slot] = score["composite"]
+        self.fraud_level[slot] = marketmuse_sim.FRAUD_LEVELS.index(score["fraud_risk"])
+        self.alignment[slot] = score["alignment"]
+        self.active[slot] = True
+        self.records[creator_id] = record
+
+        key = self._key(slot)
+        index = bisect_left(self.ranking, old_key) if old_key is not None else len(self.ranking)
+        if index < len(self.ranking) and self.ranking[index] == old_key:
+            del self.ranking[index]
+            if key > old_key:
+                # A top creator got worse; someone outside the top-K may now beat it
+                self._select_top()
+                return
+        if len(self.ranking) < self.top_k or key < self.ranking[-1]:
+            insort(self.ranking, key)
+            del self.ranking[self.top_k:]
+
+    def remove_creator(self, creator_id):
+        """Drop a creator from the ranking"""
+        if self._drop(creator_id):
+            self._select_top()
+
+    def set_weights(self, weights):
+        """Recombine composites from the stored components under new weights"""
+        self.weights = dict(weights)
+        w = [self.weights[weight] for _, weight in COMPONENT_WEIGHTS]
+        c = self.components
+        # Same operation order as score_columns / score_creator, so the
+        # composites match a fresh scoring bit for bit
+        self.composite = 100 * (w[0] * c[:, 0] + w[1] * c[:, 1] + w[2] * c[:, 2] +
+                                w[3] * c[:, 3] + w[4] * c[:, 4])
+        self._select_top()
+
+    def on_roster_change(self, op, record):
+        if op == "remove":
+            self.remove_creator(record["id"])
+        else:
+            self.update_creator(record)
+
+    def on_roster_reset(self):
+        self.rebuild()
+
+    def on_weights_change(self, weights):
+        if self.follow_global_weights:
+            self.set_weights(weights)
+
+    def _record(self, slot):
+        creator_id = int(self.ids[slot])
+        record = self.records.get(creator_id)
+        if record is None:
+            if creator_id in marketmuse_sim.REGISTRY:
+                record = marketmuse_sim.REGISTRY.get(creator_id)
+            else:
+                record = self._store.record(int(self.store_rows[slot]))
+        return record
+
+    def _score(self, slot):
+        components = [float(v) for v in self.components[slot]]
+        return CreatorScore(
+            *components,
+            fraud_risk=marketmuse_sim.FRAUD_LEVELS[self.fraud_level[slot]],
+            composite=float(self.composite[slot]),
+            alignment=float(self.alignment[slot]),
+        )
+
+    def top(self, k=None):
+        """eval_agent-style records for the best ``k`` creators (default top_k)"""
+        k = k or self.top_k
+        if k > self.top_k:
+            ranking = sorted(self._key(slot) for slot in self.slots.values())[:k]
+        else:
+            ranking = self.ranking[:k]
+        return [
+            marketmuse_sim._result_record(self._record(self.slots[creator_id]), self._score(self.slots[creator_id]))
+            for _, _, creator_id in ranking
+        ]
+
+    def evaluate(self, engine="python"):
+        """Same output as eval_agent(task) for the current roster and weights"""
+        top = self.top()
+        return {
+            "top": top,
+            "overlap_matrix": marketmuse_sim.calculate_overlap_matrix(
+                [r["candidate_id"] for r in top], engine=engine),
+            "overlap_factor": 0.18,  # Average overlap estimate
+            "total_evaluated": len(self.slots),
+        }
+
+
+_EVALUATORS = {}
+
+
+def evaluator_for(task, watch=True):
+    """Shared IncrementalEvaluator for a plan (created on first use)"""
+    key = cache_key("incremental", task)
+    evaluator = _EVALUATORS.get(key)
+    if evaluator is None:
+        evaluator = _EVALUATORS[key] = IncrementalEvaluator(task, watch=watch)
+    return evaluator
@@ -0,0 +1,264 @@
+# instrumentation.py
+# Per-stage timing instrumentation for the agent pipeline
+#
+# A request opens a recording(); every span() entered while it is active (in
+# the same thread, asyncio task or to_thread call - the recorder lives in a
+# contextvar) records wall time, CPU time, the net number of allocated memory
+# blocks and an item count. With tracemalloc enabled it also records net
+# allocated bytes. Outside a recording span() is a no-op, and configure(
+# enabled=False) stops run() from opening recordings at all.
+#
+# Finished recordings are folded into process-wide totals that
+# prometheus_text() renders, and can be emitted as one JSON log line per span.
+#
+# cProfile, pstats, tracemalloc and logging are imported only when profiling,
+# memory tracing or span logging is actually used.
+import contextvars
+import functools
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+LOGGER_NAME = "marketmuse.timings"
+
+SETTINGS = {
+    "enabled": True,        # run() records and attaches "timings"
+    "trace_memory": False,  # also trace allocated bytes with tracemalloc (slow)
+    "log": False,           # emit a structured log line per span
+}
+
+PROFILE_TOP_N = 25
+
+_RECORDER = contextvars.ContextVar("marketmuse_recorder", default=None)
+_PARENT = contextvars.ContextVar("marketmuse_span", default=None)
+
+_totals = {}  # span name -> [count, wall_s, cpu_s, alloc_blocks, items]
+_totals_lock = threading.Lock()
+
+
+def configure(**settings):
+    """Update SETTINGS (enabled, trace_memory, log)"""
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown instrumentation settings: {sorted(unknown)}")
+    SETTINGS.update(settings)
+
+
+class Span:
+    """Measurements for one instrumented block"""
+
+    __slots__ = ("name", "parent", "items", "wall_ms", "cpu_ms", "alloc_blocks", "alloc_bytes")
+
+    def __init__(self, name, parent, items=None):
+        self.name = name
+        self.parent = parent
+        self.items = items
+        self.wall_ms = self.cpu_ms = 0.0
+        self.alloc_blocks = 0
+        self.alloc_bytes = None
+
+    def to_dict(self):
+        record = {
+            "stage": self.name,
+            "parent": self.parent,
+            "wall_ms": round(self.wall_ms, 3),
+            "cpu_ms": round(self.cpu_ms, 3),
+            "alloc_blocks": self.alloc_blocks,
+            "items": self.items,
+        }
+        if self.alloc_bytes is not None:
+            record["alloc_bytes"] = self.alloc_bytes
+        return record
+
+
+class _NullSpan:
+    """Stand-in yielded outside a recording; attribute writes are ignored"""
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    """Spans recorded for one request"""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.spans = []
+        self.wall_ms = 0.0
+        self.profile = None
+
+    def report(self):
+        """The "timings" dict attached to run() output"""
+        report = {"total_ms": round(self.wall_ms, 3), "stages": [s.to_dict() for s in self.spans]}
+        if self.profile is not None:
+            report["profile"] = self.profile
+        return report
+
+
+@contextmanager
+def span(name, items=None):
+    """Time a block under the active recording (no-op without one).
+
+    Yields the Span, so callers can set ``.items`` once they know the count.
+    """
+    recorder = _RECORDER.get()
+    if recorder is None:
+        yield _NULL_SPAN
+        return
+    current = Span(name, _PARENT.get(), items)
+    token = _PARENT.set(name)
+    blocks = sys.getallocatedblocks()
+    traced = _traced_bytes() if recorder.trace_memory else None
+    cpu = time.thread_time()
+    wall = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.wall_ms = (time.perf_counter() - wall) * 1000
+        current.cpu_ms = (time.thread_time() - cpu) * 1000
+        current.alloc_blocks = sys.getallocatedblocks() - blocks
+        if traced is not None:
+            current.alloc_bytes = _traced_bytes() - traced
+        _PARENT.reset(token)
+        recorder.spans.append(current)
+
+
+def _traced_bytes():
+    import tracemalloc
+    return tracemalloc.get_traced_memory()[0]
+
+
+def instrumented(name=None, count=None):
+    """Decorator wrapping a function in span(); ``count(result)`` sets the item count"""
+
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _RECORDER.get() is None:
+                return fn(*args, **kwargs)
+            with span(label) as current:
+                result = fn(*args, **kwargs)
+                if count is not None:
+                    current.items = count(result)
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+@contextmanager
+def recording(profile=None):
+    """Record spans for one request; yields the Recorder (None when disabled).
+
+    ``profile=True`` also runs cProfile and adds the top functions by
+    cumulative time to the report; a string is used as a path to dump the
+    raw .prof stats to (for snakeviz / flameprof style flamegraphs).
+    """
+    if not SETTINGS["enabled"]:
+        yield None
+        return
+    recorder = Recorder(trace_memory=SETTINGS["trace_memory"])
+    started_tracing = False
+    if recorder.trace_memory:
+        import tracemalloc
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    token = _RECORDER.set(recorder)
+    wall = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        recorder.wall_ms = (time.perf_counter() - wall) * 1000
+        _RECORDER.reset(token)
+        if started_tracing:
+            tracemalloc.stop()
+        if profiler is not None:
+            recorder.profile = _profile_summary(profiler, profile)
+        _accumulate(recorder)
+        if SETTINGS["log"]:
+            log_report(recorder.report())
+
+
+def _profile_summary(profiler, profile):
+    import io
+    import pstats
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    if isinstance(profile, str):
+        stats.dump_stats(profile)
+    stats.sort_stats("cumulative")
+    rows = []
+    for func in stats.fcn_list[:PROFILE_TOP_N]:
+        calls, _, total, cumulative, _ = stats.stats[func]
+        filename, line, function = func
+        rows.append({
+            "function": f"{filename}:{line}({function})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    summary = {"top": rows}
+    if isinstance(profile, str):
+        summary["path"] = profile
+    return summary
+
+
+def _accumulate(recorder):
+    with _totals_lock:
+        for s in recorder.spans:
+            totals = _totals.setdefault(s.name, [0, 0.0, 0.0, 0, 0])
+            totals[0] += 1
+            totals[1] += s.wall_ms / 1000
+            totals[2] += s.cpu_ms / 1000
+            totals[3] += s.alloc_blocks
+            totals[4] += s.items or 0
+
+
+def log_report(report, log=None):
+    """Emit one structured (JSON) log line per span"""
+    if log is None:
+        import logging
+        log = logging.getLogger(LOGGER_NAME)
+    for stage in report["stages"]:
+        log.info(json.dumps(dict(stage, event="stage_timing")))
+
+
+def prometheus_text():
+    """Process-wide per-stage totals in the Prometheus text exposition format"""
+    metrics = (
+        ("marketmuse_stage_calls_total", "counter", "Instrumented stage executions", 0),
+        ("marketmuse_stage_wall_seconds_total", "counter", "Wall-clock time spent in the stage", 1),
+        ("marketmuse_stage_cpu_seconds_total", "counter", "CPU time spent in the stage", 2),
+        ("marketmuse_stage_alloc_blocks_total", "counter", "Net memory blocks allocated by the stage", 3),
+        ("marketmuse_stage_items_total", "counter", "Items processed by the stage", 4),
+    )
+    with _totals_lock:
+        totals = {name: list(values) for name, values in _totals.items()}
+    lines = []
+    for metric, kind, help_text, column in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name in sorted(totals):
+            lines.append(f'{metric}{{stage="{name}"}} {totals[name][column]}')
+    return "\n".join(lines) + "\n"
+
+
+def reset_totals():
+    with _totals_lock:
+        _totals.clear()
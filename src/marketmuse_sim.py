@@ -1,42 +1,45 @@
 # marketmuse_sim.py
 # Enhanced MarketMuse Multi-Agent System Simulation
+import contextlib
+import hashlib
+import heapq
+import importlib
 import json
+import sys
+import weakref
+from bisect import bisect_left
 from datetime import datetime
 
-# Agent System Prompts - Written by seasoned marketing professionals
-SYSTEM_PROMPTS = {
-    "evaluator": """Look, I'll be straight with you - after running influencer campaigns for Sephora and working with hundreds of beauty creators, I've learned to spot the real deal from the wannabes.
+from benchmark_store import BenchmarkStore
+from creator_registry import FOLLOWER_BANDS, CreatorRegistry, StoreBackedRegistry
+from instrumentation import instrumented, recording, span
+from portfolio_optimizer import solve_portfolio
+from records import Creator, CreatorScore, EvalResult, Forecast, FraudIndicators, compact_roster, plain, to_json
+from stage_cache import cache_key
 
- Here's what I actually look at:
+# Heavy or rarely needed names, loaded on first attribute access (see __getattr__) so
+# that importing this module stays cheap for processes that only decompose or score:
+# name -> module that defines it
+LAZY_ATTRIBUTES = {
+    "SYSTEM_PROMPTS": "agent_prompts",
+    "CreatorStore": "creator_store",
+    "overlap_matrix": "overlap_engine",
+    "simulate_forecast": "forecast_sim",
+    "sweep_forecast": "sensitivity_sweep",
+    "simulate_plan": "campaign_simulator",
+}
 
-* Comments that go beyond "😍😍😍" - are people asking questions? Sharing experiences?
-* Stories and random posts - that's where you see their real personality
-* Engagement patterns - I can spot bought followers from a mile away (seen it too many times!)
-* How they handle sponsored content - the good ones make it feel natural
-
-BTW, don't get me started on those "100% organic growth" claims - let's get real and find creators who actually connect with their audience.""",
-    
-    "predictor": """Okay, real talk - after blowing through a $2M influencer budget last year (learned some expensive lessons there!), I've gotten pretty good at knowing what's actually possible.
-
-Here's the deal:
-* Those 20% engagement rates everyone promises? Yeah... let's be realistic
-* I've tracked over 400 beauty campaigns - I know what numbers make sense
-* Remember that viral skincare campaign last winter? I was behind the numbers
-* Sometimes a micro-influencer outperforms a celebrity - I'll show you why
-
-No fancy algorithms here - just pure experience and real data. I'll tell you what actually works, not what looks good in a pitch deck.""",
-    
-    "optimizer": """Listen, I've survived three TikTok algorithm changes and Gen Z's shift from Instagram to BeReal and back. Here's what I've learned the hard way:
-
-Quick reality check:
-* That perfect influencer mix you planned? Might need to flip it upside down
-* Your content calendar? Let's make it flexible - trends change FAST
-* Budget allocation? I'll show you my 40-40-20 rule that saved my last campaign
-
-I've messed up enough campaigns to know what works now. Had a client blow 50K on the wrong strategy last month - not happening on my watch.
-
-I'm here to help you win, not to make your pitch deck pretty. Cool?"""}
+def __getattr__(name):
+    """Resolve LAZY_ATTRIBUTES on first use (PEP 562) and cache them as module globals"""
+    module = LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES))
 
 # Enhanced influencer data with more detailed metrics
 INFLUENCERS = [
@@ -72,8 +75,7 @@ INFLUENCERS = [
    "followers": 67000, "er": 0.052, "topics": ["clean-beauty","skincare","sustainable"],
    "aud": {"13-17":0.22, "18-24":0.61, "25-34":0.12, "35+":0.05},
    "geo": {"US": 0.42, "CA": 0.16, "UK": 0.19, "AU": 0.11, "other": 0.12},
-   "safety": "clean", "history": {"reel":0.14,"static":0.06,"story":0.10,"a"
-   "vg_views":7800},
+   "safety": "clean", "history": {"reel":0.14,"static":0.06,"story":0.10,"avg_views":7800},
    "fraud_indicators": {"spike_frequency": 0.02, "bot_ratio": 0.04, "repetitive_comments": 0.03}},
    
   {"id": 6, "name": "Dr.Aanchal.md", "handle": "@draanchal", "platform": "instagram",
@@ -110,6 +112,8 @@ INFLUENCERS = [
    "safety": "clean", "history": {"reel":0.16,"static":0.07,"story":0.12,"avg_views":4800},
    "fraud_indicators": {"spike_frequency": 0.01, "bot_ratio": 0.02, "repetitive_comments": 0.01}}
 ]
+# Held as slotted Creator records (fixed-order bucket arrays, interned topic ids)
+INFLUENCERS[:] = compact_roster(INFLUENCERS)
 
 # Campaign benchmarks for different verticals and seasons
 CAMPAIGN_HISTORY = [
@@ -117,177 +121,798 @@ CAMPAIGN_HISTORY = [
   {"id": 2, "vertical": "skincare", "season": "summer", "post_type": "reel", "avg_cpm": 7.2, "avg_ctr": 0.016, "avg_cvr": 0.028},
   {"id": 3, "vertical": "beauty", "season": "winter", "post_type": "static", "avg_cpm": 6.8, "avg_ctr": 0.008, "avg_cvr": 0.018}
 ]
+# Benchmark cube seeded from CAMPAIGN_HISTORY; ingest_campaign_results() calibrates it with post-level results
+BENCHMARKS = BenchmarkStore.from_benchmarks(CAMPAIGN_HISTORY)
 
 # Evaluation weights for composite scoring
 WEIGHTS = {"relevance":0.35,"audience":0.30,"engagement":0.20,"safety":0.10,"consistency":0.05}
 
+# Topic scoring rules shared by the per-creator and columnar evaluation paths
+VERTICAL_TOPIC_POINTS = {
+    "skincare": [("skincare", 2), ("dermatology", 1.5)],
+    "beauty": [("beauty", 2), ("skincare", 1)],
+}
+SUSTAINABILITY_TOPICS = ["sustainable", "eco", "eco-friendly", "cruelty-free", "clean-beauty", "zero-waste"]
+ALIGNMENT_TOPICS = ["sustainable", "cruelty-free", "dermatologist-tested", "eco-friendly", "clean-beauty"]
+SAFETY_SCORES = {"clean": 1.0, "minor-flags": 0.7}
+FRAUD_LEVELS = ["low", "medium", "high"]
+
+# Follower bands considered for each decompose() tier; None means every creator
+TIER_BANDS = {"micro": ["micro"], "mixed": None}
+
+# Id and secondary indexes over INFLUENCERS; kept in sync by add_creator/remove_creator
+REGISTRY = CreatorRegistry(INFLUENCERS)
+
+# REGISTRY.position of each INFLUENCERS entry (ascending), so a creator's list
+# slot is found by bisection; derived on first use, None after a roster swap
+_ROSTER_POSITIONS = None
+
+# Columnar view of INFLUENCERS, built on first use by the "columnar" engine
+_CREATOR_STORE = None
+
+# Bump when scoring/forecast logic changes so cached stage outputs are not reused
+CACHE_SCHEMA_VERSION = 1
+
+# StageCache used by run() when no cache is passed explicitly (None = no caching)
+STAGE_CACHE = None
+
+# Content digest of INFLUENCERS, computed on first use and chained on every change
+_ROSTER_DIGEST = None
+
+# Store installed by use_creator_store whose content digest is not yet folded into _ROSTER_DIGEST
+_UNHASHED_STORE = None
+
+# Objects (e.g. IncrementalEvaluators) told about roster and WEIGHTS changes
+_ROSTER_WATCHERS = weakref.WeakSet()
+
+def _digest(value):
+    """Short content hash of a JSON-serializable value"""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=to_json)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def roster_version():
+    """Version stamp of the creator roster and any store installed with use_creator_store
+
+    Identical rosters share a stamp.
+    """
+    global _ROSTER_DIGEST, _UNHASHED_STORE
+    if _ROSTER_DIGEST is None:
+        hasher = hashlib.sha256()
+        for inf in roster_records():
+            hasher.update(json.dumps(inf, sort_keys=True, default=to_json).encode("utf-8"))
+        _ROSTER_DIGEST = hasher.hexdigest()[:16]
+    if _UNHASHED_STORE is not None:
+        _ROSTER_DIGEST = _digest([_ROSTER_DIGEST, "store", _UNHASHED_STORE.digest()])
+        _UNHASHED_STORE = None
+    return _ROSTER_DIGEST
+
+def roster_records():
+    """The full roster; when it is served from a snapshot, INFLUENCERS is built on this first call"""
+    global _ROSTER_POSITIONS
+    if not INFLUENCERS and isinstance(REGISTRY, StoreBackedRegistry):
+        INFLUENCERS[:] = REGISTRY.records()
+        _ROSTER_POSITIONS = None
+    return INFLUENCERS
+
+def _roster_index(creator_id):
+    """Slot of a registered creator in INFLUENCERS (bisects roster positions, no list scan)"""
+    global _ROSTER_POSITIONS
+    record = REGISTRY.get(creator_id)
+    for _ in range(2):
+        if _ROSTER_POSITIONS is None or len(_ROSTER_POSITIONS) != len(INFLUENCERS):
+            _ROSTER_POSITIONS = [REGISTRY.position(inf["id"]) for inf in INFLUENCERS]
+        index = bisect_left(_ROSTER_POSITIONS, REGISTRY.position(creator_id))
+        if index < len(INFLUENCERS) and INFLUENCERS[index] is record:
+            return index
+        # INFLUENCERS was edited behind REGISTRY's back; derive the positions again
+        _ROSTER_POSITIONS = None
+    raise RuntimeError(f"INFLUENCERS is out of sync with REGISTRY for creator {creator_id}")
+
+def _roster_changed(op, record):
+    """Refresh derived state after a roster edit and drop dependent cache entries"""
+    global _CREATOR_STORE, _ROSTER_DIGEST
+    _CREATOR_STORE = None
+    if _ROSTER_DIGEST is not None:
+        _ROSTER_DIGEST = _digest([_ROSTER_DIGEST, op, record])
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"roster", f"creator:{record['id']}"})
+    for watcher in list(_ROSTER_WATCHERS):
+        watcher.on_roster_change(op, record)
+
+def watch_roster(watcher):
+    """Call watcher.on_roster_change / on_roster_reset / on_weights_change on data edits"""
+    _ROSTER_WATCHERS.add(watcher)
+
+def add_creator(record):
+    """Add a creator to the roster (or replace the one with the same id)"""
+    record = Creator.from_dict(record)
+    roster_records()
+    if record["id"] in REGISTRY:
+        INFLUENCERS[_roster_index(record["id"])] = record
+        REGISTRY.add(record)
+    else:
+        INFLUENCERS.append(record)
+        REGISTRY.add(record)
+        if _ROSTER_POSITIONS is not None:
+            _ROSTER_POSITIONS.append(REGISTRY.position(record["id"]))
+    _roster_changed("add", record)
+
+def remove_creator(creator_id):
+    """Remove a creator from the roster by id"""
+    roster_records()
+    index = _roster_index(creator_id)
+    record = REGISTRY.remove(creator_id)
+    # Deleting by index keeps roster order and never compares records
+    del INFLUENCERS[index]
+    del _ROSTER_POSITIONS[index]
+    _roster_changed("remove", record)
+    return record
+
+def use_roster(records):
+    """Replace the whole roster (e.g. with records from roster_loader).
+
+    Raises ValueError, leaving the current roster in place, when two records
+    share an id.
+    """
+    global _CREATOR_STORE, _ROSTER_DIGEST, _UNHASHED_STORE, _ROSTER_POSITIONS, REGISTRY
+    roster = compact_roster(records)
+    registry = CreatorRegistry(roster)
+    if len(registry) != len(roster):
+        seen = set()
+        duplicate = next(r["id"] for r in roster if r["id"] in seen or seen.add(r["id"]))
+        raise ValueError(f"Duplicate creator id in roster: {duplicate}")
+    INFLUENCERS[:] = roster
+    REGISTRY = registry
+    _ROSTER_POSITIONS = None
+    _CREATOR_STORE = None
+    _ROSTER_DIGEST = None
+    _UNHASHED_STORE = None
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"roster"} | {f"creator:{inf['id']}" for inf in INFLUENCERS})
+    for watcher in list(_ROSTER_WATCHERS):
+        watcher.on_roster_reset()
+
+def load_roster_file(path):
+    """Load a NDJSON/CSV roster file (optionally .gz) into the simulation.
+
+    Returns the roster_loader LoadReport; malformed rows are skipped.
+    """
+    from roster_loader import load_records
+    records, report = load_records(path, compact=True)
+    use_roster(records)
+    return report
+
+def set_weights(weights):
+    """Replace the composite-score WEIGHTS and drop cached evaluations"""
+    WEIGHTS.clear()
+    WEIGHTS.update(weights)
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"weights"})
+    for watcher in list(_ROSTER_WATCHERS):
+        watcher.on_weights_change(WEIGHTS)
+
+# Above this many changed creators, watchers are reset instead of told creator by creator
+FRAUD_UPDATE_RESET = 1000
+
+def update_fraud_indicators(creator_ids, values):
+    """Overwrite fraud_indicators in place for many creators (e.g. from fraud_analysis).
+
+    ``values`` is an (n, 3) array in FRAUD_FIELDS order; NaN keeps the
+    current value. Both the roster records and the columnar store (when
+    built) are updated, so no store rebuild is needed. Ids in neither are
+    ignored. Watchers are reset when a store row without a roster record
+    changed, since no per-record notice covers it. Returns the number of
+    creators updated.
+    """
+    import numpy as np
+    global _ROSTER_DIGEST
+    creator_ids = [int(cid) for cid in creator_ids]
+    values = np.asarray(values, dtype=np.float64).reshape(len(creator_ids), -1)
+
+    known = [i for i, cid in enumerate(creator_ids) if cid in REGISTRY]
+    current = np.array([REGISTRY.get(creator_ids[i])["fraud_indicators"].values() for i in known],
+                       dtype=np.float64).reshape(len(known), values.shape[1])
+    merged = np.where(np.isnan(values[known]), current, values[known])
+    records = []
+    for i, row in zip(known, merged.tolist()):
+        record = REGISTRY.get(creator_ids[i])
+        record["fraud_indicators"] = FraudIndicators(row)
+        records.append(record)
+
+    updated = len(known)
+    store_only = False
+    store = _CREATOR_STORE
+    if store is not None:
+        rows = store.rows_for(creator_ids, missing=-1)
+        found = rows >= 0
+        if not store.fraud.flags.writeable:
+            # Memory-mapped snapshots are read-only; keep a private copy of the column
+            store.columns["fraud"] = np.array(store.fraud)
+        store.fraud[rows[found]] = np.where(np.isnan(values[found]), store.fraud[rows[found]], values[found])
+        updated = max(updated, int(found.sum()))
+        # Rows with no roster record (e.g. from use_creator_store) get no per-record notice
+        recorded = {creator_ids[i] for i in known}
+        store_only = any(cid not in recorded for cid in np.asarray(creator_ids)[found].tolist())
+
+    if _ROSTER_DIGEST is not None:
+        _ROSTER_DIGEST = _digest([_ROSTER_DIGEST, "fraud",
+                                  hashlib.sha256(np.asarray(creator_ids).tobytes() + values.tobytes()).hexdigest()])
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"roster"} | {f"creator:{cid}" for cid in creator_ids})
+    for watcher in list(_ROSTER_WATCHERS):
+        if len(records) > FRAUD_UPDATE_RESET or store_only:
+            watcher.on_roster_reset()
+        else:
+            for record in records:
+                watcher.on_roster_change("update", record)
+    return updated
+
+def benchmark_for(vertical, season, **dims):
+    """Benchmark for a vertical and season (plus optional post_type, platform,
+    follower_band, region) from BENCHMARKS, falling back to coarser cells
+    when a cell has too few samples"""
+    return BENCHMARKS.lookup(vertical=vertical, season=season, **dims)
+
+def set_campaign_history(rows):
+    """Replace the CAMPAIGN_HISTORY benchmarks (and any ingested results) and drop cached forecasts"""
+    global BENCHMARKS
+    CAMPAIGN_HISTORY[:] = rows
+    BENCHMARKS = BenchmarkStore.from_benchmarks(CAMPAIGN_HISTORY)
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"campaign_history"})
+
+def ingest_campaign_results(rows):
+    """Append post-level campaign results to BENCHMARKS and drop cached forecasts.
+
+    ``rows`` is an iterable of result dicts or a path to an NDJSON/CSV
+    export (see benchmark_store); returns the number of rows added.
+    """
+    if isinstance(rows, (str, bytes)) or hasattr(rows, "__fspath__"):
+        added = BENCHMARKS.ingest_file(rows)
+    else:
+        added = BENCHMARKS.ingest(rows)
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"campaign_history"})
+    return added
+
+def tier_candidates(tier):
+    """Creators eligible for a tier, via the follower-band index.
+
+    Falls back to the full roster when the tier has no band filter or no
+    creator falls into its bands.
+    """
+    bands = TIER_BANDS.get(tier)
+    if bands is None:
+        return roster_records()
+    return REGISTRY.select(bands=bands) or roster_records()
+
 def decompose(query: str):
-    """Extract key parameters from query and set up task structure"""
-    # Simple keyword extraction - in production would use NLP
-    is_micro = "micro" in query.lower() or "10k" in query or "100k" in query
-    is_sustainable = "sustainable" in query.lower() or "eco" in query.lower()
-    is_genz = "gen z" in query.lower() or "genz" in query.lower()
-    
+    """Extract key parameters from query and set up task structure
+
+    The brief is parsed in one pass by query_parser's compiled keyword
+    matcher and regexes; anything it does not state keeps the defaults
+    below. "targeting" lists the regions (geo keys), platforms and roster
+    topics it mentions; no agent reads it, so it never splits batch plans.
+    The vertical is copied into "predict" so forecasts use its benchmarks, and
+    the portfolio constraints too, so the mix comparison solves the same
+    portfolio optimize_agent books.
+    """
+    from query_parser import parse_brief
+    brief = parse_brief(query)
+    constraints = {
+        "budget_inr": brief.get("budget_inr", 500000),
+        "target_unique_reach": brief.get("target_unique_reach", 0.80)
+    }
+
     return {
         "evaluate": {
-            "vertical": "skincare" if "skincare" in query.lower() else "beauty",
-            "audience": "genz" if is_genz else "general",
-            "tier": "micro" if is_micro else "mixed",
-            "sustainability_focus": is_sustainable
+            "vertical": brief.get("vertical", "beauty"),
+            "audience": brief.get("audience", "general"),
+            "tier": brief.get("tier", "mixed"),
+            "sustainability_focus": brief.get("sustainable", False)
         },
         "predict": {
-            "duration_weeks": 3,
-            "posts_per_creator": 2,
-            "stories_per_creator": 2,
+            "vertical": brief.get("vertical", "beauty"),
+            "duration_weeks": brief.get("duration_weeks", 3),
+            "posts_per_creator": brief.get("posts_per_creator", 2),
+            "stories_per_creator": brief.get("stories_per_creator", 2),
             "baseline_cvr": 0.025,
-            "season": "winter"  # Could be extracted from timing
+            "season": brief.get("season", "winter"),
+            **constraints
         },
-        "optimize": {
-            "budget_inr": 500000,
-            "target_unique_reach": 0.80
+        "optimize": dict(constraints),
+        "targeting": {
+            "regions": brief.get("regions", []),
+            "platforms": brief.get("platforms", []),
+            "topics": brief.get("topics", [])
         }
     }
 
-def eval_agent(task):
-    """Influencer Evaluation Agent - scores and ranks influencers"""
-    results = []
+def get_creator_store():
+    """Return the columnar store for INFLUENCERS, building it on first use"""
+    global _CREATOR_STORE
+    if _CREATOR_STORE is None:
+        from creator_store import CreatorStore
+        _CREATOR_STORE = CreatorStore.from_records(roster_records())
+    return _CREATOR_STORE
+
+def use_creator_snapshot(path, roster_file=None, verify=True):
+    """Serve the columnar engine from a memory-mapped snapshot of the roster.
+
+    Without ``roster_file`` the snapshot must match the loaded INFLUENCERS
+    (by roster_version()). With ``roster_file`` (a roster_loader export) it
+    is checked against that file's path, size and mtime instead, and a
+    fresh snapshot becomes the roster without the file being parsed:
+    records are built from the mapped rows only when looked up. A stale
+    snapshot (or one for another schema version) is rebuilt and rewritten.
+
+    ``verify`` checksums an existing snapshot's data region once, as it is
+    installed; a corrupt one is rebuilt like a stale one. Snapshots written
+    here are not re-read.
+    """
+    from roster_snapshot import SnapshotError, open_snapshot, source_stamp, write_snapshot
+    if roster_file is None:
+        try:
+            store = open_snapshot(path, expected_digest=roster_version(), verify=verify)
+        except SnapshotError:
+            write_snapshot(get_creator_store(), path, roster_digest=roster_version(), extras=_roster_extras())
+            store = open_snapshot(path, expected_digest=roster_version())
+        return _install_store(store)
+
+    stamp = source_stamp(roster_file)
+    try:
+        store = open_snapshot(path, expected_source=stamp, verify=verify)
+    except SnapshotError:
+        load_roster_file(roster_file)
+        write_snapshot(get_creator_store(), path, roster_digest=roster_version(), source=stamp,
+                       extras=_roster_extras())
+        return _install_store(open_snapshot(path, expected_source=stamp))
+    _use_snapshot_roster(store)
+    return store
+
+def _roster_extras():
+    """Non-schema record fields (e.g. "rate_inr" cards) by roster position"""
+    return {row: dict(inf.extra) for row, inf in enumerate(roster_records()) if inf.extra}
+
+def _use_snapshot_roster(store):
+    """Replace the roster with a mapped snapshot's rows, building records lazily"""
+    global _CREATOR_STORE, _ROSTER_DIGEST, _UNHASHED_STORE, _ROSTER_POSITIONS, REGISTRY
+    extras = store.header.get("extras", {})
+
+    def build(row):
+        return Creator.from_dict(dict(store.record(row), **extras.get(str(row), {})))
+
+    INFLUENCERS.clear()
+    REGISTRY = StoreBackedRegistry(store, build)
+    _ROSTER_POSITIONS = None
+    _CREATOR_STORE = store
+    _ROSTER_DIGEST = store.header["roster_digest"]
+    _UNHASHED_STORE = None
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"roster"})
+    for watcher in list(_ROSTER_WATCHERS):
+        watcher.on_roster_reset()
+
+def use_creator_store(store):
+    """Serve the columnar engine from an already built CreatorStore.
+
+    The store replaces the one derived from INFLUENCERS until the roster
+    next changes; predict/optimize still look creators up in REGISTRY.
+    Its content digest is folded into roster_version() (on the next call),
+    so cached stages and snapshots keyed on the old roster stop matching,
+    and watchers are reset.
+    """
+    global _UNHASHED_STORE
+    _install_store(store)
+    _UNHASHED_STORE = store
+    if STAGE_CACHE is not None:
+        STAGE_CACHE.invalidate({"roster"})
+    for watcher in list(_ROSTER_WATCHERS):
+        watcher.on_roster_reset()
+    return store
+
+def _install_store(store):
+    """Swap in a store already known to match the roster (e.g. a checked snapshot)"""
+    global _CREATOR_STORE
+    _CREATOR_STORE = store
+    return store
+
+def score_columns(store, task, weights=None, rows=None):
+    """Vectorized scoring of the creators in a CreatorStore.
+
+    Mirrors the per-creator rules in score_creator and returns one array per
+    component plus the composite score. ``rows`` restricts scoring to those
+    store rows; the returned arrays are then aligned with ``rows``.
+    """
+    import numpy as np
+
+    def take(column):
+        return column if rows is None else column[rows]
+
+    weights = weights or WEIGHTS
+    topic_match_count = np.zeros(len(store) if rows is None else len(rows))
+    for topic, points in VERTICAL_TOPIC_POINTS.get(task["vertical"], []):
+        topic_match_count += points * take(store.has_topic(topic))
+    sustainability_bonus = 0
+    if task.get("sustainability_focus", False):
+        sustainability_bonus = 0.3 * take(store.count_topics(SUSTAINABILITY_TOPICS))
+    relevance = np.minimum(1.0, topic_match_count * 0.3 + sustainability_bonus)
+
+    aud = take(store.aud)
+    if task["audience"] == "genz":
+        audience_fit = aud[:, 1] + aud[:, 0] * 0.7 - aud[:, 3] * 0.5
+    else:
+        audience_fit = aud[:, 1] + aud[:, 2] * 0.8
+    audience_fit = np.clip(audience_fit, 0, 1)
+
+    engagement = np.minimum(1.0, take(store.er) / 0.06)
+    safety_by_code = np.array([SAFETY_SCORES.get(label, 0.3) for label in store.safety_labels])
+    safety = safety_by_code[take(store.safety)]
+    consistency = np.minimum(1.0, take(store.history[:, 0]) / 0.15)
+
+    fraud = take(store.fraud)
+    fraud_score = fraud[:, 0] * 0.4 + fraud[:, 1] * 0.4 + fraud[:, 2] * 0.2
+    fraud_level = (fraud_score > 0.05).astype(np.int8) + (fraud_score > 0.1)
+    safety = safety * np.array([1.0, 0.8, 0.5])[fraud_level]
+
+    composite = 100 * (
+        weights["relevance"] * relevance +
+        weights["audience"] * audience_fit +
+        weights["engagement"] * engagement +
+        weights["safety"] * safety +
+        weights["consistency"] * consistency
+    )
+    alignment = 0.25 * take(store.count_topics(ALIGNMENT_TOPICS))
+
+    return {
+        "relevance": relevance,
+        "audience_fit": audience_fit,
+        "engagement": engagement,
+        "safety": safety,
+        "consistency": consistency,
+        "fraud_level": fraud_level,
+        "composite": composite,
+        "alignment": alignment,
+    }
+
+def _columnar_record(store, scores, i, row):
+    """Build one eval_agent EvalResult from scores[i], which scored store row ``row``"""
+    topics = store.topics(row)
+    return EvalResult(
+        candidate_id=int(store.id[row]),
+        name=store.names[row],
+        handle=store.handles[row],
+        composite_score=round(float(scores["composite"][i]), 2),
+        topic_score=round(float(scores["relevance"][i]), 2),
+        audience_fit=round(float(scores["audience_fit"][i]), 2),
+        engagement_quality=float(store.er[row]),
+        brand_safety=store.safety_label(row),
+        fraud_risk=FRAUD_LEVELS[scores["fraud_level"][i]],
+        alignment_score=round(float(scores["alignment"][i]), 2),
+        followers=int(store.followers[row]),
+        notes=f"Strong in {', '.join(topics[:2])}" if len(topics) > 0 else "General content"
+    )
+
+def _round_scores(values, digits=2):
+    """np.round(values, digits), but agreeing with round() on every value.
+
+    np.round scales by 10**digits and can land on the other side of a half
+    (57.574999... -> 57.58), which reorders ties against the python engine;
+    values that close to a half are rounded with round() instead.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    near_half = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if len(near_half):
+        rounded[near_half] = [round(value, digits) for value in values[near_half].tolist()]
+    return rounded
+
+def _top_k_rows(scores, k):
+    """Row indices of the k highest scores, best first, ties in roster order.
+
+    Uses argpartition so only the survivors (plus any ties at the cut-off)
+    are sorted, instead of the whole score array.
+    """
+    import numpy as np
+
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    cut = np.argpartition(-scores, k - 1)[:k]
+    candidates = np.flatnonzero(scores >= scores[cut].min())
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order[:k]]
+
+def tier_rows(store, task):
+    """Store rows in the task's follower bands (None when the tier keeps everyone)"""
+    import numpy as np
+
+    bands = TIER_BANDS.get(task.get("tier"))
+    if bands is None:
+        return None
+    # Prefilter on follower band before scoring (same bands as the registry)
+    lower_bounds = [low for _, low, _ in FOLLOWER_BANDS]
+    band_names = [name for name, _, _ in FOLLOWER_BANDS]
+    band_codes = np.searchsorted(lower_bounds, store.followers, side="right") - 1
+    wanted = [band_names.index(band) for band in bands]
+    return np.flatnonzero(np.isin(band_codes, wanted))
+
+def _eval_columnar(task, top_k):
+    """Columnar eval_agent path - scores the whole roster in array operations"""
+    import numpy as np
+
+    store = get_creator_store()
+    rows = tier_rows(store, task)
+    if rows is not None and len(rows) == 0:
+        rows = None
+
+    scores = score_columns(store, task, rows=rows)
+    best = _top_k_rows(_round_scores(scores["composite"]), top_k)
+    top_results = [
+        _columnar_record(store, scores, i, i if rows is None else rows[i])
+        for i in best
+    ]
+    return top_results, len(scores["composite"])
+
+def score_creator(inf, task, weights=None):
+    """Score a single creator - returns the component scores and composite"""
+    weights = weights or WEIGHTS
+    # Topic names and audience buckets are looked up repeatedly below
+    topics = set(inf["topics"])
+    aud = inf["aud"]
+
+    # Topic relevance scoring
+    topic_match_count = 0
+    sustainability_bonus = 0
     
-    for inf in INFLUENCERS:
-        # Topic relevance scoring
-        topic_match_count = 0
-        sustainability_bonus = 0
-        
-        if task["vertical"] == "skincare":
-            if "skincare" in inf["topics"]:
-                topic_match_count += 2
-            if "dermatology" in inf["topics"]:
-                topic_match_count += 1.5
-        elif task["vertical"] == "beauty":
-            if "beauty" in inf["topics"]:
-                topic_match_count += 2
-            if "skincare" in inf["topics"]:
-                topic_match_count += 1
-                
-        if task.get("sustainability_focus", False):
-            sustainability_topics = ["sustainable", "eco", "eco-friendly", "cruelty-free", "clean-beauty", "zero-waste"]
-            sustainability_bonus = sum(0.3 for topic in sustainability_topics if topic in inf["topics"])
-            
-        relevance_score = min(1.0, (topic_match_count * 0.3 + sustainability_bonus))
-        
-        # Audience fit for Gen Z (16-26, focusing on 18-24)
-        if task["audience"] == "genz":
-            genz_core = inf["aud"]["18-24"]  # Core Gen Z
-            genz_extended = inf["aud"]["13-17"] * 0.7  # Younger Gen Z
-            penalty = inf["aud"]["35+"] * 0.5  # Penalty for older audience
-            audience_fit = genz_core + genz_extended - penalty
-        else:
-            audience_fit = inf["aud"]["18-24"] + inf["aud"]["25-34"] * 0.8
+    for topic, points in VERTICAL_TOPIC_POINTS.get(task["vertical"], []):
+        if topic in topics:
+            topic_match_count += points
             
-        audience_fit = max(0, min(1, audience_fit))
+    if task.get("sustainability_focus", False):
+        sustainability_bonus = sum(0.3 for topic in SUSTAINABILITY_TOPICS if topic in topics)
         
-        # Engagement quality (normalized ER)
-        engagement_quality = min(1.0, inf["er"] / 0.06)  # Normalize against 6% as excellent
-        
-        # Brand safety scoring
-        safety_score = 1.0 if inf["safety"] == "clean" else 0.7 if inf["safety"] == "minor-flags" else 0.3
-        
-        # Consistency (based on reel performance)
-        consistency_score = min(1.0, inf["history"]["reel"] / 0.15)
-        
-        # Fraud risk assessment
-        fraud_indicators = inf["fraud_indicators"]
-        fraud_risk_score = (
-            fraud_indicators["spike_frequency"] * 0.4 +
-            fraud_indicators["bot_ratio"] * 0.4 +
-            fraud_indicators["repetitive_comments"] * 0.2
-        )
-        
-        if fraud_risk_score > 0.1:
-            fraud_risk = "high"
-            safety_score *= 0.5
-        elif fraud_risk_score > 0.05:
-            fraud_risk = "medium"
-            safety_score *= 0.8
-        else:
-            fraud_risk = "low"
-            
-        # Composite score calculation
-        composite = 100 * (
-            WEIGHTS["relevance"] * relevance_score +
-            WEIGHTS["audience"] * audience_fit +
-            WEIGHTS["engagement"] * engagement_quality +
-            WEIGHTS["safety"] * safety_score +
-            WEIGHTS["consistency"] * consistency_score
-        )
+    relevance_score = min(1.0, (topic_match_count * 0.3 + sustainability_bonus))
+    
+    # Audience fit for Gen Z (16-26, focusing on 18-24)
+    if task["audience"] == "genz":
+        genz_core = aud["18-24"]  # Core Gen Z
+        genz_extended = aud["13-17"] * 0.7  # Younger Gen Z
+        penalty = aud["35+"] * 0.5  # Penalty for older audience
+        audience_fit = genz_core + genz_extended - penalty
+    else:
+        audience_fit = aud["18-24"] + aud["25-34"] * 0.8
         
-        # Brand value alignment for sustainability
-        alignment_topics = ["sustainable", "cruelty-free", "dermatologist-tested", "eco-friendly", "clean-beauty"]
-        alignment_score = sum(0.25 for topic in alignment_topics if topic in inf["topics"])
+    audience_fit = max(0, min(1, audience_fit))
+    
+    # Engagement quality (normalized ER)
+    engagement_quality = min(1.0, inf["er"] / 0.06)  # Normalize against 6% as excellent
+    
+    # Brand safety scoring
+    safety_score = SAFETY_SCORES.get(inf["safety"], 0.3)
+    
+    # Consistency (based on reel performance)
+    consistency_score = min(1.0, inf["history"]["reel"] / 0.15)
+    
+    # Fraud risk assessment
+    fraud_indicators = inf["fraud_indicators"]
+    fraud_risk_score = (
+        fraud_indicators["spike_frequency"] * 0.4 +
+        fraud_indicators["bot_ratio"] * 0.4 +
+        fraud_indicators["repetitive_comments"] * 0.2
+    )
+    
+    if fraud_risk_score > 0.1:
+        fraud_risk = "high"
+        safety_score *= 0.5
+    elif fraud_risk_score > 0.05:
+        fraud_risk = "medium"
+        safety_score *= 0.8
+    else:
+        fraud_risk = "low"
         
-        results.append({
-            "candidate_id": inf["id"],
-            "name": inf["name"],
-            "handle": inf["handle"],
-            "composite_score": round(composite, 2),
-            "topic_score": round(relevance_score, 2),
-            "audience_fit": round(audience_fit, 2),
-            "engagement_quality": inf["er"],
-            "brand_safety": inf["safety"],
-            "fraud_risk": fraud_risk,
-            "alignment_score": round(alignment_score, 2),
-            "followers": inf["followers"],
-            "notes": f"Strong in {', '.join(inf['topics'][:2])}" if len(inf['topics']) > 0 else "General content"
-        })
+    # Composite score calculation
+    composite = 100 * (
+        weights["relevance"] * relevance_score +
+        weights["audience"] * audience_fit +
+        weights["engagement"] * engagement_quality +
+        weights["safety"] * safety_score +
+        weights["consistency"] * consistency_score
+    )
+    
+    # Brand value alignment for sustainability
+    alignment_score = sum(0.25 for topic in ALIGNMENT_TOPICS if topic in topics)
     
-    # Sort by composite score and take top performers
-    results.sort(key=lambda x: x["composite_score"], reverse=True)
-    top_results = results[:6]  # Top 6 for analysis
+    return CreatorScore(
+        relevance=relevance_score,
+        audience_fit=audience_fit,
+        engagement=engagement_quality,
+        safety=safety_score,
+        consistency=consistency_score,
+        fraud_risk=fraud_risk,
+        composite=composite,
+        alignment=alignment_score,
+    )
+
+def _result_record(inf, score):
+    """Build the eval_agent EvalResult for one scored creator"""
+    return EvalResult(
+        candidate_id=inf["id"],
+        name=inf["name"],
+        handle=inf["handle"],
+        composite_score=round(score["composite"], 2),
+        topic_score=round(score["relevance"], 2),
+        audience_fit=round(score["audience_fit"], 2),
+        engagement_quality=inf["er"],
+        brand_safety=inf["safety"],
+        fraud_risk=score["fraud_risk"],
+        alignment_score=round(score["alignment"], 2),
+        followers=inf["followers"],
+        notes=f"Strong in {', '.join(inf['topics'][:2])}" if len(inf['topics']) > 0 else "General content"
+    )
+
+def eval_agent(task, engine="python", on_ranking=None):
+    """Influencer Evaluation Agent - scores and ranks influencers
+
+    ``on_ranking`` is called with the ranking before the overlap matrix is
+    built, so streaming callers can report the top creators early.
+    """
+    ranking = rank_creators(task, engine=engine)
+    if on_ranking is not None:
+        on_ranking(ranking)
     
     # Calculate audience overlap matrix for top performers
-    overlap_matrix = calculate_overlap_matrix([r["candidate_id"] for r in top_results])
+    overlap_matrix = calculate_overlap_matrix([r["candidate_id"] for r in ranking["top"]], engine=engine)
     
     return {
-        "top": top_results,
+        "top": ranking["top"],
         "overlap_matrix": overlap_matrix,
+        "overlap_factor": ranking["overlap_factor"],
+        "total_evaluated": ranking["total_evaluated"]
+    }
+
+@instrumented(count=lambda ranking: ranking["total_evaluated"])
+def rank_creators(task, engine="python"):
+    """Ranking half of eval_agent (everything but the overlap matrix)
+
+    Only the best task["top_k"] creators (default 6) are kept: the per-creator
+    loop streams scores through a bounded heap, and engine="columnar" scores
+    the roster in batched NumPy operations and partitions the score array.
+    engine="parallel" runs the columnar scoring on roster shards across a
+    process pool (parallel_scoring) and merges the per-shard top-K.
+    Result dicts are built for the survivors only.
+    """
+    top_k = task.get("top_k", 6)
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+
+    if engine == "columnar":
+        top_results, total_evaluated = _eval_columnar(task, top_k)
+    elif engine == "parallel":
+        from parallel_scoring import rank_parallel
+        top_results, total_evaluated = rank_parallel(task, top_k)
+    else:
+        # Min-heap of the best top_k; ties evict the later roster position so
+        # the ranking matches a stable sort on the rounded composite score
+        heap = []
+        total_evaluated = 0
+        for position, inf in enumerate(tier_candidates(task.get("tier"))):
+            score = score_creator(inf, task)
+            # -position is unique, so tuple comparison never reaches the dicts
+            entry = (round(score["composite"], 2), -position, inf, score)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+            total_evaluated += 1
+        
+        # Sort the survivors by composite score, best first
+        heap.sort(reverse=True)
+        top_results = [_result_record(inf, score) for _, _, inf, score in heap]
+    
+    return {
+        "top": top_results,
         "overlap_factor": 0.18,  # Average overlap estimate
-        "total_evaluated": len(results)
+        "total_evaluated": total_evaluated
     }
 
-def calculate_overlap_matrix(creator_ids):
-    """Calculate audience overlap between creators"""
+@instrumented(count=len)
+def calculate_overlap_matrix(creator_ids, engine="python"):
+    """Calculate audience overlap between creators
+
+    engine="columnar" (or "parallel") computes the same matrix with the
+    blocked NumPy overlap engine (upper triangle only) over the CreatorStore.
+    """
+    if engine in ("columnar", "parallel"):
+        from overlap_engine import as_nested_dict, overlap_matrix
+        store = get_creator_store()
+        return as_nested_dict(creator_ids, overlap_matrix(store, store.rows_for(creator_ids)))
+
+    return overlap_for_records([REGISTRY.get(creator_id) for creator_id in creator_ids])
+
+def pair_overlap(inf1, inf2):
+    """Audience overlap between two creator records"""
+    # Simulate overlap based on topic similarity
+    common_topics = set(inf1["topics"]) & set(inf2["topics"])
+    topic_overlap = len(common_topics) / (max(len(inf1["topics"]), len(inf2["topics"])) or 1)
+    
+    # Add geographic and demographic overlap factors
+    geo_overlap = sum(min(inf1["geo"][region], inf2["geo"][region]) for region in inf1["geo"])
+    demo_overlap = sum(min(inf1["aud"][age], inf2["aud"][age]) for age in inf1["aud"])
+    
+    return (topic_overlap * 0.4 + geo_overlap * 0.3 + demo_overlap * 0.3)
+
+def overlap_for_records(records):
+    """Overlap dict-of-dicts for creator records that need not be in the roster"""
     matrix = {}
-    for i, id1 in enumerate(creator_ids):
-        matrix[id1] = {}
-        for id2 in creator_ids:
-            if id1 == id2:
-                matrix[id1][id2] = 1.0
+    for inf1 in records:
+        matrix[inf1["id"]] = {}
+        for inf2 in records:
+            if inf1["id"] == inf2["id"]:
+                matrix[inf1["id"]][inf2["id"]] = 1.0
             else:
-                # Simulate overlap based on topic similarity
-                inf1 = next(inf for inf in INFLUENCERS if inf["id"] == id1)
-                inf2 = next(inf for inf in INFLUENCERS if inf["id"] == id2)
-                
-                common_topics = set(inf1["topics"]) & set(inf2["topics"])
-                topic_overlap = len(common_topics) / max(len(inf1["topics"]), len(inf2["topics"]))
-                
-                # Add geographic and demographic overlap factors
-                geo_overlap = sum(min(inf1["geo"][region], inf2["geo"][region]) for region in inf1["geo"])
-                demo_overlap = sum(min(inf1["aud"][age], inf2["aud"][age]) for age in inf1["aud"])
-                
-                total_overlap = (topic_overlap * 0.4 + geo_overlap * 0.3 + demo_overlap * 0.3)
-                matrix[id1][id2] = round(total_overlap, 3)
+                matrix[inf1["id"]][inf2["id"]] = round(pair_overlap(inf1, inf2), 3)
     
     return matrix
 
+def eval_roster_file(path, task, chunk_size=50_000):
+    """Evaluate creators streamed from a roster file without loading it whole.
+
+    Each chunk is scored with the columnar engine and only the running top-K
+    is kept, so memory stays bounded by the chunk size. Returns the eval_agent
+    output shape plus the loader's report of rejected rows.
+    """
+    from creator_store import CreatorStore
+    from roster_loader import LoadReport, iter_creator_chunks
+
+    top_k = task.get("top_k", 6)
+    report = LoadReport()
+    best = []  # (-rounded composite, roster position, result record, raw record)
+    position = 0
+    for chunk in iter_creator_chunks(path, chunk_size, report):
+        store = CreatorStore.from_records(chunk)
+        scores = score_columns(store, task)
+        rounded = _round_scores(scores["composite"])
+        for row in _top_k_rows(rounded, top_k):
+            best.append((-rounded[row], position + row, _columnar_record(store, scores, row, row), chunk[row]))
+        best = sorted(best, key=lambda entry: entry[:2])[:top_k]
+        position += len(chunk)
+
+    return {
+        "top": [entry[2] for entry in best],
+        "overlap_matrix": overlap_for_records([entry[3] for entry in best]),
+        "overlap_factor": 0.18,  # Average overlap estimate
+        "total_evaluated": report.rows_loaded,
+        "load_report": report.to_dict()
+    }
+
 def predict_agent(task, eval_out):
     """Campaign Prediction Agent - forecasts KPIs with uncertainty bounds"""
-    creators = eval_out["top"][:6]  # Work with top 6 creators
+    prediction, basis = forecast_campaign(task, eval_out)
+    return with_mix_comparison(prediction, compare_mix(eval_out, basis))
+
+@instrumented(count=lambda out: len(out[0]["reach_breakdown"]))
+def forecast_campaign(task, eval_out):
+    """Forecast half of predict_agent (everything but the mix comparison)
+
+    Only reads eval_out["top"] and eval_out["overlap_factor"], so it can run
+    before the overlap matrix exists. Returns (prediction, basis) where basis
+    holds the point estimates compare_mix() needs.
+
+    When task["simulation"] is set (e.g. {"trials": 100000, "seed": 7,
+    "time_budget_s": 0.5}) the forecast percentiles come from a Monte Carlo
+    run (forecast_sim) instead of the fixed ±25% band.
+    """
+    creators = eval_out["top"]  # Work with the evaluated top creators
     
     # Base reach calculation per creator
     total_reach_p50 = 0
     reach_breakdown = []
     
     for creator in creators:
-        inf = next(i for i in INFLUENCERS if i["id"] == creator["candidate_id"])
+        inf = REGISTRY.get(creator["candidate_id"])
         
         # Base reach per post (followers * organic reach rate)
         base_reach_rate = 0.45 + (inf["er"] - 0.03) * 2  # ER influences reach
@@ -315,8 +940,7 @@ def predict_agent(task, eval_out):
     unique_reach_p50 = total_reach_p50 * (1 - 0.5 * overlap_factor)
     
     # Get seasonal and vertical benchmarks
-    benchmark = next((b for b in CAMPAIGN_HISTORY if b["vertical"] == task.get("vertical", "skincare") 
-                     and b["season"] == task.get("season", "winter")), CAMPAIGN_HISTORY[0])
+    benchmark = benchmark_for(task.get("vertical", "skincare"), task.get("season", "winter"))
     
     # CTR calculation with creative quality assumptions
     base_ctr = benchmark["avg_ctr"]
@@ -335,7 +959,6 @@ def predict_agent(task, eval_out):
     conversions_p50 = clicks_p50 * cvr_p50
     
     # CPM and CPC calculations
-    total_budget = task.get("budget_inr", 500000)
     cpm_p50 = benchmark["avg_cpm"]
     cpc_p50 = cpm_p50 / (ctr_p50 * 1000)
     
@@ -366,77 +989,123 @@ def predict_agent(task, eval_out):
         }
     }
     
-    # Mix comparison: 6 micros vs 2 mid-tier + 4 micros
-    mix_comparison = {
-        "scenario_a": {
-            "description": "6 micro-creators (current)",
-            "reach": int(unique_reach_p50),
-            "cost_efficiency": "High",
-            "authenticity": "High",
-            "risk": "Low - diverse portfolio"
-        },
-        "scenario_b": {
-            "description": "2 mid-tier + 4 micro creators",
-            "reach": int(unique_reach_p50 * 1.3),  # Higher reach but more overlap
-            "cost_efficiency": "Medium",
-            "authenticity": "Medium",
-            "risk": "Medium - concentration risk"
-        }
+    assumptions = {
+        "duplication_factor": overlap_factor,
+        "hook_uplift_ctr": sustainability_uplift,
+        "creative_uplift_ctr": creative_quality_uplift,
+        "baseline_reach_rate": "45-80% depending on ER",
+        "seasonality": f"Winter skincare campaign ({task.get('season', 'winter')})",
+        "uncertainty_bounds": f"±{uncertainty_factor*100}%"
     }
     
-    return {
-        "forecast": scenarios["base"],
+    simulation = task.get("simulation")
+    simulation_info = None
+    if simulation is not None:
+        from forecast_sim import DEFAULT_TRIALS, simulate_forecast
+        records = [REGISTRY.get(c["candidate_id"]) for c in creators]
+        scenarios["base"], simulation_info = simulate_forecast(
+            records, task, benchmark, BENCHMARKS.benchmarks(), overlap_factor, ctr_p50,
+            trials=simulation.get("trials", DEFAULT_TRIALS),
+            seed=simulation.get("seed"),
+            time_budget_s=simulation.get("time_budget_s"),
+        )
+        assumptions["uncertainty_bounds"] = f"Monte Carlo P10-P90 ({simulation_info['trials_run']:,} trials)"
+    
+    result = {
+        "forecast": Forecast.from_dict(scenarios["base"]),
         "reach_breakdown": reach_breakdown,
         "sensitivity_analysis": {
             "creative_uplift": scenarios["creative_uplift"],
             "budget_reduction": scenarios["budget_reduction"]
         },
-        "mix_comparison": mix_comparison,
-        "assumptions": {
-            "duplication_factor": overlap_factor,
-            "hook_uplift_ctr": sustainability_uplift,
-            "creative_uplift_ctr": creative_quality_uplift,
-            "baseline_reach_rate": "45-80% depending on ER",
-            "seasonality": f"Winter skincare campaign ({task.get('season', 'winter')})",
-            "uncertainty_bounds": f"±{uncertainty_factor*100}%"
+        "assumptions": assumptions
+    }
+    if simulation_info is not None:
+        result["simulation"] = simulation_info
+    basis = {"unique_reach": unique_reach_p50, "ctr": ctr_p50, "cvr": cvr_p50,
+             "constraints": portfolio_constraints(task)}
+    return result, basis
+
+def portfolio_constraints(task):
+    """solve_portfolio's budget/reach/size/objective arguments from a predict or optimize task"""
+    return {
+        "budget_inr": task.get("budget_inr", 500000),
+        "target_unique_reach": task.get("target_unique_reach", 0.0),
+        "max_creators": task.get("max_creators"),
+        "objective": task.get("objective", "reach"),
+    }
+
+@instrumented()
+def compare_mix(eval_out, basis):
+    """Mix comparison: current shortlist vs the budget-optimized portfolio
+
+    The solved portfolio is kept under scenario_b["solution"] so
+    optimize_agent can book it without solving again.
+    """
+    creators = eval_out["top"]
+    optimized = solve_portfolio(
+        [REGISTRY.get(c["candidate_id"]) for c in creators], eval_out["overlap_matrix"],
+        ctr=basis["ctr"], cvr=basis["cvr"], **basis["constraints"],
+    )
+    optimized_reach = optimized["forecast"]["unique_reach"]
+    optimized_count = len(optimized["portfolio"])
+    return {
+        "scenario_a": {
+            "description": f"{len(creators)} shortlisted creators (current)",
+            "reach": int(basis["unique_reach"]),
+            "cost_efficiency": "High",
+            "authenticity": "High",
+            "risk": "Low - diverse portfolio"
+        },
+        "scenario_b": {
+            "description": f"Budget-optimized portfolio: {optimized_count} creators, ₹{optimized['total_cost_inr']:,}",
+            "reach": optimized_reach,
+            "cost_efficiency": f"₹{optimized['total_cost_inr'] / max(optimized_reach, 1):.2f} per unique reach",
+            "authenticity": "High" if optimized_count >= 4 else "Medium",
+            "risk": "Low - diverse portfolio" if optimized_count >= 4 else "Medium - concentration risk",
+            "solution": optimized
         }
     }
 
+def with_mix_comparison(prediction, mix_comparison):
+    """Insert the mix comparison ahead of the assumptions, as predict_agent reports it"""
+    result = {}
+    for key, value in prediction.items():
+        if key == "assumptions":
+            result["mix_comparison"] = mix_comparison
+        result[key] = value
+    return result
+
 def optimize_agent(task, eval_out, pred_out):
     """Optimization Strategy Agent - provides actionable recommendations"""
-    
-    # Analyze current creator mix for optimization opportunities
-    top_creators = eval_out["top"][:6]
-    high_performers = [c for c in top_creators if c["composite_score"] > 75]
-    medium_performers = [c for c in top_creators if 60 <= c["composite_score"] <= 75]
+    recommendations = [rec for rec in (build(task, eval_out, pred_out) for build in RECOMMENDATION_BUILDERS) if rec]
+    portfolio = solve_budget_portfolio(task, eval_out, pred_out)
+    recommendations.append(budget_recommendation(task, portfolio))
+    return optimization_plan(recommendations, portfolio)
+
+def creator_mix_recommendation(task, eval_out, pred_out):
+    """1. Creator Selection Optimization (None unless 3+ high performers)"""
+    high_performers = [c for c in eval_out["top"] if c["composite_score"] > 75]
     
     # Calculate unique reach efficiency
     total_reach = pred_out["forecast"]["reach"]["p50"]
-    overlap_matrix = eval_out["overlap_matrix"]
-    
-    recommendations = []
-    
-    # 1. Creator Selection Optimization
-    if len(high_performers) >= 3:
-        recommendations.append({
-            "lever": "Creator Mix",
-            "action": f"Prioritize top 3 performers: {', '.join([c['name'] for c in high_performers[:3]])}. Target 80%+ unique reach.",
-            "rationale": f"Top performers show {high_performers[0]['composite_score']:.1f}+ composite scores with strong Gen Z alignment",
-            "impact": "↑unique reach",
-            "kpi_impact": f"+{int(total_reach * 0.12):,} incremental reach",
-            "effort": "S",
-            "confidence": "High",
-            "owner": "Campaign Manager"
-        })
     
-    # 2. Creative Strategy Optimization
-    creative_strategy = {
-        "hooks": ["Refillable packaging demo", "Before/after skin transformation"],
-        "ctas": ["Try eco-mini starter kit", "Get your skin assessment"],
-        "content_types": ["Reel", "Carousel", "Story"]
+    if len(high_performers) < 3:
+        return None
+    return {
+        "lever": "Creator Mix",
+        "action": f"Prioritize top 3 performers: {', '.join([c['name'] for c in high_performers[:3]])}. Target 80%+ unique reach.",
+        "rationale": f"Top performers show {high_performers[0]['composite_score']:.1f}+ composite scores with strong Gen Z alignment",
+        "impact": "↑unique reach",
+        "kpi_impact": f"+{int(total_reach * 0.12):,} incremental reach",
+        "effort": "S",
+        "confidence": "High",
+        "owner": "Campaign Manager"
     }
-    
-    recommendations.append({
+
+def creative_recommendation(task, eval_out, pred_out):
+    """2. Creative Strategy Optimization"""
+    return {
         "lever": "Creative",
         "action": "Lead with refillable packaging demo in first 2s; A/B test 'Try eco-mini' vs 'Get assessment' CTAs",
         "rationale": "Gen Z responds 40% better to sustainability messaging and interactive CTAs",
@@ -445,10 +1114,11 @@ def optimize_agent(task, eval_out, pred_out):
         "effort": "S",
         "confidence": "Medium",
         "owner": "Creative Team"
-    })
-    
-    # 3. Landing Page Optimization
-    recommendations.append({
+    }
+
+def landing_recommendation(task, eval_out, pred_out):
+    """3. Landing Page Optimization"""
+    return {
         "lever": "Landing",
         "action": "Add UPI express checkout + customer reviews section + ingredient transparency",
         "rationale": "Gen Z values transparency and seamless mobile experience",
@@ -457,10 +1127,11 @@ def optimize_agent(task, eval_out, pred_out):
         "effort": "M",
         "confidence": "High",
         "owner": "Product Team"
-    })
-    
-    # 4. Timing and Posting Strategy
-    recommendations.append({
+    }
+
+def timing_recommendation(task, eval_out, pred_out):
+    """4. Timing and Posting Strategy"""
+    return {
         "lever": "Timing",
         "action": "Post Reels 6-8PM IST, Stories 10-11AM. Front-load week 1 with 60% of content",
         "rationale": "Peak Gen Z engagement windows and early momentum building",
@@ -469,21 +1140,66 @@ def optimize_agent(task, eval_out, pred_out):
         "effort": "S",
         "confidence": "Medium",
         "owner": "Social Media Manager"
-    })
-    
-    # 5. Budget Allocation Optimization
+    }
+
+# Independent recommendation generators, in report order (the Budget lever comes last)
+RECOMMENDATION_BUILDERS = (
+    creator_mix_recommendation,
+    creative_recommendation,
+    landing_recommendation,
+    timing_recommendation,
+)
+
+@instrumented(count=lambda portfolio: len(portfolio["portfolio"]))
+def solve_budget_portfolio(task, eval_out, pred_out):
+    """5. Budget Allocation Optimization - solve for the best creator portfolio
+
+    Reuses the mix comparison's solution when it was solved under the same
+    constraints, so the booked portfolio is the one predict_agent reported.
+    """
+    constraints = portfolio_constraints(task)
+    solved = pred_out.get("mix_comparison", {}).get("scenario_b", {}).get("solution")
+    if solved is not None and all(solved.get(key) == value for key, value in constraints.items()):
+        return solved
+    return solve_portfolio(
+        [REGISTRY.get(c["candidate_id"]) for c in eval_out["top"]], eval_out["overlap_matrix"],
+        ctr=pred_out["forecast"]["ctr"]["p50"],
+        cvr=pred_out["forecast"]["cvr"]["p50"],
+        **constraints,
+    )
+
+def budget_recommendation(task, portfolio):
+    """Budget lever for a solved portfolio"""
     budget = task.get("budget_inr", 500000)
-    recommendations.append({
+    if not portfolio["portfolio"]:
+        cheapest = portfolio.get("cheapest_package_inr")
+        floor = f" (₹{cheapest:,})" if cheapest is not None else ""
+        return {
+            "lever": "Budget",
+            "action": f"Budget below the cheapest package{floor}; raise budget or drop to stories",
+            "rationale": f"No creator package fits the ₹{budget:,} budget, so nothing can be booked",
+            "impact": "Unblocks launch",
+            "kpi_impact": "0 unique reach until the budget covers one package",
+            "effort": "S",
+            "confidence": "High",
+            "owner": "Performance Marketing"
+        }
+    booked = ", ".join(f"{p['name']} ({p['posts']}R+{p['stories']}S)" for p in portfolio["portfolio"])
+    reserve = budget - portfolio["total_cost_inr"]
+    return {
         "lever": "Budget",
-        "action": f"Allocate 70% to top 3 creators, 30% to testing. Reserve ₹{int(budget * 0.15):,} for performance scaling",
-        "rationale": "Focus spend on proven performers while maintaining test budget",
+        "action": f"Book {booked} for ₹{portfolio['total_cost_inr']:,}. Reserve ₹{reserve:,} for performance scaling",
+        "rationale": f"Portfolio maximizes deduplicated {portfolio['objective']} within budget "
+                     f"({portfolio['forecast']['unique_reach_ratio']:.0%} unique reach)",
         "impact": "↓CPA",
-        "kpi_impact": f"-15% CPA vs equal distribution",
+        "kpi_impact": f"{portfolio['forecast']['unique_reach']:,} unique reach, ~{portfolio['forecast']['conversions']} conversions",
         "effort": "S",
         "confidence": "High",
         "owner": "Performance Marketing"
-    })
-    
+    }
+
+def optimization_plan(recommendations, portfolio):
+    """optimize_agent's output from its recommendations (in report order) and portfolio"""
     # Test Plan for Creative Optimization
     test_plan = {
         "description": "Gen Z Sustainable Skincare Creative Test Matrix",
@@ -542,10 +1258,11 @@ def optimize_agent(task, eval_out, pred_out):
     }
     
     # Prioritize recommendations by impact and effort
-    recommendations.sort(key=lambda x: {"S": 1, "M": 2, "L": 3}[x["effort"]])
+    recommendations = sorted(recommendations, key=lambda x: {"S": 1, "M": 2, "L": 3}[x["effort"]])
     
     return {
         "prioritized": recommendations,
+        "portfolio": portfolio,
         "test_plan": test_plan,
         "brand_safety": brand_safety_guidelines,
         "performance_management": {
@@ -567,44 +1284,76 @@ def optimize_agent(task, eval_out, pred_out):
         ]
     }
 
-def run(query: str):
-    """Main orchestrator function - coordinates all agents"""
-    print(f"🚀 MarketMuse Analysis Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"📝 Query: {query}\n")
-    
-    # Decompose query into structured tasks
-    plan = decompose(query)
-    print("📋 Task Decomposition:")
-    print(f"   • Vertical: {plan['evaluate']['vertical']}")
-    print(f"   • Audience: {plan['evaluate']['audience']}")
-    print(f"   • Tier: {plan['evaluate']['tier']}")
-    print(f"   • Sustainability Focus: {plan['evaluate']['sustainability_focus']}")
-    print(f"   • Campaign Duration: {plan['predict']['duration_weeks']} weeks")
-    print(f"   • Budget: ₹{plan['optimize']['budget_inr']:,}\n")
-    
-    # Execute agents in sequence
-    print("🔍 Running Influencer Evaluation Agent...")
-    eval_output = eval_agent(plan["evaluate"])
-    print(f"   ✓ Evaluated {eval_output['total_evaluated']} influencers")
-    print(f"   ✓ Top performer: {eval_output['top'][0]['name']} (Score: {eval_output['top'][0]['composite_score']})")
-    
-    print("\n📊 Running Campaign Prediction Agent...")
-    pred_output = predict_agent(plan["predict"], eval_output)
-    print(f"   ✓ Forecast reach: {pred_output['forecast']['reach']['p50']:,}")
-    print(f"   ✓ Expected conversions: {pred_output['forecast']['conversions']['p50']}")
-    
-    print("\n💡 Running Optimization Strategy Agent...")
-    opt_output = optimize_agent(plan["optimize"], eval_output, pred_output)
-    print(f"   ✓ Generated {len(opt_output['prioritized'])} recommendations")
-    print(f"   ✓ Top priority: {opt_output['prioritized'][0]['lever']}")
-    
-    # Compile final results
-    final_output = {
+def stage_key(stage, payload):
+    """Cache key of a stage output (payload plus the scoring schema version)"""
+    return cache_key(stage, dict(payload, schema=CACHE_SCHEMA_VERSION))
+
+def _cached_stage(cache, stage, payload, tags, compute):
+    """Return a stage output from ``cache`` or compute and store it"""
+    if cache is None or tags is None:
+        return compute()
+    key = stage_key(stage, payload)
+    hit, value = cache.get(key)
+    if hit:
+        return value
+    value = compute()
+    cache.put(key, value, tags)
+    return value
+
+def _creator_digests(eval_out):
+    return {c["candidate_id"]: _digest(REGISTRY.get(c["candidate_id"])) for c in eval_out["top"]}
+
+def run_evaluate(task, engine="python", cache=None, on_ranking=None):
+    """eval_agent behind the stage cache, keyed on the plan, roster and WEIGHTS
+
+    ``on_ranking`` is only called when the evaluation is computed, not on a
+    cache hit.
+    """
+    if cache is None:
+        return eval_agent(task, engine=engine, on_ranking=on_ranking)
+    payload = {"task": task, "roster": roster_version(), "weights": WEIGHTS}
+    return _cached_stage(cache, "evaluate", payload, {"roster", "weights"},
+                         lambda: eval_agent(task, engine=engine, on_ranking=on_ranking))
+
+def predict_cache_entry(task, eval_out):
+    """(payload, tags) the predict stage is cached under; tags are None when uncacheable"""
+    simulation = task.get("simulation")
+    # Unseeded simulations are meant to differ run to run, so never cache them
+    cacheable = simulation is None or simulation.get("seed") is not None
+    creators = _creator_digests(eval_out)
+    payload = {"task": task, "eval": eval_out, "creators": creators, "history": BENCHMARKS.version}
+    tags = {"campaign_history"} | {f"creator:{i}" for i in creators} if cacheable else None
+    return payload, tags
+
+def optimize_cache_entry(task, eval_out, pred_out):
+    """(payload, tags) the optimize stage is cached under"""
+    creators = _creator_digests(eval_out)
+    payload = {"task": task, "eval": eval_out, "predict": pred_out, "creators": creators}
+    return payload, {f"creator:{i}" for i in creators}
+
+def run_predict(task, eval_out, cache=None):
+    """predict_agent behind the stage cache, keyed on its inputs and the creators it reads"""
+    payload, tags = predict_cache_entry(task, eval_out)
+    return _cached_stage(cache, "predict", payload, tags, lambda: predict_agent(task, eval_out))
+
+def run_optimize(task, eval_out, pred_out, cache=None):
+    """optimize_agent behind the stage cache, keyed on its inputs and the creators it reads"""
+    payload, tags = optimize_cache_entry(task, eval_out, pred_out)
+    return _cached_stage(cache, "optimize", payload, tags,
+                         lambda: optimize_agent(task, eval_out, pred_out))
+
+def compose_output(query, eval_output, pred_output, opt_output):
+    """Final run() result for one query from its three stage outputs.
+
+    Records inside the stage outputs are converted to plain dicts, so the
+    result is JSON-serializable as-is.
+    """
+    return {
         "query": query,
         "timestamp": datetime.now().isoformat(),
-        "evaluation": eval_output,
-        "prediction": pred_output,
-        "optimization": opt_output,
+        "evaluation": plain(eval_output),
+        "prediction": plain(pred_output),
+        "optimization": plain(opt_output),
         "summary": {
             "selected_creators": [c["name"] for c in eval_output["top"][:3]],
             "estimated_reach": pred_output["forecast"]["reach"]["p50"],
@@ -614,14 +1363,108 @@ def run(query: str):
             "key_risks": ["Audience overlap", "Creative fatigue", "Seasonal competition"]
         }
     }
+
+def ndjson_events(stream):
+    """on_event callback writing each event to ``stream`` as one JSON line"""
+    def write(event):
+        stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+        stream.flush()
+    return write
+
+def run(query: str, engine="python", cache=None, verbose=True, profile=None, on_event=None):
+    """Main orchestrator function - coordinates all agents
+
+    Stage outputs are reused from ``cache`` (or the module-level STAGE_CACHE)
+    when the same plan is run against unchanged data. ``verbose=False``
+    suppresses the progress printout. Per-stage timings are attached under
+    "timings" unless instrumentation is switched off; ``profile`` adds a
+    cProfile summary (see instrumentation.recording).
+
+    ``on_event`` receives partial results as each agent finishes, as plain
+    JSON-ready dicts tagged with "event": "plan", "creators" (the ranking,
+    before the overlap matrix), "overlap", "forecast", "recommendations" and
+    finally "summary". ndjson_events(stream) turns them into NDJSON.
+    """
+    cache = cache if cache is not None else STAGE_CACHE
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    streamed = set()
+
+    def emit(event, **data):
+        if on_event is not None:
+            on_event({"event": event, **plain(data)})
+            streamed.add(event)
+
+    def ranked(ranking):
+        emit("creators", top=ranking["top"], total_evaluated=ranking["total_evaluated"])
+    log(f"🚀 MarketMuse Analysis Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    log(f"📝 Query: {query}\n")
     
-    print(f"\n✅ Analysis Complete! Top 3 creators: {', '.join(final_output['summary']['selected_creators'])}")
+    with recording(profile=profile) as recorder:
+        # Decompose query into structured tasks
+        with span("decompose"):
+            plan = decompose(query)
+        emit("plan", plan=plan)
+        log("📋 Task Decomposition:")
+        log(f"   • Vertical: {plan['evaluate']['vertical']}")
+        log(f"   • Audience: {plan['evaluate']['audience']}")
+        log(f"   • Tier: {plan['evaluate']['tier']}")
+        log(f"   • Sustainability Focus: {plan['evaluate']['sustainability_focus']}")
+        log(f"   • Campaign Duration: {plan['predict']['duration_weeks']} weeks")
+        log(f"   • Budget: ₹{plan['optimize']['budget_inr']:,}\n")
+        
+        # Execute agents in sequence
+        log("🔍 Running Influencer Evaluation Agent...")
+        with span("evaluate") as stage:
+            eval_output = run_evaluate(plan["evaluate"], engine=engine, cache=cache,
+                                       on_ranking=ranked if on_event is not None else None)
+            stage.items = eval_output["total_evaluated"]
+        if on_event is not None and "creators" not in streamed:
+            # Cached evaluation: the ranking callback never ran
+            ranked(eval_output)
+        emit("overlap", overlap_matrix=eval_output["overlap_matrix"], overlap_factor=eval_output["overlap_factor"])
+        log(f"   ✓ Evaluated {eval_output['total_evaluated']} influencers")
+        log(f"   ✓ Top performer: {eval_output['top'][0]['name']} (Score: {eval_output['top'][0]['composite_score']})")
+        
+        log("\n📊 Running Campaign Prediction Agent...")
+        with span("predict") as stage:
+            pred_output = run_predict(plan["predict"], eval_output, cache=cache)
+            stage.items = len(pred_output["reach_breakdown"])
+        emit("forecast", prediction=pred_output)
+        log(f"   ✓ Forecast reach: {pred_output['forecast']['reach']['p50']:,}")
+        log(f"   ✓ Expected conversions: {pred_output['forecast']['conversions']['p50']}")
+        
+        log("\n💡 Running Optimization Strategy Agent...")
+        with span("optimize") as stage:
+            opt_output = run_optimize(plan["optimize"], eval_output, pred_output, cache=cache)
+            stage.items = len(opt_output["prioritized"])
+        emit("recommendations", optimization=opt_output)
+        log(f"   ✓ Generated {len(opt_output['prioritized'])} recommendations")
+        log(f"   ✓ Top priority: {opt_output['prioritized'][0]['lever']}")
+    
+    # Compile final results
+    final_output = compose_output(query, eval_output, pred_output, opt_output)
+    if recorder is not None:
+        final_output["timings"] = recorder.report()
+    emit("summary", summary=final_output["summary"], **({"timings": final_output["timings"]}
+                                                      if "timings" in final_output else {}))
+    
+    log(f"\n✅ Analysis Complete! Top 3 creators: {', '.join(final_output['summary']['selected_creators'])}")
     return final_output
 
 if __name__ == "__main__":
     # Test with the brief scenario
     test_query = "Identify the optimal influencers and predict campaign outcomes for launching a new sustainable skincare brand targeting Gen Z audiences"
-    
+
+    if "--stream" in sys.argv[1:]:
+        # python marketmuse_sim.py --stream ["query"]: NDJSON events on stdout,
+        # the progress printout moves to stderr
+        query = " ".join(arg for arg in sys.argv[1:] if arg != "--stream") or test_query
+        events = ndjson_events(sys.stdout)
+        with contextlib.redirect_stdout(sys.stderr):
+            run(query, on_event=events)
+        sys.exit(0)
+
     result = run(test_query)
     
     print("\n" + "="*80)
@@ -0,0 +1,321 @@
+# marketmuse_worker.py
+# Resident analysis worker - keeps the roster and indexes warm across requests
+#
+# Wire protocol (stdin/stdout or a Unix socket): every message is a 4-byte
+# big-endian length followed by that many bytes of UTF-8 JSON.
+#
+#   request:  {"id": 1, "op": "analyze", "query": "...", "engine": "python", "profile": false, "stream": false}
+#   request:  {"id": 2, "op": "batch", "queries": ["...", "..."], "workers": 4}
+#   request:  {"id": 3, "op": "sweep", "query": "...", "grid": {"posts_per_creator": [1, 2, 3]}}
+#   request:  {"id": 4, "op": "similar", "creator_id": 7, "k": 10, "mode": "complementary", "cheaper": true}
+#   request:  {"id": 5, "op": "simulate", "query": "...", "scenario": {"ctr_scale": 0.8}, "contingencies": true}
+#   response: {"id": 1, "ok": true, "result": {...}}
+#             {"id": 1, "ok": false, "error": "..."}
+#             {"id": null, "ok": false, "error": "..."}   (frame that could not be decoded)
+#
+# With "stream": true, analyze first sends one {"id": 1, "event": {...}} frame
+# per finished agent (run()'s on_event events) and then the usual response.
+#
+# Usage:
+#   python marketmuse_worker.py                          # serve over stdin/stdout
+#   python marketmuse_worker.py --socket /tmp/mm.sock --workers 4 --cache-db /tmp/mm-cache.db
+#   python marketmuse_worker.py --engine columnar --snapshot /tmp/roster.snap
+#   python marketmuse_worker.py --engine columnar --roster creators.ndjson.gz --snapshot /tmp/roster.snap
+#   python marketmuse_worker.py --benchmarks results-2023.ndjson.gz --benchmarks results-2024.csv
+import argparse
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+import instrumentation
+import marketmuse_sim
+from stage_cache import StageCache
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+DISCARD_CHUNK_BYTES = 1024 * 1024
+
+
+class FrameError(ValueError):
+    """A frame that could not be decoded; the stream is left at the next frame"""
+
+
+def read_frame(stream):
+    """Read one length-prefixed JSON message; returns None on clean EOF
+
+    Raises FrameError for an oversized frame (its body is skipped) or a body
+    that is not a JSON object, so the caller can reply and keep reading.
+    """
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        _discard(stream, length)
+        raise FrameError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    body = _read_exact(stream, length)
+    if body is None:
+        raise EOFError("Connection closed mid-frame")
+    try:
+        message = json.loads(body.decode("utf-8"))
+    except ValueError as exc:
+        raise FrameError(f"Malformed frame: {exc}") from exc
+    if not isinstance(message, dict):
+        raise FrameError("Frame is not a JSON object")
+    return message
+
+
+def write_frame(stream, message):
+    """Write one length-prefixed JSON message and flush it"""
+    body = json.dumps(message).encode("utf-8")
+    stream.write(HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def _read_exact(stream, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise EOFError("Connection closed mid-frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _discard(stream, size):
+    while size:
+        chunk = stream.read(min(size, DISCARD_CHUNK_BYTES))
+        if not chunk:
+            raise EOFError("Connection closed mid-frame")
+        size -= len(chunk)
+
+
+def warm_up(engine="python", snapshot=None, roster=None, verify_snapshot=True):
+    """Load the roster and build the indexes a request would otherwise pay for on first use
+
+    With both ``roster`` and ``snapshot``, the roster file is only parsed
+    when the snapshot was not written from its current contents. An existing
+    snapshot is checksummed once here, before any worker is forked, unless
+    ``verify_snapshot`` is off.
+    """
+    if snapshot:
+        marketmuse_sim.use_creator_snapshot(snapshot, roster_file=roster, verify=verify_snapshot)
+        return
+    if roster:
+        marketmuse_sim.load_roster_file(roster)
+    if engine in ("columnar", "parallel"):
+        marketmuse_sim.get_creator_store()
+
+
+def handle(request, emit=None):
+    """Dispatch one request dict to the simulation and build the reply
+
+    ``emit`` sends a streamed event frame for this request.
+    """
+    op = request.get("op", "analyze")
+    if op == "ping":
+        return {"pid": os.getpid()}
+    if op == "metrics":
+        return {"prometheus": instrumentation.prometheus_text()}
+    if op == "cache_stats":
+        cache = marketmuse_sim.STAGE_CACHE
+        return cache.stats() if cache is not None else {}
+    if op == "analyze":
+        query = request.get("query")
+        if not query:
+            raise ValueError("Query is required")
+        result = marketmuse_sim.run(query, engine=request.get("engine", "python"),
+                                    profile=request.get("profile"),
+                                    on_event=emit if request.get("stream") else None)
+        reply = {
+            "evaluation": result["evaluation"],
+            "prediction": result["prediction"],
+            "optimization": result["optimization"],
+            "summary": result["summary"],
+        }
+        if "timings" in result:
+            reply["timings"] = result["timings"]
+        return reply
+    if op == "sweep":
+        query = request.get("query")
+        if not query:
+            raise ValueError("Query is required")
+        plan = marketmuse_sim.decompose(query)
+        eval_output = marketmuse_sim.run_evaluate(plan["evaluate"], engine=request.get("engine", "python"),
+                                                  cache=marketmuse_sim.STAGE_CACHE)
+        from sensitivity_sweep import sweep_forecast
+        return sweep_forecast(plan["predict"], eval_output, request.get("grid"), as_lists=True,
+                              budget_inr=plan["optimize"]["budget_inr"])
+    if op == "simulate":
+        query = request.get("query")
+        if not query:
+            raise ValueError("Query is required")
+        plan = marketmuse_sim.decompose(query)
+        eval_output = marketmuse_sim.run_evaluate(plan["evaluate"], engine=request.get("engine", "python"),
+                                                  cache=marketmuse_sim.STAGE_CACHE)
+        from campaign_simulator import simulate_plan
+        return simulate_plan(plan, eval_output, request.get("scenario"),
+                             contingencies=request.get("contingencies", False), as_lists=True)
+    if op == "similar":
+        creator_id = request.get("creator_id")
+        if creator_id is None:
+            raise ValueError("creator_id is required")
+        mode = request.get("mode", "similar")
+        if mode not in ("similar", "complementary"):
+            raise ValueError(f"Unknown similarity mode: {mode}")
+        options = {key: request[key] for key in ("k", "cheaper", "max_followers", "exclude") if key in request}
+        if mode == "complementary" and "min_topic_similarity" in request:
+            options["min_topic_similarity"] = request["min_topic_similarity"]
+        from similarity_index import roster_index
+        index = roster_index()
+        results = getattr(index, mode)(creator_id, **options)
+        return {"creator_id": creator_id, "mode": mode, "results": results}
+    if op == "batch":
+        queries = request.get("queries")
+        if not queries:
+            raise ValueError("Queries are required")
+        from batch_runner import run_batch
+        results = [None] * len(queries)
+        for index, result in run_batch(queries, engine=request.get("engine", "python"),
+                                       workers=request.get("workers")):
+            results[index] = {key: result[key] for key in ("query", "evaluation", "prediction",
+                                                           "optimization", "summary")}
+        return {"results": results}
+    raise ValueError(f"Unknown op: {op}")
+
+
+def serve(reader, writer):
+    """Answer framed requests until the peer closes the stream
+
+    A frame that cannot be decoded gets an error reply with a null id; the
+    stream stays usable.
+    """
+    while True:
+        try:
+            request = read_frame(reader)
+        except FrameError as exc:
+            print(f"Rejected frame: {exc}", file=sys.stderr)
+            write_frame(writer, {"id": None, "ok": False, "error": str(exc)})
+            continue
+        if request is None:
+            return
+        reply = {"id": request.get("id")}
+
+        def emit(event):
+            write_frame(writer, {"id": reply["id"], "event": event})
+
+        try:
+            reply["result"] = handle(request, emit)
+            reply["ok"] = True
+        except Exception as exc:
+            traceback.print_exc(file=sys.stderr)
+            reply["ok"] = False
+            reply["error"] = str(exc)
+        write_frame(writer, reply)
+
+
+def serve_stdio():
+    # run() reports progress with print(); keep stdout for protocol frames only
+    reader, writer = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr
+    serve(reader, writer)
+
+
+def _accept_loop(listener):
+    while True:
+        conn, _ = listener.accept()
+        with conn, conn.makefile("rb") as reader, conn.makefile("wb") as writer:
+            try:
+                serve(reader, writer)
+            except (EOFError, OSError, ValueError) as exc:
+                # Only this connection is lost; keep accepting
+                print(f"Connection dropped: {exc}", file=sys.stderr)
+
+
+def serve_socket(path, workers=1):
+    """Listen on a Unix socket with a pre-forked pool of worker processes"""
+    if os.path.exists(path):
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(64)
+    sys.stdout = sys.stderr
+
+    if workers <= 1:
+        _accept_loop(listener)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _accept_loop(listener)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def _stop(signum, frame):
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+    listener.close()
+    os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident MarketMuse analysis worker")
+    parser.add_argument("--socket", help="Serve on this Unix socket path instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=1, help="Pre-forked worker processes (socket mode)")
+    parser.add_argument("--engine", default="python", choices=["python", "columnar", "parallel"],
+                        help="Scoring engine to warm up before serving")
+    parser.add_argument("--scoring-workers", type=int, default=None,
+                        help="Processes for the parallel scoring engine (default: CPU count)")
+    parser.add_argument("--no-timings", action="store_true", help="Disable per-stage timing instrumentation")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also trace allocated bytes per stage with tracemalloc")
+    parser.add_argument("--roster", help="Roster export to serve (NDJSON/CSV, optionally .gz)")
+    parser.add_argument("--snapshot",
+                        help="Memory-mapped creator snapshot for the columnar engine (rebuilt if stale)")
+    parser.add_argument("--no-verify-snapshot", action="store_true",
+                        help="Skip the data checksum when opening an existing snapshot")
+    parser.add_argument("--benchmarks", action="append", default=[],
+                        help="Post-level campaign results (NDJSON/CSV, optionally .gz) to calibrate benchmarks")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="In-process stage cache entries (0 disables caching)")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Stage cache TTL in seconds")
+    parser.add_argument("--cache-db", help="SQLite file for a stage cache shared across workers")
+    args = parser.parse_args(argv)
+
+    instrumentation.configure(enabled=not args.no_timings, trace_memory=args.trace_memory)
+    if args.scoring_workers is not None:
+        import parallel_scoring
+        parallel_scoring.WORKERS = args.scoring_workers
+    if args.cache_size > 0:
+        marketmuse_sim.STAGE_CACHE = StageCache(args.cache_size, args.cache_ttl, args.cache_db)
+
+    for path in args.benchmarks:
+        marketmuse_sim.ingest_campaign_results(path)
+    # Warm up before forking so every worker shares the loaded roster pages
+    warm_up(args.engine, args.snapshot, args.roster, verify_snapshot=not args.no_verify_snapshot)
+    if args.socket:
+        serve_socket(args.socket, args.workers)
+    else:
+        serve_stdio()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# parallel_scoring.py
+# Sharded columnar scoring across CPU cores (eval_agent(task, engine="parallel"))
+#
+# The scoring columns of the CreatorStore are copied once into a single
+# multiprocessing.shared_memory block; pool workers attach to it by name and
+# wrap contiguous row ranges (shards) in CreatorStore views, so no creator
+# data is pickled per request - only the task, weights and row range go out
+# and each shard's top-K rows and rounded scores come back.
+#
+# Shard results are merged on (score desc, row asc), which is exactly the
+# order the single-process columnar path ranks in, so the output is identical
+# to engine="columnar" for any worker count.
+import atexit
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import marketmuse_sim
+from creator_store import CreatorStore
+
+# Columns score_columns reads
+SCORING_COLUMNS = ("id", "followers", "er", "aud", "history", "fraud", "safety", "topic_bits")
+
+# Rosters are split into at most one shard per this many rows; smaller rosters score inline
+MIN_SHARD_ROWS = 50_000
+
+# Pool size used when rank_parallel() gets no explicit worker count (None = CPU count)
+WORKERS = None
+
+_SCORER = None
+
+
+def configure(workers=None):
+    """Set the default worker count (None = CPU count) and drop the running pool"""
+    global WORKERS
+    WORKERS = workers
+    shutdown()
+
+
+class SharedColumns:
+    """Store columns packed into one shared memory block.
+
+    ``layout`` describes each column as (name, dtype, shape, offset) and is
+    all a worker needs, besides the block name, to map the columns back.
+    """
+
+    def __init__(self, store):
+        self.layout = []
+        offset = 0
+        for name in SCORING_COLUMNS:
+            column = np.ascontiguousarray(getattr(store, name))
+            self.layout.append((name, column.dtype.str, column.shape, offset))
+            offset += -(-column.nbytes // 64) * 64  # keep every column 64-byte aligned
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, _, _, _ in self.layout:
+            column = np.ascontiguousarray(getattr(store, name))
+            _view(self.shm, self.layout, name)[...] = column
+        self.spec = {
+            "shm": self.shm.name,
+            "layout": self.layout,
+            "vocab": store.vocab,
+            "safety_labels": store.safety_labels,
+            "platform_labels": store.platform_labels,
+        }
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _view(shm, layout, name):
+    for column, dtype, shape, offset in layout:
+        if column == name:
+            return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+    raise KeyError(name)
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: pool workers share the parent's resource tracker, so
+        # the block is registered once and unlinked by the parent only
+        return shared_memory.SharedMemory(name=name)
+
+
+# -- worker side -----------------------------------------------------------
+
+_WORKER = {}
+
+
+def _init_worker(spec):
+    shm = _attach(spec["shm"])
+    columns = {name: _view(shm, spec["layout"], name) for name, _, _, _ in spec["layout"]}
+    _WORKER["shm"] = shm
+    _WORKER["store"] = CreatorStore(columns, [], [], spec["vocab"], spec["safety_labels"],
+                                    spec["platform_labels"])
+
+
+def _shard(store, start, stop):
+    columns = {name: column[start:stop] for name, column in store.columns.items()}
+    return CreatorStore(columns, [], [], store.vocab, store.safety_labels, store.platform_labels)
+
+
+def score_shard(store, start, stop, task, weights, top_k, filtered):
+    """(global rows, rounded composites, rows evaluated) of one shard's best top_k.
+
+    ``filtered`` applies the task's tier prefilter inside the shard (a
+    shard with no creators in the tier contributes nothing).
+    """
+    shard = _shard(store, start, stop)
+    rows = marketmuse_sim.tier_rows(shard, task) if filtered else None
+    scores = marketmuse_sim.score_columns(shard, task, weights, rows=rows)
+    rounded = marketmuse_sim._round_scores(scores["composite"])
+    best = marketmuse_sim._top_k_rows(rounded, top_k)
+    local = best if rows is None else rows[best]
+    return local + start, rounded[best], len(rounded)
+
+
+def _score_job(start, stop, task, weights, top_k, filtered):
+    return score_shard(_WORKER["store"], start, stop, task, weights, top_k, filtered)
+
+
+# -- parent side -----------------------------------------------------------
+
+class ShardedScorer:
+    """A worker pool attached to one CreatorStore's shared columns.
+
+    The shared block and the pool are created on the first request that
+    needs more than one shard.
+    """
+
+    def __init__(self, store, workers):
+        self.store = store
+        self.workers = workers
+        self.columns = None
+        self.pool = None
+
+    def shards(self):
+        n = len(self.store)
+        count = max(1, min(self.workers, n // MIN_SHARD_ROWS))
+        bounds = np.linspace(0, n, count + 1).astype(np.int64).tolist()
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def top_rows(self, task, weights, top_k, filtered):
+        """Global (rows, rounded composites) of the best top_k, plus rows evaluated"""
+        shards = self.shards()
+        jobs = [(start, stop, task, weights, top_k, filtered) for start, stop in shards]
+        if len(shards) == 1:
+            parts = [score_shard(self.store, *jobs[0])]
+        else:
+            if self.pool is None:
+                self.columns = SharedColumns(self.store)
+                self.pool = multiprocessing.get_context().Pool(
+                    self.workers, initializer=_init_worker, initargs=(self.columns.spec,))
+            parts = self.pool.starmap(_score_job, jobs)
+        rows = np.concatenate([part[0] for part in parts])
+        scores = np.concatenate([part[1] for part in parts])
+        order = np.lexsort((rows, -scores))[:top_k]
+        return rows[order], sum(part[2] for part in parts)
+
+    # Roster watcher: in-place column edits (e.g. update_fraud_indicators) make the shared copy stale
+    def on_roster_change(self, op, record):
+        self.on_roster_reset()
+
+    def on_roster_reset(self):
+        if _SCORER is self:
+            shutdown()
+
+    def on_weights_change(self, weights):
+        pass
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.columns.close()
+
+
+def scorer_for(store, workers=None):
+    """Shared ShardedScorer for ``store`` (rebuilt when the store or worker count changes)"""
+    global _SCORER
+    workers = max(1, workers or WORKERS or os.cpu_count() or 1)
+    if _SCORER is not None and (_SCORER.store is not store or _SCORER.workers != workers):
+        shutdown()
+    if _SCORER is None:
+        _SCORER = ShardedScorer(store, workers)
+        marketmuse_sim.watch_roster(_SCORER)
+    return _SCORER
+
+
+@atexit.register
+def shutdown():
+    """Stop the worker pool and release its shared memory"""
+    global _SCORER
+    if _SCORER is not None:
+        _SCORER.close()
+        _SCORER = None
+
+
+def rank_parallel(task, top_k, workers=None):
+    """rank_creators' (top results, total evaluated) scored across a process pool"""
+    store = marketmuse_sim.get_creator_store()
+    scorer = scorer_for(store, workers)
+    if len(scorer.shards()) == 1:
+        return marketmuse_sim._eval_columnar(task, top_k)
+    # Like the columnar path, a tier no creator falls in scores the whole roster
+    in_tier = marketmuse_sim.tier_rows(store, task)
+    filtered = in_tier is not None and len(in_tier) > 0
+    rows, total = scorer.top_rows(task, dict(marketmuse_sim.WEIGHTS), top_k, filtered)
+    # Component scores are elementwise, so rescoring the winners reproduces them exactly
+    scores = marketmuse_sim.score_columns(store, task, rows=rows)
+    return [marketmuse_sim._columnar_record(store, scores, i, row) for i, row in enumerate(rows.tolist())], total
@@ -0,0 +1,264 @@
+# portfolio_optimizer.py
+# Budget-constrained creator portfolio solver used by optimize_agent
+#
+# Each creator can be booked with one content package (posts, stories). A
+# package's reach follows predict_agent's per-creator reach formula and its
+# cost follows a per-follower rate card. Unique reach is the gross reach minus
+# a pairwise duplication term driven by the audience-overlap matrix:
+#
+#   U(S) = sum_j r_j - PAIR_DEDUP_RATE * sum_{i<j} overlap_ij * min(r_i, r_j)
+#
+# Marginal gains only shrink as the portfolio grows, so greedy selection with
+# lazy re-evaluation is valid for large shortlists; small shortlists are
+# solved exactly by enumeration.
+import heapq
+
+from instrumentation import instrumented
+
+# Content packages a creator can be booked for: (reel posts, stories)
+DEFAULT_PACKAGES = ((1, 1), (2, 2), (3, 2))
+
+# Creator fees in INR per follower for one reel / one story
+REEL_RATE_INR = 0.5
+STORY_RATE_INR = 0.15
+
+# Share of the overlap score that is treated as duplicated audience per pair
+PAIR_DEDUP_RATE = 0.05
+
+# Shortlists up to this size are solved by exhaustive search
+EXACT_MAX_CANDIDATES = 6
+
+
+def package_reach(inf, posts, stories):
+    """Expected reach of one creator package (same model as predict_agent)"""
+    reach_rate = max(0.2, min(0.8, 0.45 + (inf["er"] - 0.03) * 2))
+    return inf["followers"] * reach_rate * (1.4 * posts + 0.6 * stories)
+
+
+def package_cost(inf, posts, stories):
+    """Creator fee in INR for one package; a record's own "rate_inr" card wins"""
+    rates = inf.get("rate_inr", {})
+    reel_rate = rates.get("reel", REEL_RATE_INR)
+    story_rate = rates.get("story", STORY_RATE_INR)
+    return inf["followers"] * (reel_rate * posts + story_rate * stories)
+
+
+class _Problem:
+    """Precomputed reach, cost, value weights and overlap for a shortlist"""
+
+    def __init__(self, creators, overlap, packages, objective, ctr, cvr):
+        self.creators = creators
+        self.packages = packages
+        self.reach = [[package_reach(c, p, s) for p, s in packages] for c in creators]
+        self.cost = [[package_cost(c, p, s) for p, s in packages] for c in creators]
+
+        ids = [c["id"] for c in creators]
+        if isinstance(overlap, dict):
+            self.overlap = [[overlap[a][b] for b in ids] for a in ids]
+        else:
+            self.overlap = [[float(v) for v in row] for row in overlap]
+
+        # Conversion propensity: benchmark CTR scaled by the creator's reel history
+        # (uniform when no creator has any reel history)
+        mean_reel = sum(c["history"]["reel"] for c in creators) / len(creators)
+        if mean_reel > 0:
+            self.conv_rate = [ctr * c["history"]["reel"] / mean_reel * cvr for c in creators]
+        else:
+            self.conv_rate = [ctr * cvr] * len(creators)
+        self.unit = [1.0] * len(creators)
+        self.weight = self.conv_rate if objective == "conversions" else self.unit
+
+    def gain(self, chosen, j, package, weight=None):
+        """Change in objective when creator j moves to ``package`` in ``chosen``"""
+        weight = weight or self.weight
+        current = chosen.get(j)
+        r_new = self.reach[j][package]
+        r_old = self.reach[j][current] if current is not None else 0.0
+        delta = weight[j] * (r_new - r_old)
+        for i, pkg in chosen.items():
+            if i == j:
+                continue
+            r_i = self.reach[i][pkg]
+            shared = min(r_i, r_new) - min(r_i, r_old)
+            delta -= PAIR_DEDUP_RATE * self.overlap[i][j] * shared * (weight[i] + weight[j]) / 2
+        return delta
+
+    def evaluate(self, chosen, weight=None):
+        """Objective value of a full assignment (order independent)"""
+        total = 0.0
+        partial = {}
+        for j, pkg in chosen.items():
+            total += self.gain(partial, j, pkg, weight)
+            partial[j] = pkg
+        return total
+
+    def unique_reach(self, chosen):
+        return self.evaluate(chosen, self.unit)
+
+    def conversions(self, chosen):
+        return self.evaluate(chosen, self.conv_rate)
+
+    def cost_of(self, chosen):
+        return sum(self.cost[j][pkg] for j, pkg in chosen.items())
+
+    def gross_reach(self, chosen):
+        return sum(self.reach[j][pkg] for j, pkg in chosen.items())
+
+    def feasible(self, chosen, budget, target_ratio, max_creators):
+        if max_creators is not None and len(chosen) > max_creators:
+            return False
+        if self.cost_of(chosen) > budget:
+            return False
+        gross = self.gross_reach(chosen)
+        return gross == 0 or self.unique_reach(chosen) / gross >= target_ratio
+
+
+def _solve_exact(problem, budget, target_ratio, max_creators):
+    """Enumerate every package assignment (including leaving creators unbooked)"""
+    n = len(problem.creators)
+    best, best_value = {}, 0.0
+
+    def search(j, chosen, spent):
+        nonlocal best, best_value
+        if j == n:
+            if chosen and problem.feasible(chosen, budget, target_ratio, max_creators):
+                value = problem.evaluate(chosen)
+                if value > best_value:
+                    best, best_value = dict(chosen), value
+            return
+        search(j + 1, chosen, spent)
+        if max_creators is not None and len(chosen) >= max_creators:
+            return
+        for pkg in range(len(problem.packages)):
+            cost = problem.cost[j][pkg]
+            if spent + cost <= budget:
+                chosen[j] = pkg
+                search(j + 1, chosen, spent + cost)
+                del chosen[j]
+
+    search(0, {}, 0.0)
+    return best
+
+
+def _solve_lazy_greedy(problem, budget, target_ratio, max_creators):
+    """Cost-benefit greedy with lazy gain re-evaluation.
+
+    Heap entries are (-gain per rupee, creator, package, version). A creator's
+    entries are rebuilt whenever its own package changes; entries for other
+    creators can only have overestimated gains, so a popped entry whose fresh
+    ratio still beats the next stale bound is taken without re-scanning.
+    """
+    chosen = {}
+    spent = 0.0
+    version = [0] * len(problem.creators)
+
+    def push_options(heap, j):
+        current = chosen.get(j)
+        base_cost = problem.cost[j][current] if current is not None else 0.0
+        for pkg in range(len(problem.packages)):
+            extra = problem.cost[j][pkg] - base_cost
+            if extra <= 0:
+                continue
+            gain = problem.gain(chosen, j, pkg)
+            if gain > 0:
+                heapq.heappush(heap, (-gain / extra, j, pkg, version[j]))
+
+    heap = []
+    for j in range(len(problem.creators)):
+        push_options(heap, j)
+
+    while heap:
+        _, j, pkg, entry_version = heapq.heappop(heap)
+        if entry_version != version[j]:
+            continue
+        current = chosen.get(j)
+        extra = problem.cost[j][pkg] - (problem.cost[j][current] if current is not None else 0.0)
+        gain = problem.gain(chosen, j, pkg)
+        if gain <= 0 or spent + extra > budget:
+            continue
+        if heap and gain / extra < -heap[0][0]:
+            heapq.heappush(heap, (-gain / extra, j, pkg, version[j]))
+            continue
+
+        trial = dict(chosen)
+        trial[j] = pkg
+        if not problem.feasible(trial, budget, target_ratio, max_creators):
+            continue
+        chosen = trial
+        spent += extra
+        version[j] += 1
+        push_options(heap, j)
+
+    # Budgeted greedy can be beaten by a single expensive package; keep the better one
+    best_single, best_single_value = {}, 0.0
+    for j in range(len(problem.creators)):
+        for pkg in range(len(problem.packages)):
+            single = {j: pkg}
+            if problem.cost[j][pkg] <= budget:
+                value = problem.evaluate(single)
+                if value > best_single_value:
+                    best_single, best_single_value = single, value
+    if best_single_value > problem.evaluate(chosen):
+        return best_single
+    return chosen
+
+
+@instrumented(name="portfolio_solve", count=lambda result: len(result["portfolio"]))
+def solve_portfolio(creators, overlap, budget_inr, target_unique_reach=0.0, max_creators=None,
+                    objective="reach", ctr=0.016, cvr=0.025, packages=DEFAULT_PACKAGES,
+                    exact_max_candidates=EXACT_MAX_CANDIDATES):
+    """Choose creators and post/story counts that maximize unique reach or conversions.
+
+    ``creators`` are INFLUENCERS records and ``overlap`` is either the
+    dict-of-dicts from calculate_overlap_matrix or a square array aligned with
+    ``creators``. The portfolio stays within ``budget_inr``, books at most
+    ``max_creators`` creators and keeps unique/gross reach at or above
+    ``target_unique_reach``. ``cheapest_package_inr`` is the lowest fee of
+    any single package, so callers can explain an empty portfolio.
+    """
+    if objective not in ("reach", "conversions"):
+        raise ValueError(f"Unknown objective: {objective}")
+    if not creators:
+        chosen, method, problem = {}, "exact", None
+    else:
+        problem = _Problem(creators, overlap, packages, objective, ctr, cvr)
+        if len(creators) <= exact_max_candidates:
+            method = "exact"
+            chosen = _solve_exact(problem, budget_inr, target_unique_reach, max_creators)
+        else:
+            method = "lazy_greedy"
+            chosen = _solve_lazy_greedy(problem, budget_inr, target_unique_reach, max_creators)
+
+    portfolio = []
+    for j in sorted(chosen):
+        inf = creators[j]
+        posts, stories = packages[chosen[j]]
+        portfolio.append({
+            "candidate_id": inf["id"],
+            "name": inf["name"],
+            "posts": posts,
+            "stories": stories,
+            "cost_inr": int(problem.cost[j][chosen[j]]),
+            "reach": int(problem.reach[j][chosen[j]]),
+        })
+
+    gross = problem.gross_reach(chosen) if problem else 0.0
+    unique = problem.unique_reach(chosen) if problem else 0.0
+    total_cost = problem.cost_of(chosen) if problem else 0.0
+    cheapest = min(min(costs) for costs in problem.cost) if problem else None
+    return {
+        "method": method,
+        "objective": objective,
+        "portfolio": portfolio,
+        "budget_inr": budget_inr,
+        "target_unique_reach": target_unique_reach,
+        "max_creators": max_creators,
+        "total_cost_inr": int(total_cost),
+        "cheapest_package_inr": int(cheapest) if cheapest is not None else None,
+        "forecast": {
+            "gross_reach": int(gross),
+            "unique_reach": int(unique),
+            "unique_reach_ratio": round(unique / gross, 3) if gross else 0.0,
+            "conversions": int(problem.conversions(chosen)) if problem else 0,
+        },
+    }
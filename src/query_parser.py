@@ -0,0 +1,302 @@
+# query_parser.py
+# Brief parser behind decompose(): one keyword automaton plus compiled regexes
+#
+# Keywords (verticals, audiences, tiers, sustainability terms, seasons,
+# regions, platforms and roster topics) are compiled into a single
+# Aho-Corasick automaton, so a brief is scanned once no matter how large the
+# vocabulary grows. Matches must be whole words (hyphens count as word
+# breaks) and overlapping matches resolve leftmost-longest. Terms written in
+# lowercase match case-insensitively; terms with capitals ("US", "May") only
+# match that exact spelling, which keeps "help us" from meaning the US. A
+# lowercase "may" still counts as the month when it reads as a date ("in may",
+# "may 15", "may 2025").
+#
+# Amounts, durations, post counts and follower figures come from compiled
+# regexes; when a brief states several durations ("a 2-week teaser in a
+# 6-week campaign") the longest is the campaign. The default parser is built on first use and rebuilt when the
+# roster's topic vocabulary grows.
+import re
+from collections import deque
+
+from creator_registry import FOLLOWER_BANDS
+from records import TOPICS
+
+# category -> {value: [terms]}; vertical values are in precedence order
+VOCABULARY = {
+    "vertical": {
+        "skincare": ["skincare", "skin care", "skin-care", "serum", "moisturizer", "moisturiser", "sunscreen",
+                     "spf", "cleanser"],
+        "beauty": ["beauty", "makeup", "make-up", "cosmetics", "lipstick", "haircare", "fragrance"],
+    },
+    "audience": {
+        "genz": ["gen z", "genz", "gen-z", "generation z", "zoomers"],
+    },
+    "tier": {
+        "micro": ["micro", "microinfluencer", "microinfluencers", "micro influencer", "micro influencers",
+                  "micro creators"],
+    },
+    "sustainable": {
+        True: ["sustainable", "sustainability", "eco", "eco-friendly", "ecofriendly", "eco-conscious",
+               "ecological", "zero-waste", "zero waste", "planet-friendly", "green beauty", "refillable",
+               "biodegradable", "recyclable", "plastic-free"],
+    },
+    "season": {
+        "winter": ["winter", "winters", "december", "january", "february", "christmas", "diwali",
+                   "holiday season", "festive season"],
+        "summer": ["summer", "summers", "june", "july", "august"],
+        "spring": ["spring", "march", "april", "May"],
+        "monsoon": ["monsoon", "rainy season"],
+        "autumn": ["autumn", "fall season", "september", "october", "november"],
+    },
+    "region": {
+        "US": ["US", "U.S.", "usa", "u.s.a.", "united states", "america", "american", "americans"],
+        "CA": ["canada", "canadian", "canadians"],
+        "UK": ["uk", "u.k.", "united kingdom", "britain", "great britain", "british", "england"],
+        "AU": ["australia", "australian", "australians", "aussie", "aussies"],
+    },
+    "platform": {
+        "instagram": ["instagram", "insta", "ig", "reels", "instagram reels"],
+        "tiktok": ["tiktok", "tik tok", "tik-tok"],
+        "youtube": ["youtube", "yt", "youtube shorts"],
+        "snapchat": ["snapchat"],
+    },
+}
+
+# Rupees per dollar when a brief states its budget in USD
+USD_TO_INR = 83.0
+
+_WORD_NUMBERS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                 "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "a": 1, "an": 1}
+_UNITS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mn": 1e6, "million": 1e6,
+          "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5, "l": 1e5, "cr": 1e7, "crore": 1e7, "crores": 1e7}
+
+
+def _amount_re(tag):
+    return (rf"(?P<num{tag}>\d[\d,]*(?:\.\d+)?)\s*"
+            rf"(?P<unit{tag}>k|thousand|mn|m|million|lakhs?|lacs?|l|cr|crores?)?\b")
+
+
+# Alternatives: "₹5 lakh" / "$10k", "500000 inr", "budget of 3L...", "300k budget"
+# and "50k to spend". A bare "3L" only counts in these money contexts (it may be litres).
+_BUDGET_RE = re.compile(
+    r"(?P<cur1>₹|\brs\.?|\binr|\$|\busd)\s*" + _amount_re(1)
+    + r"|" + _amount_re(2) + r"\s*(?P<cur2>inr|rupees|usd|dollars)\b"
+    + r"|\bbudget\s*(?:of|is|:|=|around|about|~)?\s*" + _amount_re(3)
+    + r"|" + _amount_re(4) + r"\s*budget"
+    + r"|" + _amount_re(5) + r"\s*to\s+(?:spend|invest)\b"
+)
+_USD = ("$", "usd", "dollars")
+_LAKH_RE = re.compile(r"(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>lakhs?|lacs?|crores?|cr)\b")
+_NUMBER = r"(?P<n>\d+(?:\.\d+)?|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|an?)"
+_DURATION_RE = re.compile(r"\b" + _NUMBER + r"[\s-]*(?P<unit>weeks?|wks?|months?|days?)\b")
+_MAY_RE = re.compile(r"\b(?:in|during|by|from|until|till|through|before|after|since|early|mid|late|this|next)"
+                     r"[\s-]+may\b|\bmay[\s-]+(?:\d{1,2}(?:st|nd|rd|th)?|\d{4})\b")
+_POSTS_RE = re.compile(r"\b" + _NUMBER + r"\s+(?P<kind>posts?|reels?|stories|story)\s+(?:per|each|/|a)\s*"
+                       r"(?:creator|influencer)")
+_REACH_RE = re.compile(r"(?P<pct>\d+(?:\.\d+)?)\s*%\s*(?:unique\s+|audience\s+)?reach")
+_FOLLOWERS_RE = re.compile(r"(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>k|m)\b|(?P<plain>\d[\d,]*)\s+(?:followers|subscribers)")
+# A "50k" / "1m" figure is only a follower count with one of these words close by
+_FOLLOWER_CONTEXT_RE = re.compile(r"\b(?:followers?|followings?|subs|subscribers?|creators?|influencers?|"
+                                  r"accounts?|audiences?)\b")
+_FOLLOWER_CONTEXT_CHARS = 24
+
+_MICRO_LOW, _MICRO_HIGH = next((low, high) for name, low, high in FOLLOWER_BANDS if name == "micro")
+
+
+def _number(text):
+    return _WORD_NUMBERS[text] if text in _WORD_NUMBERS else float(text.replace(",", ""))
+
+
+def _amount(num, unit):
+    return float(num.replace(",", "")) * _UNITS.get(unit or "", 1.0)
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over (term, payload) pairs with whole-word matching"""
+
+    def __init__(self, terms):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # state -> [(length, term, payload)]
+        for term, payload in terms:
+            self._insert(term, payload)
+        self._link()
+
+    def _insert(self, term, payload):
+        state = 0
+        for ch in term.lower():
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(term), term, payload))
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Non-overlapping whole-word matches as (start, end, payload), leftmost-longest"""
+        lowered = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, term, payload in out[state]:
+                start = end - length
+                if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(term[0]):
+                    continue
+                if end < len(lowered) and _is_word_char(lowered[end]) and _is_word_char(term[-1]):
+                    continue
+                if term != term.lower() and text[start:end] != term:
+                    continue
+                found.append((start, end, payload))
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches, covered, last = [], 0, None
+        for start, end, payload in found:
+            # A span can carry several payloads (e.g. a term that is both a vertical and a topic)
+            if start >= covered or (start, end) == last:
+                matches.append((start, end, payload))
+                covered, last = end, (start, end)
+        return matches
+
+
+class QueryParser:
+    """Extracts campaign parameters from a free-text brief.
+
+    ``vocabulary`` is shaped like VOCABULARY; ``topics`` are extra topic
+    names (e.g. the roster's) matched with hyphens read as spaces too.
+    """
+
+    def __init__(self, vocabulary=None, topics=()):
+        self.vocabulary = vocabulary or VOCABULARY
+        terms = []
+        for category, values in self.vocabulary.items():
+            for value, words in values.items():
+                terms.extend((word, (category, value)) for word in words)
+        for topic in topics:
+            terms.append((topic, ("topic", topic)))
+            if "-" in topic:
+                terms.append((topic.replace("-", " "), ("topic", topic)))
+        self.matcher = KeywordMatcher(terms)
+        self._vertical_rank = {value: rank for rank, value in enumerate(self.vocabulary.get("vertical", {}))}
+
+    def parse(self, query):
+        """Dict of the parameters the brief states; absent ones are left out"""
+        lowered = query.lower()
+        brief = {}
+
+        found = {}
+        season_at = len(query)
+        for start, _, (category, value) in self.matcher.find(query):
+            if category == "season":
+                season_at = min(season_at, start)
+            values = found.setdefault(category, [])
+            if value not in values:
+                values.append(value)
+        if found.get("vertical"):
+            brief["vertical"] = min(found["vertical"], key=self._vertical_rank.get)
+        for category in ("audience", "tier", "season"):
+            if found.get(category):
+                brief[category] = found[category][0]
+        may = _MAY_RE.search(lowered)
+        if may and may.start() < season_at and "spring" in self.vocabulary.get("season", {}):
+            brief["season"] = "spring"
+        if found.get("sustainable"):
+            brief["sustainable"] = True
+        for category, key in (("region", "regions"), ("platform", "platforms"), ("topic", "topics")):
+            if found.get(category):
+                brief[key] = found[category]
+
+        # Money: an explicit currency/budget amount, else a bare lakh/crore figure
+        budget_spans = []
+        for match in _BUDGET_RE.finditer(lowered):
+            budget_spans.append(match.span())
+            if "budget_inr" in brief:
+                continue
+            tag = next(tag for tag in "12345" if match.group("num" + tag))
+            amount = _amount(match.group("num" + tag), match.group("unit" + tag))
+            usd = match.groupdict().get("cur" + tag) in _USD
+            brief["budget_inr"] = int(round(amount * (USD_TO_INR if usd else 1)))
+        if "budget_inr" not in brief:
+            match = _LAKH_RE.search(lowered)
+            if match:
+                budget_spans.append(match.span())
+                brief["budget_inr"] = int(round(_amount(match.group("num"), match.group("unit"))))
+
+        durations = []
+        for match in _DURATION_RE.finditer(lowered):
+            count, unit = _number(match.group("n")), match.group("unit")
+            if unit.startswith("month"):
+                count *= 52 / 12
+            elif unit.startswith("day"):
+                count /= 7
+            durations.append(max(1, int(round(count))))
+        if durations:
+            # Shorter spans are phases ("a 2-week teaser") or cadences ("2 posts a day")
+            brief["duration_weeks"] = max(durations)
+
+        for match in _POSTS_RE.finditer(lowered):
+            key = "stories_per_creator" if match.group("kind").startswith("stor") else "posts_per_creator"
+            brief.setdefault(key, int(_number(match.group("n"))))
+
+        match = _REACH_RE.search(lowered)
+        if match:
+            brief["target_unique_reach"] = min(1.0, float(match.group("pct")) / 100)
+
+        # Follower figures in the micro band ("10k-100k followers", "creators with 50k")
+        # ask for micro creators
+        if "tier" not in brief:
+            for match in _FOLLOWERS_RE.finditer(lowered):
+                if any(lo <= match.start() < hi for lo, hi in budget_spans):
+                    continue
+                if match.group("plain"):
+                    followers = float(match.group("plain").replace(",", ""))
+                else:
+                    window = lowered[max(0, match.start() - _FOLLOWER_CONTEXT_CHARS):
+                                     match.end() + _FOLLOWER_CONTEXT_CHARS]
+                    if not _FOLLOWER_CONTEXT_RE.search(window):
+                        continue
+                    followers = _amount(match.group("num"), match.group("unit"))
+                if _MICRO_LOW <= followers <= _MICRO_HIGH:
+                    brief["tier"] = "micro"
+                    break
+        return brief
+
+
+_PARSER = None
+_PARSER_TOPICS = -1
+
+
+def get_parser():
+    """The shared QueryParser over VOCABULARY and the roster's topics (compiled once)"""
+    global _PARSER, _PARSER_TOPICS
+    if _PARSER is None or _PARSER_TOPICS != len(TOPICS):
+        _PARSER = QueryParser(VOCABULARY, TOPICS.names)
+        _PARSER_TOPICS = len(TOPICS)
+    return _PARSER
+
+
+def parse_brief(query):
+    """Parameters stated in ``query`` according to the shared parser"""
+    return get_parser().parse(query)
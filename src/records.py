@@ -0,0 +1,366 @@
+# records.py
+# Compact, slotted record types for creators, scores, eval results and forecasts
+#
+# The pipeline was written against plain dicts (inf["aud"]["18-24"],
+# result["composite_score"], pred["forecast"]["reach"]["p50"]), so every type
+# here is a Mapping over fixed fields and keeps that access working.
+# Per-object overhead is what shrinks:
+#   - Creator keeps its aud/geo/history/fraud buckets as float arrays in
+#     creator_schema order and its topics as ids in the shared TOPICS vocabulary,
+#   - eval results, component scores and forecasts use __slots__ instead of a
+#     per-instance dict.
+# Records are not dicts to the json module: use to_json as the ``default=``
+# hook (or plain() on a whole structure) wherever they are serialized.
+import sys
+from array import array
+from collections.abc import Mapping
+
+from creator_schema import AGE_BUCKETS, FRAUD_FIELDS, GEO_REGIONS, HISTORY_FIELDS
+
+
+class TopicVocabulary:
+    """Interns topic strings to dense integer ids (one bit per topic)"""
+
+    def __init__(self, topics=()):
+        self.ids = {}
+        self.names = []
+        for topic in topics:
+            self.intern(topic)
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, topic):
+        topic_id = self.ids.get(topic)
+        if topic_id is None:
+            topic_id = len(self.names)
+            self.ids[topic] = topic_id
+            self.names.append(sys.intern(topic))
+        return topic_id
+
+    @property
+    def words(self):
+        """Number of uint64 words needed for a topic bitmask"""
+        return max(1, (len(self.names) + 63) // 64)
+
+
+# Process-wide vocabulary the Topics of every Creator index into
+TOPICS = TopicVocabulary()
+
+
+class Buckets(array):
+    """Fixed-order float array that reads like the {bucket: share} dict it replaces"""
+
+    __slots__ = ()
+    KEYS = ()
+    INDEX = {}
+
+    def __new__(cls, values=()):
+        return super().__new__(cls, "d", values)
+
+    @classmethod
+    def from_dict(cls, values, default=None):
+        """Buckets from a dict; missing keys take ``default`` (KeyError when None)"""
+        if default is None:
+            return cls([values[key] for key in cls.KEYS])
+        return cls([values.get(key, default) for key in cls.KEYS])
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            return array.__getitem__(self, self.INDEX[key])
+        return array.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        if key.__class__ is str:
+            key = self.INDEX[key]
+        array.__setitem__(self, key, value)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __copy__(self):
+        # array's own copy methods return a plain array
+        return type(self)(self.tolist())
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __contains__(self, key):
+        return key in self.INDEX
+
+    def get(self, key, default=None):
+        index = self.INDEX.get(key)
+        return default if index is None else array.__getitem__(self, index)
+
+    def keys(self):
+        return self.KEYS
+
+    def values(self):
+        return self.tolist()
+
+    def items(self):
+        return zip(self.KEYS, self.tolist())
+
+    def to_json(self):
+        return dict(zip(self.KEYS, self.tolist()))
+
+
+def _buckets(name, keys):
+    return type(name, (Buckets,), {"__slots__": (), "KEYS": keys, "INDEX": {k: i for i, k in enumerate(keys)}})
+
+
+Audience = _buckets("Audience", AGE_BUCKETS)
+Geo = _buckets("Geo", GEO_REGIONS)
+History = _buckets("History", HISTORY_FIELDS)
+FraudIndicators = _buckets("FraudIndicators", FRAUD_FIELDS)
+
+
+class Topics(array):
+    """Topic ids in TOPICS that read like the list of topic names they replace"""
+
+    __slots__ = ()
+
+    def __new__(cls, ids=()):
+        return super().__new__(cls, "i", ids)
+
+    @classmethod
+    def from_names(cls, names):
+        return cls([TOPICS.intern(name) for name in names])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TOPICS.names[t] for t in array.__getitem__(self, index)]
+        return TOPICS.names[array.__getitem__(self, index)]
+
+    def __iter__(self):
+        names = TOPICS.names
+        return (names[t] for t in array.__iter__(self))
+
+    def __contains__(self, name):
+        topic_id = TOPICS.ids.get(name)
+        return topic_id is not None and array.__contains__(self, topic_id)
+
+    def __copy__(self):
+        return type(self)(self.tolist())
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def to_json(self):
+        return list(self)
+
+
+class Record(Mapping):
+    """Slotted record with dict-style read access to its FIELDS.
+
+    A field set to None is treated as absent (missing from iteration, get()
+    and to_json()), which is how optional fields are represented. Records
+    built once per creator spell out __init__, which is several times faster
+    than the generic one.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+
+    def __init__(self, *values, **fields):
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+        for name in self.FIELDS[len(values):]:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {sorted(fields)}")
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(**{name: values.get(name) for name in cls.FIELDS})
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return (name for name in self.FIELDS if getattr(self, name) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={self[name]!r}" for name in self)
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.FIELDS, state):
+            setattr(self, name, value)
+
+    def to_json(self):
+        return {name: plain(self[name]) for name in self}
+
+
+class Creator(Record):
+    """One roster entry (the INFLUENCERS record shape).
+
+    Keys outside FIELDS (e.g. a "rate_inr" card) are kept in ``extra``.
+    """
+
+    FIELDS = ("id", "name", "handle", "platform", "followers", "er", "topics",
+              "aud", "geo", "safety", "history", "fraud_indicators")
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, id, name, handle, platform, followers, er, topics, aud, geo, safety, history,
+                 fraud_indicators, extra=None):
+        self.id = id
+        self.name = name
+        self.handle = handle
+        self.platform = platform
+        self.followers = followers
+        self.er = er
+        self.topics = topics
+        self.aud = aud
+        self.geo = geo
+        self.safety = safety
+        self.history = history
+        self.fraud_indicators = fraud_indicators
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, record):
+        """Compact an INFLUENCERS-shaped dict (Creators are returned as-is)"""
+        if isinstance(record, Creator):
+            return record
+        extra = {key: value for key, value in record.items() if key not in cls._FIELD_SET}
+        return cls(
+            record["id"], record["name"], record["handle"], sys.intern(record["platform"]),
+            record["followers"], record["er"], Topics.from_names(record["topics"]),
+            Audience.from_dict(record["aud"]), Geo.from_dict(record["geo"], 0.0),
+            sys.intern(record["safety"]), History.from_dict(record["history"], 0.0),
+            FraudIndicators.from_dict(record["fraud_indicators"]), extra or None,
+        )
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __iter__(self):
+        yield from self.FIELDS
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return len(self.FIELDS) + len(self.extra or ())
+
+    def __getstate__(self):
+        return super().__getstate__() + (self.extra,)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.extra = state[len(self.FIELDS)]
+
+
+class CreatorScore(Record):
+    """Component scores score_creator() computes for one creator"""
+
+    FIELDS = ("relevance", "audience_fit", "engagement", "safety", "consistency",
+              "fraud_risk", "composite", "alignment")
+    __slots__ = FIELDS
+
+    def __init__(self, relevance, audience_fit, engagement, safety, consistency, fraud_risk, composite,
+                 alignment):
+        self.relevance = relevance
+        self.audience_fit = audience_fit
+        self.engagement = engagement
+        self.safety = safety
+        self.consistency = consistency
+        self.fraud_risk = fraud_risk
+        self.composite = composite
+        self.alignment = alignment
+
+
+class EvalResult(Record):
+    """One ranked creator in eval_agent's "top" list"""
+
+    FIELDS = ("candidate_id", "name", "handle", "composite_score", "topic_score", "audience_fit",
+              "engagement_quality", "brand_safety", "fraud_risk", "alignment_score", "followers", "notes")
+    __slots__ = FIELDS
+
+    def __init__(self, candidate_id, name, handle, composite_score, topic_score, audience_fit,
+                 engagement_quality, brand_safety, fraud_risk, alignment_score, followers, notes):
+        self.candidate_id = candidate_id
+        self.name = name
+        self.handle = handle
+        self.composite_score = composite_score
+        self.topic_score = topic_score
+        self.audience_fit = audience_fit
+        self.engagement_quality = engagement_quality
+        self.brand_safety = brand_safety
+        self.fraud_risk = fraud_risk
+        self.alignment_score = alignment_score
+        self.followers = followers
+        self.notes = notes
+
+
+class Estimate(Record):
+    """P10/P50/P90 of one forecast metric (bands that were not computed are absent)"""
+
+    FIELDS = ("p10", "p50", "p90")
+    __slots__ = FIELDS
+
+
+class Forecast(Record):
+    """predict_agent's "forecast" block - one Estimate per KPI"""
+
+    FIELDS = ("reach", "clicks", "ctr", "cvr", "conversions", "cpm", "cpc")
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_dict(cls, forecast):
+        return cls(**{name: Estimate.from_dict(forecast[name]) for name in cls.FIELDS if name in forecast})
+
+
+def compact_roster(records):
+    """Creator records for a roster of INFLUENCERS-shaped dicts"""
+    return [Creator.from_dict(record) for record in records]
+
+
+def to_json(value):
+    """json ``default=`` hook: records become their dict/list form, anything else str()"""
+    convert = getattr(value, "to_json", None)
+    return convert() if convert is not None else str(value)
+
+
+def plain(value):
+    """Copy of a dict/list structure with every record replaced by plain JSON types"""
+    convert = getattr(value, "to_json", None)
+    if convert is not None:
+        return convert()
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
@@ -0,0 +1,208 @@
+# roster_loader.py
+# Streaming creator roster loader for NDJSON / CSV exports (optionally gzip-compressed)
+#
+# NDJSON rows use the INFLUENCERS record shape. CSV rows are flat: nested
+# fields become prefixed columns (aud_18-24, geo_US, history_reel,
+# fraud_bot_ratio, ...) and topics are "|"-separated.
+import csv
+import gzip
+import io
+import json
+
+from creator_schema import AGE_BUCKETS, FRAUD_FIELDS, GEO_REGIONS, HISTORY_FIELDS
+from records import compact_roster, to_json
+
+DEFAULT_CHUNK_SIZE = 50_000
+MAX_REPORTED_ERRORS = 100
+
+# CSV column prefix -> (record field, bucket names)
+_CSV_GROUPS = {
+    "aud_": ("aud", AGE_BUCKETS),
+    "geo_": ("geo", GEO_REGIONS),
+    "history_": ("history", HISTORY_FIELDS),
+    "fraud_": ("fraud_indicators", FRAUD_FIELDS),
+}
+
+
+class LoadReport:
+    """Counts of rows read/loaded plus the first malformed rows and why they failed"""
+
+    def __init__(self, max_errors=MAX_REPORTED_ERRORS):
+        self.rows_read = 0
+        self.rows_loaded = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def reject(self, line_no, problems):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_no, "errors": problems})
+
+    def to_dict(self):
+        return {
+            "rows_read": self.rows_read,
+            "rows_loaded": self.rows_loaded,
+            "rows_rejected": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def open_text(path):
+    """Open a roster file for reading text, transparently un-gzipping *.gz"""
+    if str(path).endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _format_of(path):
+    name = str(path)
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return "csv" if name.endswith(".csv") else "ndjson"
+
+
+def _number(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return float(value) if any(c in value for c in ".eE") else int(value)
+    return value
+
+
+def csv_row_to_record(row):
+    """Rebuild a nested creator record from one flat CSV row"""
+    record = {field: {} for field, _ in _CSV_GROUPS.values()}
+    for column, value in row.items():
+        if column is None or value is None or value == "":
+            continue
+        for prefix, (field, _) in _CSV_GROUPS.items():
+            if column.startswith(prefix):
+                record[field][column[len(prefix):]] = _number(value)
+                break
+        else:
+            record[column] = value
+    for key in ("id", "followers"):
+        if key in record:
+            record[key] = int(record[key])
+    if "er" in record:
+        record["er"] = float(record["er"])
+    record["topics"] = [t for t in record.get("topics", "").split("|") if t]
+    return record
+
+
+def iter_rows(path):
+    """Yield (line_no, record, parse_error) for every row of an NDJSON or CSV file"""
+    with open_text(path) as handle:
+        if _format_of(path) == "csv":
+            for line_no, row in enumerate(csv.DictReader(handle), start=2):
+                try:
+                    yield line_no, csv_row_to_record(row), None
+                except ValueError as exc:
+                    yield line_no, None, f"unparseable value: {exc}"
+        else:
+            for line_no, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line), None
+                except json.JSONDecodeError as exc:
+                    yield line_no, None, f"invalid JSON: {exc.msg}"
+
+
+def _check_buckets(record, field, keys, problems):
+    buckets = record.get(field)
+    if not isinstance(buckets, dict):
+        problems.append(f"{field} must be an object")
+        return
+    for key in keys:
+        value = buckets.get(key)
+        if value is None:
+            problems.append(f"{field}.{key} is missing")
+        elif not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+            problems.append(f"{field}.{key} must be a non-negative number")
+
+
+def validate_creator(record):
+    """Problems that would break eval_agent for this record (empty list = valid)"""
+    if not isinstance(record, dict):
+        return ["record must be an object"]
+    problems = []
+    if not isinstance(record.get("id"), int) or isinstance(record.get("id"), bool):
+        problems.append("id must be an integer")
+    for key in ("name", "handle", "platform", "safety"):
+        if not isinstance(record.get(key), str) or not record.get(key):
+            problems.append(f"{key} must be a non-empty string")
+    followers = record.get("followers")
+    if not isinstance(followers, int) or isinstance(followers, bool) or followers < 0:
+        problems.append("followers must be a non-negative integer")
+    er = record.get("er")
+    if not isinstance(er, (int, float)) or isinstance(er, bool) or not 0 <= er <= 1:
+        problems.append("er must be a number between 0 and 1")
+    topics = record.get("topics")
+    if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+        problems.append("topics must be a list of strings")
+    _check_buckets(record, "aud", AGE_BUCKETS, problems)
+    _check_buckets(record, "geo", GEO_REGIONS, problems)
+    _check_buckets(record, "history", ("reel",), problems)
+    _check_buckets(record, "fraud_indicators", FRAUD_FIELDS, problems)
+    return problems
+
+
+def iter_creator_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, report=None):
+    """Yield lists of at most ``chunk_size`` valid creator records.
+
+    Malformed rows, and rows repeating an id already loaded, are recorded on
+    ``report`` and skipped, so one bad row never aborts the load. Only one
+    chunk of dicts is alive at a time.
+    """
+    report = report if report is not None else LoadReport()
+    chunk = []
+    seen = set()
+    for line_no, record, parse_error in iter_rows(path):
+        report.rows_read += 1
+        problems = [parse_error] if parse_error else validate_creator(record)
+        if not problems and record["id"] in seen:
+            problems = [f"duplicate id {record['id']}"]
+        if problems:
+            report.reject(line_no, problems)
+            continue
+        seen.add(record["id"])
+        chunk.append(record)
+        report.rows_loaded += 1
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_store(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream a roster file straight into a CreatorStore; returns (store, report)"""
+    from creator_store import CreatorStoreBuilder
+
+    report = LoadReport()
+    builder = CreatorStoreBuilder()
+    for chunk in iter_creator_chunks(path, chunk_size, report):
+        builder.append(chunk)
+    return builder.build(), report
+
+
+def load_records(path, chunk_size=DEFAULT_CHUNK_SIZE, compact=False):
+    """Load every valid record (for rosters small enough to keep in memory).
+
+    ``compact=True`` converts each chunk to records.Creator as it is read,
+    so only one chunk of dicts is alive at a time.
+    """
+    report = LoadReport()
+    records = []
+    for chunk in iter_creator_chunks(path, chunk_size, report):
+        records.extend(compact_roster(chunk) if compact else chunk)
+    return records, report
+
+
+def write_ndjson(records, path):
+    """Write creator records as NDJSON (gzip-compressed for *.gz paths)"""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(json.dumps(record, default=to_json) + "\n")
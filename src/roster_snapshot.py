@@ -0,0 +1,187 @@
+# roster_snapshot.py
+# Binary, memory-mapped snapshot of a CreatorStore for near-instant worker startup
+#
+# File layout (all sections 64-byte aligned):
+#
+#   prefix   magic (8s) | schema version (u32) | header length (u32) | header crc32 (u32)
+#   header   UTF-8 JSON: row count, roster digest, the source roster file's
+#            path/size/mtime (if written from one), non-schema record fields
+#            by row, label tables, and for every column / string table its
+#            dtype, shape and byte offset, plus the crc32 of the data region
+#   data     fixed-width numeric columns, then string tables stored as an
+#            int64 offset array followed by the concatenated UTF-8 bytes
+#
+# Opening maps the file read-only with numpy.memmap, so several worker
+# processes scoring from the same snapshot share the same physical pages.
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from creator_store import CreatorStore, TopicVocabulary
+
+MAGIC = b"MMSNAP\x00\x00"
+SCHEMA_VERSION = 1
+PREFIX = struct.Struct("<8sIII")
+ALIGN = 64
+
+NUMERIC_COLUMNS = (
+    "id", "followers", "er", "aud", "geo", "history", "fraud",
+    "safety", "platform", "topic_ptr", "topic_ids", "topic_bits",
+)
+
+
+class SnapshotError(Exception):
+    """Snapshot is missing, corrupt, from another schema version or stale"""
+
+
+class StringTable:
+    """Read-only sequence of strings backed by an offset array and a byte blob"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def _pad(size):
+    return (-size) % ALIGN
+
+
+def _encode_strings(values):
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def source_stamp(path):
+    """Identity of a roster file as recorded in snapshot headers (path, size, mtime)"""
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_snapshot(store, path, roster_digest=None, source=None, extras=None):
+    """Write ``store`` to ``path`` atomically (via a temp file + rename)
+
+    ``source`` is the source_stamp() of the roster file the store was loaded
+    from; ``extras`` maps row numbers to record fields the columns do not
+    hold (e.g. "rate_inr" cards).
+    """
+    arrays = [(name, np.ascontiguousarray(store.columns[name])) for name in NUMERIC_COLUMNS]
+    strings = {}
+    for name in ("names", "handles"):
+        offsets, blob = _encode_strings(getattr(store, name))
+        arrays.append((f"{name}.offsets", offsets))
+        arrays.append((f"{name}.blob", blob))
+        strings[name] = [f"{name}.offsets", f"{name}.blob"]
+
+    layout = {}
+    offset = 0
+    for name, array in arrays:
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes + _pad(array.nbytes)
+
+    crc = 0
+    for _, array in arrays:
+        crc = zlib.crc32(array.tobytes(), crc)
+        crc = zlib.crc32(b"\0" * _pad(array.nbytes), crc)
+
+    header = json.dumps({
+        "rows": len(store),
+        "roster_digest": roster_digest,
+        "source": source,
+        "extras": {str(row): fields for row, fields in (extras or {}).items()},
+        "topics": store.vocab.names,
+        "safety_labels": list(store.safety_labels),
+        "platform_labels": list(store.platform_labels),
+        "columns": layout,
+        "strings": strings,
+        "data_bytes": offset,
+        "data_crc32": crc,
+    }).encode("utf-8")
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        handle.write(PREFIX.pack(MAGIC, SCHEMA_VERSION, len(header), zlib.crc32(header)))
+        handle.write(header)
+        handle.write(b"\0" * _pad(PREFIX.size + len(header)))
+        for _, array in arrays:
+            handle.write(array.tobytes())
+            handle.write(b"\0" * _pad(array.nbytes))
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """Parse and check the snapshot prefix/header; returns (header dict, data start)"""
+    try:
+        with open(path, "rb") as handle:
+            prefix = handle.read(PREFIX.size)
+            if len(prefix) < PREFIX.size:
+                raise SnapshotError(f"{path}: truncated snapshot")
+            magic, version, header_len, header_crc = PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise SnapshotError(f"{path}: not a creator snapshot")
+            if version != SCHEMA_VERSION:
+                raise SnapshotError(f"{path}: schema version {version}, expected {SCHEMA_VERSION}")
+            header = handle.read(header_len)
+    except OSError as exc:
+        raise SnapshotError(f"{path}: {exc}") from exc
+    if len(header) != header_len or zlib.crc32(header) != header_crc:
+        raise SnapshotError(f"{path}: header checksum mismatch")
+    data_start = PREFIX.size + header_len
+    return json.loads(header), data_start + _pad(data_start)
+
+
+def open_snapshot(path, expected_digest=None, expected_source=None, verify=False):
+    """Memory-map a snapshot as a CreatorStore.
+
+    Stale snapshots (``expected_digest`` or ``expected_source`` differs from
+    the one recorded at write time) and other schema versions are rejected
+    with SnapshotError. The header is always checksummed; ``verify=True``
+    also checksums the whole data region, which reads every page. The parsed
+    header is kept as ``store.header``.
+    """
+    header, data_start = read_header(path)
+    if expected_digest is not None and header["roster_digest"] != expected_digest:
+        raise SnapshotError(f"{path}: snapshot is stale (roster changed since it was written)")
+    if expected_source is not None and header.get("source") != expected_source:
+        raise SnapshotError(f"{path}: snapshot is stale (roster file changed since it was written)")
+
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(data) < data_start + header["data_bytes"]:
+        raise SnapshotError(f"{path}: truncated data region")
+    data = data[data_start:data_start + header["data_bytes"]]
+    if verify and zlib.crc32(data) != header["data_crc32"]:
+        raise SnapshotError(f"{path}: data checksum mismatch")
+
+    def view(name):
+        spec = header["columns"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        raw = data[spec["offset"]:spec["offset"] + count * dtype.itemsize]
+        return raw.view(dtype).reshape(spec["shape"])
+
+    columns = {name: view(name) for name in NUMERIC_COLUMNS}
+    names, handles = (
+        StringTable(view(offsets), view(blob))
+        for offsets, blob in (header["strings"]["names"], header["strings"]["handles"])
+    )
+    store = CreatorStore(
+        columns, names, handles, TopicVocabulary(header["topics"]),
+        header["safety_labels"], header["platform_labels"],
+    )
+    store.header = header
+    return store
@@ -0,0 +1,154 @@
+# sensitivity_sweep.py
+# What-if sweeps: predict_agent's point forecast evaluated over a parameter grid
+#
+# predict_agent's reach is a sum over creators of followers * reach_rate *
+# (1.4 * posts + 0.6 * stories). With posts/stories shared by every creator,
+# the roster only enters through a few sums, precomputed once per shortlist:
+#
+#   F       = sum followers_i * reach_rate_i
+#   C_reel  = sum followers_i * reel fee_i     C_story = sum followers_i * story fee_i
+#
+# so every grid point is a handful of multiply-adds on broadcast arrays.
+# A budget axis caps spend: when the content plan costs more than the budget
+# the booked content is scaled down proportionally.
+import numpy as np
+
+import marketmuse_sim
+from portfolio_optimizer import package_cost
+
+# Axis order of the returned surfaces
+AXES = ("budget_inr", "posts_per_creator", "stories_per_creator", "ctr_uplift", "season", "overlap_factor")
+NUMERIC_AXES = tuple(axis for axis in AXES if axis != "season")
+
+REEL_REACH = 1.4
+STORY_REACH = 0.6
+CREATIVE_QUALITY_UPLIFT = 0.002
+
+# Metrics elasticities are reported for
+ELASTICITY_METRICS = ("reach", "conversions", "cpa_inr")
+
+
+def creator_terms(creators):
+    """Per-shortlist sums the sweep needs (INFLUENCERS records in)"""
+    weighted_reach = sum(
+        inf["followers"] * max(0.2, min(0.8, 0.45 + (inf["er"] - 0.03) * 2)) for inf in creators
+    )
+    return {
+        "weighted_reach": weighted_reach,
+        "reel_cost": sum(package_cost(inf, 1, 0) for inf in creators),
+        "story_cost": sum(package_cost(inf, 0, 1) for inf in creators),
+    }
+
+
+def _axis_values(task, grid, axis, budget_inr):
+    if axis in grid:
+        return np.asarray(grid[axis]).tolist()
+    defaults = {
+        "budget_inr": budget_inr,
+        "posts_per_creator": task["posts_per_creator"],
+        "stories_per_creator": task["stories_per_creator"],
+        "ctr_uplift": 0.0,
+        "season": task.get("season", "winter"),
+        "overlap_factor": None,
+    }
+    return [defaults[axis]]
+
+
+def _broadcast(values, position, dtype=np.float64):
+    shape = [1] * len(AXES)
+    shape[position] = -1
+    return np.asarray(values, dtype=dtype).reshape(shape)
+
+
+def sweep_forecast(task, eval_out, grid=None, as_lists=False, budget_inr=None):
+    """Forecast predict_agent's metrics over every combination of ``grid`` values.
+
+    ``grid`` maps axis names in AXES to value lists; axes left out stay at
+    the task's value (the eval's overlap factor, no CTR uplift). The budget
+    axis defaults to ``budget_inr``, else the task's "budget_inr" (decompose
+    copies the brief's budget into the predict task); only a task with
+    neither is swept without a budget cap. Returns the axis values, one
+    surface per metric (arrays shaped by the axis lengths in AXES order)
+    and, for numeric axes with several values, elasticity surfaces
+    d ln(metric) / d ln(axis) for ELASTICITY_METRICS. ``as_lists`` converts
+    arrays to JSON-ready lists.
+    """
+    grid = grid or {}
+    unknown = set(grid) - set(AXES)
+    if unknown:
+        raise ValueError(f"Unknown sweep axes: {sorted(unknown)}")
+
+    terms = creator_terms([marketmuse_sim.REGISTRY.get(c["candidate_id"]) for c in eval_out["top"]])
+    if budget_inr is None:
+        budget_inr = task.get("budget_inr")
+    axes = {axis: _axis_values(task, grid, axis, budget_inr) for axis in AXES}
+    if axes["overlap_factor"] == [None]:
+        axes["overlap_factor"] = [eval_out["overlap_factor"]]
+
+    budget = _broadcast([np.inf if b is None else b for b in axes["budget_inr"]], 0)
+    posts = _broadcast(axes["posts_per_creator"], 1)
+    stories = _broadcast(axes["stories_per_creator"], 2)
+    uplift = _broadcast(axes["ctr_uplift"], 3)
+    overlap = _broadcast(axes["overlap_factor"], 5)
+
+    vertical = task.get("vertical", "skincare")
+    benchmarks = [marketmuse_sim.benchmark_for(vertical, season) for season in axes["season"]]
+    season_ctr = _broadcast([b["avg_ctr"] for b in benchmarks], 4)
+    season_cpm = _broadcast([b["avg_cpm"] for b in benchmarks], 4)
+
+    # Content cost and the share of it the budget pays for
+    plan_cost = posts * terms["reel_cost"] + stories * terms["story_cost"]
+    booked = np.minimum(1.0, np.divide(budget, plan_cost, out=np.ones_like(plan_cost + budget),
+                                       where=plan_cost > 0))
+    spend = np.minimum(budget, plan_cost)
+
+    sustainability_uplift = 0.003 if task.get("sustainability_focus", False) else 0
+    ctr = season_ctr + sustainability_uplift + CREATIVE_QUALITY_UPLIFT + uplift
+    cvr = task["baseline_cvr"]
+    reach = terms["weighted_reach"] * (REEL_REACH * posts + STORY_REACH * stories) * booked * (1 - 0.5 * overlap)
+    clicks = reach * ctr
+    conversions = clicks * cvr
+    shape = tuple(len(axes[axis]) for axis in AXES)
+
+    surfaces = {
+        "reach": reach,
+        "clicks": clicks,
+        "conversions": conversions,
+        "ctr": ctr,
+        "cpm": season_cpm,
+        "cpc": season_cpm / (ctr * 1000),
+        "spend_inr": spend,
+        "cpa_inr": np.divide(spend, conversions, out=np.full(np.broadcast(spend, conversions).shape, np.nan),
+                             where=conversions > 0),
+    }
+    surfaces = {name: np.broadcast_to(values, shape) for name, values in surfaces.items()}
+
+    elasticities = {}
+    for position, axis in enumerate(AXES):
+        values = np.asarray(axes[axis], dtype=np.float64) if axis in NUMERIC_AXES else None
+        if values is None or len(values) < 2 or not np.all(np.isfinite(values)):
+            continue
+        x = _broadcast(values, position)
+        elasticities[axis] = {}
+        for metric in ELASTICITY_METRICS:
+            surface = surfaces[metric]
+            slope = np.gradient(surface, values, axis=position)
+            elasticities[axis][metric] = np.divide(
+                slope * x, surface, out=np.full(shape, np.nan), where=np.isfinite(surface) & (surface != 0)
+            )
+
+    result = {"axes": axes, "shape": list(shape), "surfaces": surfaces, "elasticities": elasticities}
+    if as_lists:
+        result["surfaces"] = {name: _tolist(values) for name, values in surfaces.items()}
+        result["elasticities"] = {
+            axis: {metric: _tolist(values) for metric, values in metrics.items()}
+            for axis, metrics in elasticities.items()
+        }
+    return result
+
+
+def _tolist(array):
+    """Nested lists with NaN/inf as None (JSON has no NaN)"""
+    array = np.asarray(array, dtype=object)
+    array[~np.isfinite(array.astype(np.float64))] = None
+    return array.tolist()
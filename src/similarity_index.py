@@ -0,0 +1,438 @@
+# similarity_index.py
+# Approximate nearest-neighbour index for "find similar creators" queries
+#
+# Each creator is embedded as a weighted vector of its audience (aud) and geo
+# distributions, normalized engagement (er and the reel/static/story history
+# rates, on score_creator's scales) and a one-hot topic block scaled by
+# 1/sqrt(topic count). Similarity is the cosine of the embeddings after the
+# dense part is centered on the roster mean.
+#
+# Candidates come from random-projection LSH (SimHash): ``tables`` hash tables
+# of ``bits`` hyperplane signs each, probed at the query's own bucket plus the
+# buckets reached by flipping its ``probes`` least certain bits. Candidates are
+# re-ranked exactly, so results are exact among the candidates; when filters
+# leave fewer than k candidates the query falls back to a full scan.
+#
+# Built tables are sorted code arrays (binary-searched); add() hashes a new
+# creator into small per-table dicts that compact() merges back once they
+# grow. Removed or replaced creators are tombstoned.
+import numpy as np
+
+from overlap_engine import popcount
+from records import Creator, TopicVocabulary
+
+DEFAULT_TABLES = 12
+DEFAULT_BITS = 14
+DEFAULT_PROBES = 6
+
+# SimilarityIndex options roster_index() keys its shared indexes on
+_INDEX_DEFAULTS = {"tables": DEFAULT_TABLES, "bits": DEFAULT_BITS, "probes": DEFAULT_PROBES, "seed": 0}
+
+# Block weights of the embedding
+AUDIENCE_WEIGHT = 1.0
+GEO_WEIGHT = 0.8
+ENGAGEMENT_WEIGHT = 0.5
+TOPIC_WEIGHT = 1.0
+
+# Engagement normalizers, as in score_creator
+ER_SCALE = 0.06
+RATE_SCALE = 0.15
+
+AUD_DIM, GEO_DIM, ENGAGEMENT_DIM = 4, 5, 4
+DENSE_DIM = AUD_DIM + GEO_DIM + ENGAGEMENT_DIM
+_AUD = slice(0, AUD_DIM)
+_GEO = slice(AUD_DIM, AUD_DIM + GEO_DIM)
+
+# Pending inserts are merged into the sorted tables past this share of the index
+COMPACT_RATIO = 0.25
+MIN_COMPACT_ROWS = 1024
+
+
+def dense_features(aud, geo, er, history):
+    """(n, DENSE_DIM) float32 dense embedding block from columnar creator fields"""
+    engagement = np.column_stack([np.asarray(er) / ER_SCALE, np.asarray(history)[:, :3] / RATE_SCALE])
+    return np.hstack([
+        np.asarray(aud) * AUDIENCE_WEIGHT,
+        np.asarray(geo) * GEO_WEIGHT,
+        np.clip(engagement, 0.0, 1.0) * ENGAGEMENT_WEIGHT,
+    ]).astype(np.float32)
+
+
+class SimilarityIndex:
+    """LSH index over creator embeddings with k-NN and complementary-audience queries"""
+
+    def __init__(self, tables=DEFAULT_TABLES, bits=DEFAULT_BITS, probes=DEFAULT_PROBES, seed=0, vocab=None):
+        if not 1 <= bits <= 30:
+            raise ValueError(f"bits must be between 1 and 30, got {bits}")
+        self.tables = tables
+        self.bits = bits
+        self.probes = min(probes, bits)
+        self.vocab = TopicVocabulary(vocab.names if vocab is not None else ())
+        planes = tables * bits
+        self._dense_planes = np.random.default_rng([seed, 0]).standard_normal((DENSE_DIM, planes)).astype(np.float32)
+        self._topic_rng = np.random.default_rng([seed, 1])
+        self._topic_planes = self._topic_rng.standard_normal((len(self.vocab), planes)).astype(np.float32)
+        self._bit_values = (1 << np.arange(bits)).astype(np.int32)
+        self.center = np.zeros(DENSE_DIM, dtype=np.float32)
+
+        self.size = 0
+        self.dense = np.empty((0, DENSE_DIM), dtype=np.float32)
+        self.norm = np.empty(0, dtype=np.float32)
+        self.topic_bits = np.empty((0, self.vocab.words), dtype=np.uint64)
+        self.topic_count = np.empty(0, dtype=np.int32)
+        self.followers = np.empty(0, dtype=np.int64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.alive = np.empty(0, dtype=bool)
+        self.codes = np.empty((0, tables), dtype=np.int32)
+        self._base_names, self._base_handles = (), ()
+        self._names, self._handles = [], []
+
+        self._sorted_codes = [np.empty(0, dtype=np.int32) for _ in range(tables)]
+        self._sorted_rows = [np.empty(0, dtype=np.int64) for _ in range(tables)]
+        self._pending = [{} for _ in range(tables)]
+        self._pending_rows = 0
+        self._id_order = np.empty(0, dtype=np.int64)  # rows hashed into the sorted tables, by id
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+        self._added = {}  # creator id -> row, for rows inserted since the last compact()
+
+    def __len__(self):
+        return int(self.alive[:self.size].sum())
+
+    def __contains__(self, creator_id):
+        return self._row_of(creator_id) is not None
+
+    @classmethod
+    def from_store(cls, store, **options):
+        """Index every creator in a CreatorStore (chunked, so 1M+ rows stay in memory bounds)"""
+        index = cls(vocab=store.vocab, **options)
+        n = len(store)
+        dense = dense_features(store.aud, store.geo, store.er, store.history)
+        index.center = dense.mean(axis=0) if n else index.center
+        counts = np.diff(store.topic_ptr).astype(np.int32)
+        index._reserve(n)
+        index.dense[:n] = dense
+        index.topic_bits[:n] = store.topic_bits
+        index.topic_count[:n] = counts
+        index.followers[:n] = store.followers
+        index.ids[:n] = store.id
+        index.alive[:n] = True
+        # The multi-hot topic block of a chunk is rows x vocabulary floats
+        step = max(1024, min(100_000, 25_000_000 // max(len(index.vocab), 1)))
+        for start in range(0, n, step):
+            stop = min(n, start + step)
+            proj = index._project(dense[start:stop], store.topic_ptr[start:stop + 1], store.topic_ids)
+            index.codes[start:stop] = index._codes(proj)
+            index.norm[start:stop] = index._norms(dense[start:stop], counts[start:stop])
+        index.size = n
+        index._base_names, index._base_handles = store.names, store.handles
+        index.compact()
+        return index
+
+    # -- storage ---------------------------------------------------------
+
+    def _reserve(self, n):
+        """Grow the row arrays (doubling) to hold at least n rows"""
+        capacity = len(self.ids)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 64)
+
+        def grow(array):
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        for name in ("dense", "norm", "topic_bits", "topic_count", "followers", "ids", "alive", "codes"):
+            setattr(self, name, grow(getattr(self, name)))
+
+    def _topic_ids(self, topics):
+        """Intern topics, widening the bitmask and hyperplanes for unseen ones"""
+        ids = [self.vocab.intern(topic) for topic in topics]
+        if self.vocab.words > self.topic_bits.shape[1]:
+            widened = np.zeros((len(self.topic_bits), self.vocab.words), dtype=np.uint64)
+            widened[:, :self.topic_bits.shape[1]] = self.topic_bits
+            self.topic_bits = widened
+        missing = len(self.vocab) - len(self._topic_planes)
+        if missing > 0:
+            extra = self._topic_rng.standard_normal((missing, self._topic_planes.shape[1])).astype(np.float32)
+            self._topic_planes = np.vstack([self._topic_planes, extra])
+        return np.asarray(ids, dtype=np.int64)
+
+    def _row_of(self, creator_id):
+        row = self._added.get(creator_id)
+        if row is None:
+            at = np.searchsorted(self._sorted_ids, creator_id)
+            if at < len(self._sorted_ids) and self._sorted_ids[at] == creator_id:
+                row = int(self._id_order[at])
+        if row is None or not self.alive[row]:
+            return None
+        return row
+
+    def add(self, record):
+        """Insert (or replace) one creator record; returns its row"""
+        creator = Creator.from_dict(record)
+        old = self._row_of(creator["id"])
+        if old is not None:
+            self.alive[old] = False
+        row = self.size
+        self._reserve(row + 1)
+        dense = dense_features(
+            np.asarray(creator["aud"].values(), dtype=np.float64)[None, :],
+            np.asarray(creator["geo"].values(), dtype=np.float64)[None, :],
+            np.array([creator["er"]], dtype=np.float64),
+            np.asarray(creator["history"].values(), dtype=np.float64)[None, :],
+        )
+        topic_ids = self._topic_ids(creator["topics"])
+        words, bit = np.divmod(topic_ids, 64)
+        bits = np.zeros(self.topic_bits.shape[1], dtype=np.uint64)
+        np.bitwise_or.at(bits, words, np.left_shift(np.uint64(1), bit.astype(np.uint64)))
+        count = len(topic_ids)
+
+        self.dense[row] = dense[0]
+        self.topic_bits[row] = bits
+        self.topic_count[row] = count
+        self.followers[row] = creator["followers"]
+        self.ids[row] = creator["id"]
+        self.alive[row] = True
+        self.norm[row] = self._norms(dense, np.array([count]))[0]
+        proj = self._project(dense, np.array([0, count]), topic_ids)
+        self.codes[row] = self._codes(proj)[0]
+        self._names.append(creator["name"])
+        self._handles.append(creator["handle"])
+        self.size += 1
+
+        for table, code in enumerate(self.codes[row].tolist()):
+            self._pending[table].setdefault(code, []).append(row)
+        self._added[creator["id"]] = row
+        self._pending_rows += 1
+        if self._pending_rows > max(MIN_COMPACT_ROWS, COMPACT_RATIO * self.size):
+            self.compact()
+        return row
+
+    def remove(self, creator_id):
+        """Tombstone a creator; returns False when it is not indexed"""
+        row = self._row_of(creator_id)
+        if row is None:
+            return False
+        self.alive[row] = False
+        return True
+
+    def compact(self):
+        """Merge pending inserts into the sorted tables and drop tombstoned rows from them"""
+        rows = np.flatnonzero(self.alive[:self.size])
+        for table in range(self.tables):
+            codes = self.codes[rows, table]
+            order = np.argsort(codes, kind="stable")
+            self._sorted_codes[table] = codes[order]
+            self._sorted_rows[table] = rows[order]
+            self._pending[table] = {}
+        self._id_order = rows[np.argsort(self.ids[rows], kind="stable")]
+        self._sorted_ids = self.ids[self._id_order]
+        self._added = {}
+        self._pending_rows = 0
+
+    # -- embedding and hashing ---------------------------------------------
+
+    def _project(self, dense, topic_ptr, topic_ids, reflect_audience=False):
+        """Hyperplane projections for rows given as dense features plus CSR topics"""
+        centered = dense - self.center
+        if reflect_audience:
+            centered[:, _AUD] *= -1
+            centered[:, _GEO] *= -1
+        proj = centered @ self._dense_planes
+        counts = np.diff(topic_ptr)
+        has_topics = counts > 0
+        if has_topics.any():
+            # Scaled multi-hot topic rows times the topic planes: a BLAS matmul is
+            # far faster than summing gathered plane rows with reduceat
+            weights = np.zeros((len(counts), len(self._topic_planes)), dtype=np.float32)
+            rows = np.repeat(np.arange(len(counts)), counts)
+            scale = TOPIC_WEIGHT / np.sqrt(np.maximum(counts, 1))
+            weights[rows, topic_ids[topic_ptr[0]:topic_ptr[-1]]] = scale[rows]
+            proj += weights @ self._topic_planes
+        return proj
+
+    def _codes(self, proj):
+        signs = (proj > 0).reshape(len(proj), self.tables, self.bits)
+        return (signs * self._bit_values).sum(axis=2, dtype=np.int32)
+
+    def _norms(self, dense, counts):
+        centered = dense - self.center
+        return np.sqrt((centered ** 2).sum(axis=1) + np.where(counts > 0, TOPIC_WEIGHT ** 2, 0.0))
+
+    def _probe_codes(self, proj):
+        """(tables, 1 + probes) codes: the query's bucket plus those one uncertain bit away"""
+        proj = proj.reshape(self.tables, self.bits)
+        codes = self._codes(proj.reshape(1, -1))[0]
+        uncertain = np.argsort(np.abs(proj), axis=1)[:, :self.probes]
+        flips = codes[:, None] ^ self._bit_values[uncertain]
+        return np.column_stack([codes, flips]).astype(np.int32)
+
+    def _candidates(self, proj):
+        found = []
+        for table, codes in enumerate(self._probe_codes(proj)):
+            sorted_codes = self._sorted_codes[table]
+            starts = np.searchsorted(sorted_codes, codes, side="left")
+            stops = np.searchsorted(sorted_codes, codes, side="right")
+            for lo, hi in zip(starts.tolist(), stops.tolist()):
+                if hi > lo:
+                    found.append(self._sorted_rows[table][lo:hi])
+            if self._pending[table]:
+                for code in codes.tolist():
+                    pending = self._pending[table].get(code)
+                    if pending:
+                        found.append(np.asarray(pending, dtype=np.int64))
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        rows = np.unique(np.concatenate(found))
+        return rows[self.alive[rows]]
+
+    # -- scoring -----------------------------------------------------------
+
+    def _common_topics(self, row, rows):
+        return popcount(self.topic_bits[rows] & self.topic_bits[row]).sum(axis=1)
+
+    def _similarity(self, row, rows):
+        centered = self.dense[rows] - self.center
+        dot = centered @ (self.dense[row] - self.center)
+        common = self._common_topics(row, rows)
+        pair = np.sqrt(self.topic_count[rows].astype(np.float64) * self.topic_count[row])
+        topic = np.divide(common, pair, out=np.zeros(len(rows)), where=pair > 0)
+        return (dot + TOPIC_WEIGHT ** 2 * topic) / np.maximum(self.norm[rows] * self.norm[row], 1e-12)
+
+    def _overlap(self, row, rows):
+        """calculate_overlap_matrix's overlap score between ``row`` and each of ``rows``"""
+        common = self._common_topics(row, rows)
+        longest = np.maximum(self.topic_count[rows], self.topic_count[row])
+        topic_overlap = np.divide(common, longest, out=np.zeros(len(rows)), where=longest > 0)
+        geo_overlap = np.minimum(self.dense[rows, _GEO], self.dense[row, _GEO]).sum(axis=1) / GEO_WEIGHT
+        demo_overlap = np.minimum(self.dense[rows, _AUD], self.dense[row, _AUD]).sum(axis=1) / AUDIENCE_WEIGHT
+        return topic_overlap * 0.4 + geo_overlap * 0.3 + demo_overlap * 0.3
+
+    def _topic_similarity(self, row, rows):
+        common = self._common_topics(row, rows)
+        pair = np.sqrt(self.topic_count[rows].astype(np.float64) * self.topic_count[row])
+        return np.divide(common, pair, out=np.zeros(len(rows)), where=pair > 0)
+
+    def _eligible(self, row, rows, cheaper, max_followers, exclude):
+        keep = rows != row
+        if cheaper:
+            keep &= self.followers[rows] < self.followers[row]
+        if max_followers is not None:
+            keep &= self.followers[rows] <= max_followers
+        if exclude:
+            keep &= ~np.isin(self.ids[rows], list(exclude))
+        return rows[keep]
+
+    def _query_row(self, creator_id):
+        row = self._row_of(creator_id)
+        if row is None:
+            raise KeyError(f"Creator {creator_id} is not in the similarity index")
+        return row
+
+    def _query_proj(self, row, reflect_audience=False):
+        topic_ids = np.flatnonzero(np.unpackbits(self.topic_bits[row].view(np.uint8), bitorder="little"))
+        return self._project(self.dense[row:row + 1], np.array([0, len(topic_ids)]), topic_ids,
+                             reflect_audience)[0]
+
+    def _result(self, row, **scores):
+        if row < len(self._base_names):
+            name, handle = self._base_names[row], self._base_handles[row]
+        else:
+            name, handle = self._names[row - len(self._base_names)], self._handles[row - len(self._base_names)]
+        result = {"candidate_id": int(self.ids[row]), "name": name, "handle": handle,
+                  "followers": int(self.followers[row])}
+        result.update(scores)
+        return result
+
+    def similar(self, creator_id, k=10, cheaper=False, max_followers=None, exclude=(), exact=False):
+        """The k creators most similar to ``creator_id``, best first.
+
+        ``cheaper`` keeps creators with fewer followers (creator fees follow a
+        per-follower rate card); ``max_followers`` caps audience size and
+        ``exclude`` drops ids. ``exact=True`` scans every creator instead of
+        probing the hash tables.
+        """
+        row = self._query_row(creator_id)
+        rows = None if exact else self._candidates(self._query_proj(row))
+        if rows is not None:
+            rows = self._eligible(row, rows, cheaper, max_followers, exclude)
+        if rows is None or len(rows) < k:
+            rows = self._eligible(row, np.flatnonzero(self.alive[:self.size]), cheaper, max_followers, exclude)
+        similarity = self._similarity(row, rows)
+        best = _top(-similarity, rows, k)
+        return [self._result(r, similarity=round(float(similarity[i]), 4)) for i, r in best]
+
+    def complementary(self, creator_id, k=10, min_topic_similarity=0.3, cheaper=False, max_followers=None,
+                      exclude=(), exact=False):
+        """The k creators in the same niche whose audiences overlap least with ``creator_id``'s.
+
+        Candidates share at least ``min_topic_similarity`` (cosine over topics)
+        and are ranked by calculate_overlap_matrix's overlap score, lowest
+        first. The hash tables are probed with the creator's audience and geo
+        reflected about the roster mean, which lands on opposite audiences.
+        """
+        row = self._query_row(creator_id)
+
+        def eligible(rows):
+            rows = self._eligible(row, rows, cheaper, max_followers, exclude)
+            return rows[self._topic_similarity(row, rows) >= min_topic_similarity]
+
+        rows = None if exact else eligible(self._candidates(self._query_proj(row, reflect_audience=True)))
+        if rows is None or len(rows) < k:
+            rows = eligible(np.flatnonzero(self.alive[:self.size]))
+        overlap = self._overlap(row, rows)
+        topic = self._topic_similarity(row, rows)
+        # Lowest overlap first; ties go to the closer topical match
+        order = np.lexsort((-topic, np.round(overlap, 6)))[:k]
+        return [
+            self._result(rows[i], overlap=round(float(overlap[i]), 3), topic_similarity=round(float(topic[i]), 3))
+            for i in order
+        ]
+
+    # -- roster watcher (marketmuse_sim.watch_roster) -----------------------
+
+    def on_roster_change(self, op, record):
+        if op == "remove":
+            self.remove(record["id"])
+        else:
+            self.add(record)
+
+    def on_roster_reset(self):
+        for key, index in list(_SHARED.items()):
+            if index is self:
+                del _SHARED[key]
+
+    def on_weights_change(self, weights):
+        pass
+
+
+def _top(keys, rows, k):
+    """(position, row) for the k smallest keys, in order (ties by row)"""
+    if len(rows) == 0:
+        return []
+    k = min(k, len(rows))
+    cut = np.argpartition(keys, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+    order = cut[np.lexsort((rows[cut], keys[cut]))]
+    return [(int(i), int(rows[i])) for i in order]
+
+
+_SHARED = {}  # normalized roster_index() options -> SimilarityIndex
+
+
+def roster_index(**options):
+    """Shared SimilarityIndex over the current roster, built on first use.
+
+    One index is kept per set of SimilarityIndex options (defaults filled
+    in), so callers asking for different tables/bits never share one. It
+    follows add_creator / remove_creator incrementally; use_roster drops it
+    so the next call rebuilds from the new roster.
+    """
+    import marketmuse_sim
+
+    key = tuple(sorted(dict(_INDEX_DEFAULTS, **options).items()))
+    index = _SHARED.get(key)
+    if index is None:
+        index = _SHARED[key] = SimilarityIndex.from_store(marketmuse_sim.get_creator_store(), **options)
+        marketmuse_sim.watch_roster(index)
+    return index
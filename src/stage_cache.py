@@ -0,0 +1,145 @@
+# stage_cache.py
+# Content-addressed cache for agent stage outputs (in-process LRU + optional SQLite tier)
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from records import to_json
+
+
+def cache_key(stage, payload):
+    """Stable hash of a stage name plus its JSON-serializable inputs"""
+    canonical = json.dumps([stage, payload], sort_keys=True, separators=(",", ":"), default=to_json)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """LRU cache with size and TTL eviction, and an optional on-disk tier.
+
+    Entries carry tags (e.g. "roster", "creator:5") so a data change can drop
+    just the entries that depend on it via invalidate(). The disk tier is a
+    SQLite file that several worker processes can share; memory misses fall
+    through to it and hits are promoted back into memory.
+    """
+
+    def __init__(self, max_entries=1024, ttl_s=None, disk_path=None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()  # key -> (created, tags, value)
+        self._lock = threading.Lock()
+        self.disk_path = disk_path
+        self._conn = None
+        self._conn_pid = None
+        self._stats = {
+            "hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0,
+        }
+
+    @property
+    def _db(self):
+        """SQLite connection for this process (reopened after a fork)"""
+        if self.disk_path is None:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            import sqlite3  # only processes with a disk tier pay for the import
+            self._conn = sqlite3.connect(self.disk_path, timeout=30, check_same_thread=False)
+            self._conn_pid = os.getpid()
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stage_cache "
+                "(key TEXT PRIMARY KEY, tags TEXT, created REAL, value BLOB)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _expired(self, created):
+        return self.ttl_s is not None and time.time() - created > self.ttl_s
+
+    def get(self, key):
+        """Return (hit, value); values are copies, so callers may mutate them"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0]):
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return True, copy.deepcopy(entry[2])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT tags, created, value FROM stage_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    import pickle
+                    value = pickle.loads(row[2])
+                    self._remember(key, row[1], frozenset(row[0].split()), value)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    return True, copy.deepcopy(value)
+
+            self._stats["misses"] += 1
+            return False, None
+
+    def put(self, key, value, tags=()):
+        """Store a stage output under ``key``, tagged with what it depends on"""
+        tags = frozenset(tags)
+        created = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, created, tags, value)
+            if self._db is not None:
+                import pickle
+                self._db.execute(
+                    "INSERT OR REPLACE INTO stage_cache (key, tags, created, value) VALUES (?, ?, ?, ?)",
+                    (key, " " + " ".join(sorted(tags)) + " ", created, pickle.dumps(value)),
+                )
+                self._db.commit()
+
+    def _remember(self, key, created, tags, value):
+        self._entries[key] = (created, tags, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, tags):
+        """Drop every entry carrying any of ``tags``; returns how many were dropped"""
+        tags = set(tags)
+        with self._lock:
+            doomed = {key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & tags}
+            for key in doomed:
+                del self._entries[key]
+            if self._db is not None:
+                for tag in tags:
+                    pattern = (f"% {tag} %",)
+                    doomed.update(row[0] for row in self._db.execute(
+                        "SELECT key FROM stage_cache WHERE tags LIKE ?", pattern))
+                    self._db.execute("DELETE FROM stage_cache WHERE tags LIKE ?", pattern)
+                self._db.commit()
+            self._stats["invalidations"] += len(doomed)
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM stage_cache")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters plus current size and hit rate"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                hit_rate=round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            )
@@ -0,0 +1,39 @@
+# conftest.py
+# Shared pytest setup - puts src/ and benchmarks/ on sys.path and resets simulation state
+import functools
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import marketmuse_sim  # noqa: E402
+
+
+@pytest.fixture
+def sim():
+    """marketmuse_sim with its roster, WEIGHTS and stage cache restored after the test"""
+    roster = list(marketmuse_sim.INFLUENCERS)
+    weights = dict(marketmuse_sim.WEIGHTS)
+    cache = marketmuse_sim.STAGE_CACHE
+    yield marketmuse_sim
+    marketmuse_sim.STAGE_CACHE = cache
+    marketmuse_sim.set_weights(weights)
+    marketmuse_sim.use_roster(roster)
+
+
+@functools.lru_cache(maxsize=None)
+def _synthetic_records(n, seed):
+    from synthetic_roster import generate_records
+    return tuple(generate_records(n, seed=seed))
+
+
+@pytest.fixture
+def synthetic_roster(sim):
+    """Load a 2,000-creator synthetic roster; returns its records"""
+    records = list(_synthetic_records(2000, 7))
+    sim.use_roster(records)
+    return records
@@ -0,0 +1,59 @@
+# test_async_orchestrator.py
+# run_async: same output as run(), stage timeouts and the dependency graph
+import asyncio
+import json
+import time
+
+import pytest
+
+from async_orchestrator import Stage, StageTimeoutError, run_async, run_graph
+
+QUERIES = [
+    "Launch a sustainable skincare brand targeting Gen Z for 4 weeks",
+    "Food brand launch, budget ₹2 lakh",
+    "Skincare launch for Gen Z, budget ₹5,000, 4 weeks",
+]
+
+
+def _comparable(result):
+    result = {key: value for key, value in result.items() if key not in ("timestamp", "timings")}
+    return json.loads(json.dumps(result, default=str))
+
+
+@pytest.mark.parametrize("engine", ["python", "columnar"])
+def test_run_async_matches_run(sim, engine):
+    for query in QUERIES:
+        expected = _comparable(sim.run(query, engine=engine, verbose=False))
+        result = asyncio.run(run_async(query, engine=engine))
+        assert _comparable(result) == expected
+        assert "timings" in result
+
+
+def test_stage_timeout_names_the_stage(sim, monkeypatch):
+    monkeypatch.setattr(sim, "forecast_campaign", lambda *args: time.sleep(0.5))
+    with pytest.raises(StageTimeoutError, match="forecast"):
+        asyncio.run(run_async(QUERIES[0], timeouts={"forecast": 0.05}))
+
+
+def test_stages_wait_for_their_dependencies():
+    order = []
+
+    def step(name, delay=0.0):
+        def run(*inputs):
+            time.sleep(delay)
+            order.append(name)
+            return name + "".join(inputs)
+        return run
+
+    stages = [
+        Stage("a", step("a")),
+        Stage("slow", step("slow", 0.05), ["a"]),
+        Stage("fast", step("fast"), ["a"]),
+        Stage("join", step("join"), ["slow", "fast"]),
+    ]
+    results = asyncio.run(run_graph(stages))
+    assert order == ["a", "fast", "slow", "join"]
+    assert results["join"] == "joinslowafasta"
+
+    with pytest.raises(ValueError, match="unknown or later stages"):
+        asyncio.run(run_graph(list(reversed(stages))))
@@ -0,0 +1,51 @@
+# test_batch_runner.py
+# run_batch: results match run() per query, in order or as they finish
+import json
+
+import pytest
+
+from batch_runner import run_batch
+from stage_cache import StageCache
+
+QUERIES = [
+    "Launch a sustainable skincare brand targeting Gen Z for 4 weeks",
+    "Launch a beauty brand for millennials for 8 weeks",
+    "Food brand launch, budget ₹2 lakh",
+    "Launch a sustainable skincare brand targeting Gen Z for 4 weeks",
+    "Skincare for micro influencers budget 500000",
+]
+
+
+def _comparable(result):
+    result = {key: value for key, value in result.items() if key not in ("timestamp", "timings")}
+    return json.loads(json.dumps(result, default=str))
+
+
+@pytest.fixture
+def expected(sim):
+    return [_comparable(sim.run(query, verbose=False)) for query in QUERIES]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_ordered_batch_matches_run(expected, workers):
+    events = []
+    results = list(run_batch(QUERIES, workers=workers, progress=events.append))
+    assert [index for index, _ in results] == list(range(len(QUERIES)))
+    assert [_comparable(result) for _, result in results] == expected
+    assert events[-1]["done"] == events[-1]["total"]
+
+
+def test_unordered_columnar_batch_matches_run(expected):
+    results = list(run_batch(QUERIES, engine="columnar", workers=2, ordered=False))
+    assert sorted(index for index, _ in results) == list(range(len(QUERIES)))
+    for index, result in results:
+        assert _comparable(result) == expected[index]
+
+
+def test_batch_reuses_the_stage_cache(expected):
+    cache = StageCache()
+    list(run_batch(QUERIES, workers=0, cache=cache))
+    misses = cache.stats()["misses"]
+    results = list(run_batch(QUERIES, workers=0, cache=cache))
+    assert cache.stats()["misses"] == misses
+    assert [_comparable(result) for _, result in results] == expected
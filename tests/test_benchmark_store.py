@@ -0,0 +1,101 @@
+# test_benchmark_store.py
+# BenchmarkStore: pooled rates, hierarchical fallback and seeded priors
+import gzip
+import json
+
+import pytest
+
+from benchmark_store import SEED_POST_IMPRESSIONS, BenchmarkStore
+
+
+def posts(n, impressions=1000.0, clicks=20.0, conversions=1.0, spend=100.0, **dims):
+    return [dict(dims, impressions=impressions, clicks=clicks, conversions=conversions, spend=spend)
+            for _ in range(n)]
+
+
+def test_rates_are_pooled():
+    store = BenchmarkStore(min_samples=2)
+    store.ingest(posts(1, impressions=1000, clicks=10, vertical="skincare")
+                 + posts(1, impressions=3000, clicks=50, vertical="skincare"))
+    row = store.lookup(vertical="skincare")
+    assert row["avg_ctr"] == pytest.approx(60 / 4000)
+    assert row["avg_cvr"] == round(2 / 60, 6)
+    assert row["avg_cpm"] == pytest.approx(200 / 4000 * 1000)
+    assert row["samples"] == 2 and row["level"] == ["vertical"]
+
+
+def test_falls_back_to_coarser_levels():
+    store = BenchmarkStore(min_samples=5)
+    store.ingest(posts(3, clicks=50, vertical="skincare", season="summer")
+                 + posts(10, clicks=10, vertical="skincare", season="winter"))
+    summer = store.lookup(vertical="skincare", season="summer")
+    assert summer["level"] == ["vertical"] and summer["samples"] == 13
+    winter = store.lookup(vertical="skincare", season="winter")
+    assert winter["level"] == ["vertical", "season"] and winter["avg_ctr"] == pytest.approx(0.01)
+    assert store.lookup(vertical="beauty", season="winter")["level"] == ["season"]
+
+
+def test_followers_map_to_bands_and_chunks_add_up():
+    store = BenchmarkStore(min_samples=1)
+    added = store.ingest(posts(7, vertical="beauty", season="winter", post_type="reel",
+                               platform="instagram", followers=50_000), chunk_size=3)
+    assert added == 7
+    row = store.lookup(vertical="beauty", season="winter", post_type="reel", platform="instagram",
+                       follower_band="micro")
+    assert row["samples"] == 7 and len(row["level"]) == 5
+
+
+def test_unknown_dimension_and_empty_store():
+    store = BenchmarkStore()
+    with pytest.raises(ValueError):
+        store.lookup(colour="red")
+    with pytest.raises(LookupError):
+        store.lookup(vertical="skincare")
+
+
+def test_seeded_prior_is_pooled_then_dropped():
+    seed = {"vertical": "skincare", "season": "winter", "avg_cpm": 100.0, "avg_ctr": 0.02, "avg_cvr": 0.05}
+    store = BenchmarkStore.from_benchmarks([seed], min_samples=10)
+    row = store.lookup(vertical="skincare", season="winter")
+    assert row["avg_ctr"] == pytest.approx(0.02) and row["samples"] == 10
+
+    # A few real posts are pooled with the prior, each weighing one typical post
+    store.ingest(posts(2, impressions=SEED_POST_IMPRESSIONS, clicks=SEED_POST_IMPRESSIONS * 0.08,
+                       vertical="skincare", season="winter"))
+    row = store.lookup(vertical="skincare", season="winter")
+    assert row["samples"] == 12 and row["avg_ctr"] == pytest.approx((10 * 0.02 + 2 * 0.08) / 12)
+
+    # Once the cell has min_samples real posts the prior no longer counts
+    store.ingest(posts(8, impressions=SEED_POST_IMPRESSIONS, clicks=SEED_POST_IMPRESSIONS * 0.08,
+                       vertical="skincare", season="winter"))
+    row = store.lookup(vertical="skincare", season="winter")
+    assert row["samples"] == 10 and row["avg_ctr"] == pytest.approx(0.08)
+    assert store.stats()["seeded_cells"]["vertical/season"] == 1
+
+
+def test_version_changes_on_every_append():
+    store = BenchmarkStore()
+    versions = {store.version}
+    store.add_benchmarks([{"vertical": "skincare", "avg_cpm": 1.0, "avg_ctr": 0.01, "avg_cvr": 0.01}])
+    versions.add(store.version)
+    store.ingest(posts(1, vertical="skincare"))
+    versions.add(store.version)
+    store.ingest(posts(1, vertical="skincare"))
+    versions.add(store.version)
+    assert len(versions) == 4
+    assert len(store.benchmarks(("vertical",))) == 1
+
+
+def test_ingested_results_reach_the_forecast(sim, tmp_path, monkeypatch):
+    monkeypatch.setattr(sim, "BENCHMARKS", BenchmarkStore.from_benchmarks(sim.CAMPAIGN_HISTORY))
+    plan = sim.decompose("Skincare launch for Gen Z in winter")
+    evaluation = sim.eval_agent(plan["evaluate"])
+    before = sim.predict_agent(plan["predict"], evaluation)["forecast"]["ctr"]["p50"]
+
+    path = tmp_path / "results.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        for row in posts(5000, clicks=60.0, vertical="skincare", season="winter"):
+            handle.write(json.dumps(row) + "\n")
+    assert sim.ingest_campaign_results(path) == 5000
+    after = sim.predict_agent(plan["predict"], evaluation)["forecast"]["ctr"]["p50"]
+    assert after > before
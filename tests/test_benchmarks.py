@@ -0,0 +1,58 @@
+# test_benchmarks.py
+# Synthetic rosters, roster_version() and the benchmark comparison gate
+import copy
+import json
+
+import numpy as np
+import pytest
+
+import compare
+from creator_store import CreatorStore
+from synthetic_roster import generate_records, generate_store, roster_config
+
+
+def test_synthetic_store_matches_its_records():
+    records = generate_records(500, seed=3, chunk_size=128)
+    store = generate_store(500, seed=3, chunk_size=128)
+    assert generate_records(500, seed=3, chunk_size=128) == records
+    expected = CreatorStore.from_records(records)
+    assert [store.record(row) for row in range(len(store))] == [
+        expected.record(row) for row in range(len(expected))]
+    assert len({r["id"] for r in records}) == 500
+    assert not np.array_equal(generate_store(500, seed=4, chunk_size=128).followers, store.followers)
+    with pytest.raises(ValueError, match="Unknown roster settings"):
+        roster_config(colour="red")
+
+
+def test_roster_version_tracks_edits_and_installed_stores(sim):
+    version = sim.roster_version()
+    record = copy.deepcopy(dict(sim.INFLUENCERS[0]))
+    record["er"] += 0.01
+    sim.add_creator(record)
+    edited = sim.roster_version()
+    assert edited != version
+
+    sim.use_creator_store(CreatorStore.from_records(sim.INFLUENCERS[:5]))
+    assert sim.roster_version() != edited
+
+
+def _report(**medians):
+    return {"meta": {"commit": "abc"}, "results": [
+        {"scale": 1000, "benchmark": name, "engine": "python", "wall_s": {"median": median}}
+        for name, median in medians.items()]}
+
+
+def test_compare_flags_slowdowns_over_the_threshold(tmp_path, capsys):
+    baseline = _report(eval_agent=1.0, overlap=2.0, dropped=1.0)
+    candidate = _report(eval_agent=1.05, overlap=2.5, added=1.0)
+    rows = compare.compare(baseline, candidate, threshold=0.10)
+    assert [(key[1], regressed) for key, _, _, _, regressed in rows] == [
+        ("eval_agent", False), ("overlap", True)]
+
+    paths = []
+    for name, report in (("before", baseline), ("after", candidate)):
+        paths.append(tmp_path / f"{name}.json")
+        paths[-1].write_text(json.dumps(report))
+    assert compare.main([str(p) for p in paths]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+    assert compare.main([str(p) for p in paths] + ["--threshold", "0.5"]) == 0
@@ -0,0 +1,58 @@
+# test_campaign_simulator.py
+# Day-by-day simulation: schedules, budget burn, forecast agreement and contingencies
+import json
+
+import numpy as np
+import pytest
+
+from campaign_simulator import front_loaded_days, simulate_plan
+
+QUERY = "Launch a sustainable beauty brand for Gen Z in May, budget ₹1 lakh, for 6 weeks"
+
+
+@pytest.fixture
+def plan(sim):
+    plan = sim.decompose(QUERY)
+    return plan, sim.eval_agent(plan["evaluate"])
+
+
+def test_front_loaded_schedule():
+    offsets = np.array([0.0, 0.3, 0.7])
+    schedule = front_loaded_days(10, 28, offsets)
+    assert schedule.shape == (3, 28) and (schedule.sum(axis=1) == 10).all()
+    assert (schedule[:, :7].sum(axis=1) == 6).all()  # FRONT_LOAD of the content in week 1
+    assert front_loaded_days(0, 28, offsets).sum() == 0
+    assert front_loaded_days(4, 5, offsets).sum(axis=1).tolist() == [4, 4, 4]
+
+
+def test_simulation_follows_the_plan_and_forecast(sim, plan):
+    plan, evaluation = plan
+    forecast, _ = sim.forecast_campaign(plan["predict"], evaluation)
+    result = simulate_plan(plan, evaluation)
+    totals = result["totals"]
+    assert totals["spend_inr"] <= 100_000
+    assert abs(totals["ctr"] - forecast["forecast"]["ctr"]["p50"]) < 1e-3
+    assert len(result["daily"]["impressions"]) == 6 * 7 and len(result["weekly"]["clicks"]) == 6
+    assert np.all(np.diff(result["daily"]["cumulative_spend_inr"]) >= 0)
+    assert totals["unique_reach"] <= totals["impressions"]
+    assert [c["candidate_id"] for c in result["creators"]] == [c["candidate_id"] for c in evaluation["top"]]
+
+
+def test_budget_and_scenarios(plan):
+    plan, evaluation = plan
+    capped = simulate_plan(plan, evaluation, budget_inr=20_000)["totals"]
+    assert capped["spend_inr"] <= 20_000
+    base = simulate_plan(plan, evaluation)["totals"]
+    halved = simulate_plan(plan, evaluation, scenario={"ctr_scale": 0.5})["totals"]
+    assert halved["impressions"] == base["impressions"] and halved["spend_inr"] == base["spend_inr"]
+    assert halved["clicks"] == pytest.approx(base["clicks"] / 2, abs=1)
+
+
+def test_contingencies_replay(plan):
+    plan, evaluation = plan
+    result = simulate_plan(plan, evaluation, scenario={"ctr_scale": 0.5}, contingencies=True, as_lists=True)
+    fired = [rule["scenario"] for rule in result["triggered"]]
+    assert "Low performance week 1" in fired
+    assert all(rule["action_day"] >= rule["check_day"] for rule in result["triggered"])
+    assert result["with_contingencies"]["totals"]["spend_inr"] <= 100_000
+    json.dumps(result)
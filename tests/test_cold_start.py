@@ -0,0 +1,24 @@
+# test_cold_start.py
+# Importing the entry modules must not load the heavy or optional modules they use lazily
+import os
+import subprocess
+import sys
+
+import pytest
+
+from run_benchmarks import LAZY_MODULES, SRC_DIR, import_profile
+
+
+@pytest.mark.parametrize("module", ["marketmuse_sim", "marketmuse_worker"])
+def test_import_stays_lazy(module):
+    _, imported = import_profile(module)
+    assert module in imported
+    assert sorted(name for name in LAZY_MODULES if name in imported) == []
+
+
+def test_python_engine_run_never_loads_numpy():
+    script = ("import sys, marketmuse_sim; marketmuse_sim.run('Skincare launch for Gen Z', verbose=False); "
+              "print(sorted(name for name in ('numpy', 'query_parser') if name in sys.modules))")
+    completed = subprocess.run([sys.executable, "-c", script], cwd=SRC_DIR, env=dict(os.environ, PYTHONPATH=SRC_DIR),
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.strip().splitlines()[-1] == "['query_parser']"
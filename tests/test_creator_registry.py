@@ -0,0 +1,70 @@
+# test_creator_registry.py
+# CreatorRegistry indexes and the roster edits that keep INFLUENCERS in step with it
+import copy
+import random
+
+import pytest
+
+from creator_registry import CreatorRegistry, follower_band
+
+
+def test_follower_bands():
+    assert [follower_band(n) for n in (0, 9_999, 10_000, 99_999, 100_000, 750_000, 5_000_000)] == [
+        "nano", "nano", "micro", "micro", "mid", "macro", "mega"]
+
+
+def test_select_uses_indexes_in_roster_order(sim):
+    registry = CreatorRegistry(sim.INFLUENCERS)
+    expected = [inf for inf in sim.INFLUENCERS if follower_band(inf["followers"]) == "micro"
+                and "skincare" in inf["topics"]]
+    assert registry.select(bands=["micro"], topics=["skincare"]) == expected
+    assert registry.select() == list(sim.INFLUENCERS)
+    assert registry.select(safety=["no-such-tier"]) == []
+
+
+def test_replace_keeps_position_and_reindexes(sim):
+    registry = CreatorRegistry(sim.INFLUENCERS)
+    record = dict(sim.INFLUENCERS[2], topics=["gardening"], followers=2_000_000)
+    position = registry.position(record["id"])
+    registry.add(record)
+    assert registry.position(record["id"]) == position
+    assert registry.select(topics=["gardening"], bands=["mega"]) == [record]
+    assert record["id"] not in {inf["id"] for inf in registry.select(topics=["skincare"])}
+    registry.remove(record["id"])
+    assert record["id"] not in registry and registry.select(topics=["gardening"]) == []
+    with pytest.raises(KeyError):
+        registry.get(record["id"])
+
+
+def test_roster_edits_keep_influencers_and_registry_in_step(synthetic_roster, sim):
+    rnd = random.Random(4)
+    expected = [inf["id"] for inf in sim.INFLUENCERS]
+    for step in range(300):
+        op = rnd.random()
+        if op < 0.4:
+            creator_id = rnd.choice(expected)
+            sim.remove_creator(creator_id)
+            expected.remove(creator_id)
+        elif op < 0.7:
+            record = copy.deepcopy(dict(sim.REGISTRY.get(rnd.choice(expected))))
+            record["followers"] += 1
+            sim.add_creator(record)
+        else:
+            sim.add_creator(dict(copy.deepcopy(dict(sim.INFLUENCERS[0])), id=10**6 + step))
+            expected.append(10**6 + step)
+        assert [inf["id"] for inf in sim.INFLUENCERS] == expected
+    assert all(sim.REGISTRY.get(inf["id"]) is inf for inf in sim.INFLUENCERS)
+    assert len(sim.REGISTRY) == len(sim.INFLUENCERS)
+
+
+def test_direct_list_edits_are_recovered_or_reported(sim):
+    sim.remove_creator(sim.INFLUENCERS[1]["id"])
+    # A slot dropped behind REGISTRY's back: positions are derived again
+    sim.INFLUENCERS.pop(0)
+    last = sim.INFLUENCERS[-1]["id"]
+    sim.remove_creator(last)
+    assert last not in {inf["id"] for inf in sim.INFLUENCERS}
+    # A reordered list no longer matches REGISTRY's roster order
+    sim.INFLUENCERS.reverse()
+    with pytest.raises(RuntimeError):
+        sim.remove_creator(sim.INFLUENCERS[0]["id"])
@@ -0,0 +1,60 @@
+# test_forecast_sim.py
+# Monte Carlo forecast: percentiles, seeding, time budget and input validation
+import copy
+
+import numpy as np
+import pytest
+
+from forecast_sim import simulate_forecast
+
+TASK = {"posts_per_creator": 2, "stories_per_creator": 2, "baseline_cvr": 0.025}
+
+
+@pytest.fixture
+def inputs(sim):
+    creators = [copy.deepcopy(dict(inf)) for inf in sim.INFLUENCERS[:5]]
+    return creators, sim.BENCHMARKS.lookup(vertical="skincare"), sim.CAMPAIGN_HISTORY
+
+
+def run(inputs, creators=None, **options):
+    default, benchmark, history = inputs
+    return simulate_forecast(creators or default, TASK, benchmark, history, 0.18, 0.016, **options)
+
+
+def test_percentiles_are_ordered_and_seeded(inputs):
+    forecast, info = run(inputs, trials=2000, seed=3)
+    for metric in forecast.values():
+        assert metric["p10"] <= metric["p50"] <= metric["p90"]
+    assert info["trials_run"] == 2000
+    assert run(inputs, trials=2000, seed=3)[0] == forecast
+    assert forecast["cvr"]["p50"] == pytest.approx(TASK["baseline_cvr"], rel=0.2)
+
+
+def test_time_budget_runs_at_least_one_chunk(inputs):
+    _, info = run(inputs, trials=10**7, seed=1, time_budget_s=0)
+    assert 0 < info["trials_run"] < 10**7
+
+
+def test_zero_reel_history_uses_the_benchmark_ctr(inputs):
+    creators = copy.deepcopy(inputs[0])
+    for c in creators:
+        c["history"]["reel"] = 0.0
+    forecast, _ = run(inputs, creators, trials=2000, seed=3)
+    assert all(np.isfinite(v) for metric in forecast.values() for v in metric.values())
+    assert forecast["ctr"]["p50"] == pytest.approx(0.016, rel=0.2)
+
+
+@pytest.mark.parametrize("trials", [0, -5])
+def test_trials_must_be_positive(inputs, trials):
+    with pytest.raises(ValueError):
+        run(inputs, trials=trials)
+
+
+def test_forecast_campaign_simulation_mode(sim):
+    plan = sim.decompose("sustainable skincare for Gen Z, budget 5 lakh")
+    evaluation = sim.eval_agent(plan["evaluate"])
+    task = dict(plan["predict"], simulation={"trials": 5000, "seed": 2})
+    prediction, _ = sim.forecast_campaign(task, evaluation)
+    assert prediction["simulation"]["trials_run"] == 5000
+    assert "Monte Carlo" in prediction["assumptions"]["uncertainty_bounds"]
+    assert sim.forecast_campaign(task, evaluation)[0]["forecast"] == prediction["forecast"]
@@ -0,0 +1,87 @@
+# test_fraud_analysis.py
+# FraudAnalyzer: follower-spike z-scores, bot followers, MinHash comment repeats, write-back
+import numpy as np
+import pytest
+
+from fraud_analysis import FraudAnalyzer, band_keys, comment_shingles, minhash_signatures
+
+DAYS = 40
+SPIKE_DAY = 35
+
+
+def series(spike_engagement=100.0):
+    """Two creators gaining ~100 followers a day with one +5,000 day; only the first gets an engagement lift"""
+    rng = np.random.default_rng(0)
+    gains = 100 + rng.normal(0, 5, size=(2, DAYS))
+    gains[:, SPIKE_DAY] += 5000
+    followers = 50_000 + np.cumsum(gains, axis=1)
+    engagement = np.full((2, DAYS), 100.0)
+    engagement[0, SPIKE_DAY] = spike_engagement
+    return followers, engagement
+
+
+def test_spike_with_flat_engagement_counts_bot_followers():
+    analyzer = FraudAnalyzer()
+    followers, engagement = series(spike_engagement=300.0)
+    analyzer.update(0, [1, 2], followers, engagement)
+    ids, values = analyzer.indicators()
+    assert ids.tolist() == [1, 2]
+    spike_frequency, bot_ratio, repetitive = values.T
+    assert spike_frequency.tolist() == [pytest.approx(1 / (DAYS - 8))] * 2
+    assert bot_ratio[0] == 0.0  # the lift explains the spike
+    assert bot_ratio[1] == pytest.approx(5000 / followers[1, -1], rel=0.05)
+    assert np.isnan(repetitive).all()
+
+
+def test_daily_updates_match_one_block_and_skip_seen_days():
+    followers, engagement = series()
+    block = FraudAnalyzer()
+    block.update(0, [1, 2], followers, engagement)
+    daily = FraudAnalyzer()
+    for day in range(DAYS):
+        daily.update(day, [1, 2], followers[:, day:day + 1], engagement[:, day:day + 1])
+    # Re-sending days that were already seen changes nothing
+    daily.update(0, [1, 2], followers, engagement)
+    np.testing.assert_allclose(daily.indicators()[1], block.indicators()[1])
+
+
+def test_minhash_signatures():
+    ptr, shingles = comment_shingles(["great product love it", "Great product love it", "totally different words here", ""])
+    signatures = minhash_signatures(ptr, shingles)
+    assert (signatures[0] == signatures[1]).all()
+    assert (signatures[0] != signatures[2]).mean() > 0.9
+    assert (signatures[3] == np.iinfo(np.uint64).max).all()
+    keys = band_keys(signatures, [7, 7, 7, 8])
+    assert (keys[0] == keys[1]).all()
+    # The same comment on another creator lands in other buckets
+    assert not (band_keys(signatures[:1], [8]) == keys[:1]).any()
+
+
+def test_repetitive_comments():
+    analyzer = FraudAnalyzer()
+    texts = ["so good omg buy now"] * 3 + ["where did you get that jacket", "this routine changed my skin"]
+    owners = [1, 1, 1, 1, 2]
+    analyzer.update(0, [1, 2], np.full((2, 1), 1000.0), np.full((2, 1), 10.0),
+                    comments=(owners, *comment_shingles(texts)))
+    _, values = analyzer.indicators([1, 2])
+    assert values[:, 2].tolist() == [0.5, 0.0]
+
+    # A repeat of a remembered comment still counts the next day...
+    analyzer.update(1, [1], [[1000.0]], [[10.0]], comments=([1], *comment_shingles(["so good omg buy now"])))
+    assert analyzer.indicators([1])[1][0, 2] == pytest.approx(3 / 5)
+    # ...but not once it is older than the memory window
+    analyzer.update(20, [1], [[1000.0]], [[10.0]], comments=([1], *comment_shingles(["so good omg buy now"])))
+    assert analyzer.indicators([1])[1][0, 2] == pytest.approx(3 / 6)
+
+
+def test_write_back_updates_scoring(sim):
+    creator_id = sim.INFLUENCERS[0]["id"]
+    analyzer = FraudAnalyzer()
+    followers, engagement = series()
+    analyzer.update(0, [creator_id, 10**6], followers, engagement)
+    assert analyzer.write_back() == 1  # unknown ids are ignored
+    indicators = sim.REGISTRY.get(creator_id)["fraud_indicators"]
+    assert indicators["bot_ratio"] > 0.05
+    row = sim.get_creator_store().rows_for([creator_id])[0]
+    assert sim.get_creator_store().fraud[row].tolist() == list(indicators.values())
+    assert analyzer.write_back() == 0
@@ -0,0 +1,57 @@
+# test_incremental_eval.py
+# IncrementalEvaluator must agree with eval_agent through roster edits and weight changes
+import copy
+import random
+
+import pytest
+
+from incremental_eval import IncrementalEvaluator, evaluator_for
+
+TASKS = [
+    {"vertical": "skincare", "audience": "genz", "tier": "micro", "sustainability_focus": True, "top_k": 6},
+    {"vertical": "beauty", "audience": "general", "tier": "mixed", "sustainability_focus": False, "top_k": 25},
+]
+
+
+def test_follows_roster_edits_and_weights(synthetic_roster, sim):
+    evaluators = [IncrementalEvaluator(task) for task in TASKS]
+    rnd = random.Random(1)
+    for step in range(30):
+        op = rnd.random()
+        if op < 0.5:
+            record = copy.deepcopy(dict(rnd.choice(sim.INFLUENCERS)))
+            record["followers"] = rnd.randint(5000, 300_000)
+            record["fraud_indicators"] = dict(record["fraud_indicators"], bot_ratio=rnd.uniform(0, 0.3))
+            sim.add_creator(record)
+        elif op < 0.6:
+            sim.add_creator(dict(copy.deepcopy(dict(rnd.choice(sim.INFLUENCERS))), id=10**6 + step))
+        elif op < 0.75:
+            sim.remove_creator(sim.eval_agent(TASKS[0])["top"][0]["candidate_id"])
+        else:
+            sim.set_weights({key: round(rnd.uniform(0.01, 0.5), 3) for key in sim.WEIGHTS})
+        for task, evaluator in zip(TASKS, evaluators):
+            assert evaluator.evaluate() == sim.eval_agent(task)
+
+
+def test_weight_changes_do_not_rescore(synthetic_roster, sim):
+    evaluator = IncrementalEvaluator(TASKS[0])
+    rescored = evaluator.rescored
+    sim.set_weights(dict(sim.WEIGHTS, relevance=0.5))
+    assert evaluator.rescored == rescored
+    assert evaluator.evaluate() == sim.eval_agent(TASKS[0])
+
+
+def test_pinned_weights_and_reset(synthetic_roster, sim):
+    weights = dict(sim.WEIGHTS)
+    evaluator = IncrementalEvaluator(TASKS[0], weights=weights)
+    sim.set_weights(dict(weights, safety=0.9))
+    assert evaluator.weights == weights
+    sim.use_roster(synthetic_roster[:500])
+    assert evaluator.evaluate()["total_evaluated"] == sim.eval_agent(TASKS[0])["total_evaluated"]
+    assert [r["candidate_id"] for r in evaluator.top(30)][:6] == [r["candidate_id"] for r in evaluator.top()]
+
+
+def test_shared_evaluator_and_validation(sim):
+    assert evaluator_for(TASKS[0]) is evaluator_for(dict(TASKS[0]))
+    with pytest.raises(ValueError):
+        IncrementalEvaluator(dict(TASKS[0], top_k=0), watch=False)
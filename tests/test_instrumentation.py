@@ -0,0 +1,77 @@
+# test_instrumentation.py
+# Spans, recordings, run() timings, Prometheus totals and span logging
+import json
+
+import pytest
+
+import instrumentation
+from instrumentation import instrumented, prometheus_text, recording, reset_totals, span
+
+
+@pytest.fixture(autouse=True)
+def clean_totals():
+    settings = dict(instrumentation.SETTINGS)
+    reset_totals()
+    yield
+    instrumentation.configure(**settings)
+    reset_totals()
+
+
+def test_spans_nest_and_count_items():
+    @instrumented(count=len)
+    def pick(values):
+        with span("inner", items=3):
+            pass
+        return values[:2]
+
+    assert pick([1, 2, 3]) == [1, 2]  # no recording open: plain call
+    with recording() as recorder:
+        with span("outer") as current:
+            pick([1, 2, 3])
+            current.items = 7
+    stages = recorder.report()["stages"]
+    assert [(s["stage"], s["parent"], s["items"]) for s in stages] == [
+        ("inner", "pick", 3), ("pick", "outer", 2), ("outer", None, 7)]
+    assert all(s["wall_ms"] >= 0 and s["cpu_ms"] >= 0 for s in stages)
+    assert recorder.report()["total_ms"] >= stages[-1]["wall_ms"]
+
+
+def test_run_attaches_stage_timings(sim):
+    result = sim.run("Skincare launch for Gen Z, budget ₹2 lakh, 4 weeks", verbose=False)
+    stages = {s["stage"]: s for s in result["timings"]["stages"]}
+    assert {"decompose", "evaluate", "predict", "optimize", "portfolio_solve"} <= set(stages)
+    assert stages["rank_creators"]["parent"] == "evaluate"
+    assert stages["evaluate"]["items"] == result["evaluation"]["total_evaluated"]
+    json.dumps(result["timings"])
+
+    instrumentation.configure(enabled=False)
+    assert "timings" not in sim.run("Skincare launch for Gen Z", verbose=False)
+
+
+def test_prometheus_totals_accumulate():
+    for _ in range(3):
+        with recording():
+            with span("score", items=10):
+                pass
+    text = prometheus_text()
+    assert "# TYPE marketmuse_stage_calls_total counter" in text
+    assert 'marketmuse_stage_calls_total{stage="score"} 3' in text
+    assert 'marketmuse_stage_items_total{stage="score"} 30' in text
+    reset_totals()
+    assert 'stage="score"' not in prometheus_text()
+
+
+def test_memory_tracing_profile_and_logging(caplog, tmp_path):
+    instrumentation.configure(trace_memory=True, log=True)
+    path = str(tmp_path / "run.prof")
+    with caplog.at_level("INFO", logger=instrumentation.LOGGER_NAME):
+        with recording(profile=path) as recorder:
+            with span("build"):
+                data = [object() for _ in range(1000)]
+    report = recorder.report()
+    assert report["stages"][0]["alloc_bytes"] > 0 and len(data) == 1000
+    assert report["profile"]["path"] == path and report["profile"]["top"]
+    logged = [json.loads(record.getMessage()) for record in caplog.records]
+    assert logged == [dict(report["stages"][0], event="stage_timing")]
+    with pytest.raises(ValueError, match="Unknown instrumentation settings"):
+        instrumentation.configure(colour=True)
@@ -0,0 +1,88 @@
+# test_portfolio_optimizer.py
+# solve_portfolio: budget/size/reach constraints, exact vs lazy greedy, degenerate inputs
+import copy
+
+import pytest
+
+from portfolio_optimizer import package_cost, solve_portfolio
+
+
+@pytest.fixture
+def creators(sim):
+    return [copy.deepcopy(dict(inf)) for inf in sim.INFLUENCERS]
+
+
+@pytest.fixture
+def overlap(sim, creators):
+    return sim.calculate_overlap_matrix([c["id"] for c in creators])
+
+
+def test_respects_budget_and_size(creators, overlap):
+    result = solve_portfolio(creators, overlap, budget_inr=100_000, max_creators=3)
+    assert result["method"] == "lazy_greedy"
+    assert 0 < result["total_cost_inr"] <= 100_000
+    assert len(result["portfolio"]) <= 3
+    assert result["total_cost_inr"] == sum(p["cost_inr"] for p in result["portfolio"])
+    assert result["forecast"]["unique_reach"] <= result["forecast"]["gross_reach"]
+
+
+def test_reach_target_is_met(creators, overlap):
+    result = solve_portfolio(creators, overlap, budget_inr=500_000, target_unique_reach=0.95)
+    assert result["forecast"]["unique_reach_ratio"] >= 0.95
+
+
+def test_greedy_is_close_to_exact(creators, overlap):
+    shortlist = creators[:6]
+    matrix = {a: {b: overlap[a][b] for b in overlap} for a in overlap}
+    exact = solve_portfolio(shortlist, matrix, budget_inr=120_000)
+    greedy = solve_portfolio(shortlist, matrix, budget_inr=120_000, exact_max_candidates=0)
+    assert exact["method"] == "exact" and greedy["method"] == "lazy_greedy"
+    assert greedy["forecast"]["unique_reach"] >= 0.9 * exact["forecast"]["unique_reach"]
+    assert exact["forecast"]["unique_reach"] >= greedy["forecast"]["unique_reach"]
+
+
+def test_conversions_objective_prefers_reel_history(creators, overlap):
+    result = solve_portfolio(creators, overlap, budget_inr=60_000, objective="conversions")
+    assert result["objective"] == "conversions" and result["forecast"]["conversions"] > 0
+
+
+def test_zero_reel_history_and_rate_cards(creators, overlap):
+    for c in creators:
+        c["history"]["reel"] = 0.0
+    result = solve_portfolio(creators, overlap, budget_inr=100_000, objective="conversions")
+    assert result["portfolio"]
+    card = dict(creators[0], rate_inr={"reel": 2.0, "story": 0.0})
+    assert package_cost(card, 1, 3) == card["followers"] * 2.0
+
+
+def test_degenerate_inputs(overlap):
+    empty = solve_portfolio([], {}, budget_inr=100_000)
+    assert empty["portfolio"] == [] and empty["total_cost_inr"] == 0
+    with pytest.raises(ValueError):
+        solve_portfolio([], {}, budget_inr=1, objective="likes")
+    assert empty["cheapest_package_inr"] is None
+
+
+def test_brief_budget_reaches_forecast_and_portfolio(sim, monkeypatch):
+    solves = []
+    solve = sim.solve_portfolio
+    monkeypatch.setattr(sim, "solve_portfolio", lambda *a, **kw: solves.append(kw) or solve(*a, **kw))
+    query = "Launch a sustainable beauty brand for Gen Z in May, budget ₹1 lakh, for 6 weeks"
+    result = sim.run(query, verbose=False)
+    plan = sim.decompose(query)
+    assert plan["predict"]["budget_inr"] == plan["optimize"]["budget_inr"] == 100_000
+    portfolio = result["optimization"]["portfolio"]
+    assert portfolio["budget_inr"] == 100_000 and portfolio["total_cost_inr"] <= 100_000
+    assert result["prediction"]["mix_comparison"]["scenario_b"]["solution"] == portfolio
+    assert "solve_time_ms" not in portfolio
+    assert len(solves) == 1
+
+
+def test_budget_below_every_package(sim):
+    result = sim.run("Skincare launch for Gen Z, budget ₹5,000, 4 weeks", verbose=False)
+    portfolio = result["optimization"]["portfolio"]
+    assert portfolio["portfolio"] == [] and portfolio["cheapest_package_inr"] > 5_000
+    action = [r for r in result["optimization"]["prioritized"] if r["lever"] == "Budget"][0]["action"]
+    assert action == f"Budget below the cheapest package (₹{portfolio['cheapest_package_inr']:,}); raise budget or drop to stories"
+    stages = [stage["stage"] for stage in result["timings"]["stages"]]
+    assert "portfolio_solve" in stages
@@ -0,0 +1,85 @@
+# test_query_parser.py
+# Brief parsing: keyword automaton, budgets, durations and month/season words
+import pytest
+
+from query_parser import KeywordMatcher, QueryParser, parse_brief
+
+
+@pytest.mark.parametrize("query, budget", [
+    ("budget of ₹5 lakh", 500_000),
+    ("Rs. 2.5 lakhs for the campaign", 250_000),
+    ("we have $10k", 830_000),
+    ("300k budget", 300_000),
+    ("spend 1 crore", 10_000_000),
+    ("500000 inr", 500_000),
+    ("budget of 3L for skincare", 300_000),
+    ("₹1.5L for 4 weeks", 150_000),
+    ("We have 50k to spend on a beauty campaign", 50_000),
+])
+def test_budgets(query, budget):
+    assert parse_brief(query)["budget_inr"] == budget
+
+
+@pytest.mark.parametrize("query, weeks", [
+    ("run it for 6 weeks", 6),
+    ("a two-month push", 9),
+    ("14 days", 2),
+    ("a 2-week teaser inside a 6 week campaign", 6),
+    ("2 posts a day for 4 weeks", 4),
+])
+def test_durations(query, weeks):
+    assert parse_brief(query)["duration_weeks"] == weeks
+
+
+@pytest.mark.parametrize("query, season", [
+    ("Launch in May", "spring"),
+    ("launch in may", "spring"),
+    ("drop on may 15", "spring"),
+    ("mid-may drop", "spring"),
+    ("festive season push", "winter"),
+    ("summer launch, then again in may", "summer"),
+])
+def test_seasons(query, season):
+    assert parse_brief(query)["season"] == season
+
+
+def test_modal_may_and_lowercase_us_are_not_keywords():
+    brief = parse_brief("you may help us reach people")
+    assert "season" not in brief and "regions" not in brief
+    assert parse_brief("creators in the US")["regions"] == ["US"]
+
+
+def test_brief_fields():
+    brief = parse_brief("Sustainable skincare for Gen Z micro creators on Instagram and TikTok in the UK, "
+                        "3 reels per creator, 70% unique reach")
+    assert brief["vertical"] == "skincare" and brief["audience"] == "genz" and brief["tier"] == "micro"
+    assert brief["sustainable"] is True
+    assert brief["platforms"] == ["instagram", "tiktok"] and brief["regions"] == ["UK"]
+    assert brief["posts_per_creator"] == 3 and brief["target_unique_reach"] == 0.7
+    assert parse_brief("creators with 10k-100k followers")["tier"] == "micro"
+    # A budget figure in the micro follower range is not a follower range
+    assert "tier" not in parse_brief("budget 50k")
+
+
+def test_matcher_is_whole_word_leftmost_longest():
+    matcher = KeywordMatcher([("skin care", "a"), ("care", "b"), ("eco", "c")])
+    assert [payload for _, _, payload in matcher.find("Skin care and ecology")] == ["a"]
+    parser = QueryParser(topics=["clean-beauty"])
+    assert parser.parse("clean beauty picks")["topics"] == ["clean-beauty"]
+
+
+@pytest.mark.parametrize("query, tier", [
+    ("creators with 50k", "micro"),
+    ("50k+ subs on YouTube", "micro"),
+    ("influencers around 20k followers", "micro"),
+    ("We have 50k to spend on a beauty campaign", None),
+    ("Target 50k people in 4 weeks", None),
+    ("a 2L bottle giveaway", None),
+])
+def test_follower_figures_need_follower_context(query, tier):
+    assert parse_brief(query).get("tier") == tier
+
+
+def test_bare_l_is_only_lakh_next_to_money():
+    assert "budget_inr" not in parse_brief("a 2L bottle giveaway")
+    assert parse_brief("Rs 2L for a 2L bottle giveaway")["budget_inr"] == 200_000
@@ -0,0 +1,71 @@
+# test_records.py
+# Compact records: dict-style access, JSON round trips, pickling and run() output
+import copy
+import json
+import pickle
+
+import pytest
+
+from records import Creator, Estimate, EvalResult, Forecast, compact_roster, plain, to_json
+
+
+@pytest.fixture
+def raw(sim):
+    return plain(sim.INFLUENCERS[0])
+
+
+def test_creator_round_trips_through_json(raw):
+    creator = Creator.from_dict(raw)
+    assert Creator.from_dict(creator) is creator
+    assert json.loads(json.dumps(creator, default=to_json)) == raw
+    assert dict(creator)["aud"]["18-24"] == raw["aud"]["18-24"]
+    assert list(creator["topics"]) == raw["topics"] and raw["topics"][0] in creator["topics"]
+    assert Creator.from_dict(json.loads(json.dumps(plain(creator)))) == creator
+
+
+def test_extra_fields_are_kept(raw):
+    creator = Creator.from_dict(dict(raw, rate_inr={"reel": 1.0}))
+    assert creator["rate_inr"] == {"reel": 1.0} and creator.get("missing") is None
+    creator["tier"] = "gold"
+    assert list(creator)[-2:] == ["rate_inr", "tier"] and len(creator) == len(Creator.FIELDS) + 2
+    assert plain(creator) == dict(raw, rate_inr={"reel": 1.0}, tier="gold")
+
+
+def test_pickle_and_copies_are_independent(raw):
+    creator = Creator.from_dict(dict(raw, rate_inr={"reel": 1.0}))
+    restored = pickle.loads(pickle.dumps(creator))
+    assert restored == creator and restored.extra == creator.extra
+    deep = copy.deepcopy(creator)
+    deep["aud"]["18-24"] = 0.0
+    deep["topics"] = deep["topics"][:1]
+    assert creator["aud"]["18-24"] == raw["aud"]["18-24"] and list(creator["topics"]) == raw["topics"]
+
+
+def test_optional_fields_are_absent():
+    estimate = Estimate(p50=0.02)
+    assert dict(estimate) == {"p50": 0.02} and "p10" not in estimate
+    with pytest.raises(KeyError):
+        estimate["p10"]
+    with pytest.raises(TypeError, match="Unknown Estimate fields"):
+        Estimate(p50=1, p99=2)
+    forecast = Forecast.from_dict({"reach": {"p10": 1, "p50": 2, "p90": 3}, "ctr": {"p50": 0.01}})
+    assert plain(forecast) == {"reach": {"p10": 1, "p50": 2, "p90": 3}, "ctr": {"p50": 0.01}}
+    assert repr(Estimate(p50=2)) == "Estimate(p50=2)"
+
+
+def test_stage_outputs_serialize_like_run_output(sim):
+    plan = sim.decompose("Skincare launch for Gen Z, budget ₹2 lakh, 4 weeks")
+    evaluation = sim.eval_agent(plan["evaluate"])
+    assert all(isinstance(entry, EvalResult) for entry in evaluation["top"])
+    prediction = sim.predict_agent(plan["predict"], evaluation)
+    assert isinstance(prediction["forecast"], Forecast)
+    assert json.dumps(evaluation, default=to_json) == json.dumps(plain(evaluation))
+    result = sim.run("Skincare launch for Gen Z, budget ₹2 lakh, 4 weeks", verbose=False)
+    assert result["evaluation"]["top"] == plain(evaluation["top"])
+    assert result["prediction"]["forecast"] == plain(prediction["forecast"])
+    json.dumps(result)  # run() output is plain JSON already
+
+
+def test_compact_roster_matches_the_dicts(sim):
+    dicts = [plain(inf) for inf in sim.INFLUENCERS]
+    assert [plain(creator) for creator in compact_roster(dicts)] == dicts
@@ -0,0 +1,106 @@
+# test_roster_loader.py
+# roster_loader: NDJSON/CSV parsing, rejected rows and eval_roster_file
+import csv
+import gzip
+import json
+
+import pytest
+
+from roster_loader import load_records, validate_creator, write_ndjson
+
+
+def _plain(record):
+    return json.loads(json.dumps(record, default=lambda value: value.to_json()))
+
+
+@pytest.fixture
+def records(sim):
+    return [_plain(inf) for inf in sim.INFLUENCERS]
+
+
+def _write_csv(records, path):
+    rows = []
+    for record in records:
+        row = {key: value for key, value in record.items()
+               if not isinstance(value, (dict, list))}
+        row["topics"] = "|".join(record["topics"])
+        for field, prefix in (("aud", "aud_"), ("geo", "geo_"), ("history", "history_"),
+                              ("fraud_indicators", "fraud_")):
+            row.update({prefix + key: value for key, value in record[field].items()})
+        rows.append(row)
+    columns = sorted({column for row in rows for column in row})
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.mark.parametrize("name", ["roster.ndjson", "roster.ndjson.gz", "roster.csv"])
+def test_formats_round_trip(records, tmp_path, name):
+    path = tmp_path / name
+    if name.endswith(".csv"):
+        _write_csv(records, path)
+    else:
+        write_ndjson(records, path)
+    loaded, report = load_records(path)
+    assert report.to_dict()["rows_rejected"] == 0
+    assert [r["id"] for r in loaded] == [r["id"] for r in records]
+    assert [r["followers"] for r in loaded] == [r["followers"] for r in records]
+    assert loaded[0]["aud"] == records[0]["aud"] and loaded[0]["topics"] == records[0]["topics"]
+
+
+def test_malformed_rows_are_reported_and_skipped(records, tmp_path):
+    broken = dict(records[1], followers=-5, er=3)
+    del broken["aud"]["18-24"]
+    path = tmp_path / "roster.ndjson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write(json.dumps(records[0]) + "\n")
+        handle.write("{not json\n")
+        handle.write("\n")
+        handle.write(json.dumps(broken) + "\n")
+        handle.write(json.dumps(records[2]) + "\n")
+    loaded, report = load_records(path)
+    assert [r["id"] for r in loaded] == [records[0]["id"], records[2]["id"]]
+    summary = report.to_dict()
+    assert summary["rows_read"] == 4 and summary["rows_loaded"] == 2 and summary["rows_rejected"] == 2
+    assert summary["errors"][0]["line"] == 2 and summary["errors"][0]["errors"][0].startswith("invalid JSON")
+    assert summary["errors"][1] == {"line": 4, "errors": validate_creator(broken)}
+    assert "followers must be a non-negative integer" in summary["errors"][1]["errors"]
+    assert "aud.18-24 is missing" in summary["errors"][1]["errors"]
+
+
+def test_duplicate_ids_keep_the_first_row(records, tmp_path):
+    renamed = dict(records[0], name="Impostor")
+    path = tmp_path / "roster.ndjson"
+    write_ndjson(records + [renamed], path)
+    loaded, report = load_records(path, chunk_size=3)
+    assert len(loaded) == len(records)
+    assert [r["name"] for r in loaded if r["id"] == records[0]["id"]] == [records[0]["name"]]
+    assert report.to_dict()["errors"] == [
+        {"line": len(records) + 1, "errors": [f"duplicate id {records[0]['id']}"]}]
+
+
+def test_load_roster_file_matches_the_registry(sim, records, tmp_path):
+    path = tmp_path / "roster.ndjson"
+    write_ndjson(records + records[:2], path)
+    report = sim.load_roster_file(path)
+    assert report.error_count == 2
+    assert len(sim.INFLUENCERS) == len(sim.REGISTRY) == len(records)
+
+
+def test_use_roster_rejects_duplicate_ids(sim, records):
+    before = list(sim.INFLUENCERS)
+    with pytest.raises(ValueError, match=f"Duplicate creator id in roster: {records[3]['id']}"):
+        sim.use_roster(records + [records[3]])
+    assert sim.INFLUENCERS == before and len(sim.REGISTRY) == len(before)
+
+
+def test_eval_roster_file_matches_eval_agent(sim, synthetic_roster, tmp_path):
+    path = tmp_path / "roster.ndjson.gz"
+    write_ndjson(synthetic_roster + [{"id": "x"}], path)
+    task = sim.decompose("Skincare launch for Gen Z, budget ₹2 lakh, 4 weeks")["evaluate"]
+    streamed = sim.eval_roster_file(path, task, chunk_size=300)
+    expected = sim.eval_agent(task)
+    assert streamed["top"] == expected["top"]
+    assert streamed["total_evaluated"] == len(synthetic_roster)
+    assert streamed["load_report"]["rows_rejected"] == 1
@@ -0,0 +1,113 @@
+# test_roster_snapshot.py
+# Memory-mapped CreatorStore snapshots: round trip, checksums and staleness checks
+import os
+
+import numpy as np
+import pytest
+
+from roster_loader import write_ndjson
+from roster_snapshot import NUMERIC_COLUMNS, PREFIX, SnapshotError, open_snapshot, source_stamp, write_snapshot
+
+TASK = {"vertical": "skincare", "audience": "genz", "tier": "micro", "sustainability_focus": True, "top_k": 6}
+
+
+@pytest.fixture
+def store(sim):
+    return sim.get_creator_store()
+
+
+def test_round_trip(store, tmp_path):
+    path = tmp_path / "roster.snap"
+    write_snapshot(store, path, roster_digest="abc", extras={3: {"rate_inr": {"reel": 1.0}}})
+    mapped = open_snapshot(path, expected_digest="abc", verify=True)
+    for name in NUMERIC_COLUMNS:
+        np.testing.assert_array_equal(mapped.columns[name], store.columns[name])
+    assert list(mapped.names) == list(store.names)
+    assert list(mapped.handles) == list(store.handles)
+    assert [mapped.record(row) for row in range(len(store))] == [store.record(row) for row in range(len(store))]
+    assert mapped.header["extras"] == {"3": {"rate_inr": {"reel": 1.0}}}
+
+
+def test_stale_digest_and_source_are_rejected(store, tmp_path):
+    path = tmp_path / "roster.snap"
+    roster = tmp_path / "roster.ndjson"
+    roster.write_text("{}\n")
+    write_snapshot(store, path, roster_digest="abc", source=source_stamp(roster))
+    with pytest.raises(SnapshotError, match="stale"):
+        open_snapshot(path, expected_digest="def")
+    roster.write_text("{}\n{}\n")
+    with pytest.raises(SnapshotError, match="stale"):
+        open_snapshot(path, expected_source=source_stamp(roster))
+
+
+def test_corruption_is_detected(store, tmp_path):
+    path = tmp_path / "roster.snap"
+    write_snapshot(store, path)
+    raw = bytearray(path.read_bytes())
+
+    header_byte = bytearray(raw)
+    header_byte[PREFIX.size + 5] ^= 0xFF
+    path.write_bytes(bytes(header_byte))
+    with pytest.raises(SnapshotError, match="header checksum"):
+        open_snapshot(path)
+
+    data_byte = bytearray(raw)
+    data_byte[-100] ^= 0xFF
+    path.write_bytes(bytes(data_byte))
+    open_snapshot(path)  # data is only checksummed on request
+    with pytest.raises(SnapshotError, match="data checksum"):
+        open_snapshot(path, verify=True)
+
+    path.write_bytes(bytes(raw[:-64]))
+    with pytest.raises(SnapshotError, match="truncated"):
+        open_snapshot(path)
+    path.write_bytes(b"garbage" * 4)
+    with pytest.raises(SnapshotError, match="not a creator snapshot"):
+        open_snapshot(path)
+    with pytest.raises(SnapshotError):
+        open_snapshot(tmp_path / "missing.snap")
+
+
+def test_use_creator_snapshot_matches_roster(sim, tmp_path):
+    expected = sim.eval_agent(TASK, engine="columnar")
+    path = tmp_path / "roster.snap"
+    sim.use_creator_snapshot(path)
+    written = os.stat(path).st_mtime_ns
+    assert sim.eval_agent(TASK, engine="columnar") == expected
+    sim.use_creator_snapshot(path)
+    assert os.stat(path).st_mtime_ns == written  # fresh snapshot is reused, not rewritten
+
+
+def test_snapshot_from_roster_file_skips_parsing(synthetic_roster, sim, tmp_path, monkeypatch):
+    roster = tmp_path / "roster.ndjson"
+    write_ndjson(synthetic_roster, roster)
+    path = tmp_path / "roster.snap"
+    sim.use_creator_snapshot(path, roster_file=roster)
+    version = sim.roster_version()
+    expected = sim.eval_agent(TASK)
+
+    sim.use_roster([])
+    monkeypatch.setattr(sim, "load_roster_file", lambda path: pytest.fail("roster file was parsed"))
+    sim.use_creator_snapshot(path, roster_file=roster)
+    assert sim.roster_version() == version
+    assert sim.eval_agent(TASK, engine="columnar") == expected
+    assert sim.eval_agent(TASK) == expected
+
+
+def test_use_creator_snapshot_rebuilds_a_corrupt_snapshot(sim, tmp_path):
+    roster = list(sim.INFLUENCERS)
+    expected = sim.eval_agent(TASK, engine="columnar")
+    path = tmp_path / "roster.snap"
+    write_snapshot(sim.get_creator_store(), path, roster_digest=sim.roster_version())
+    raw = bytearray(path.read_bytes())
+    raw[-100] ^= 0xFF
+    path.write_bytes(bytes(raw))
+
+    sim.use_creator_snapshot(path)
+    open_snapshot(path, verify=True)
+    assert sim.eval_agent(TASK, engine="columnar") == expected
+
+    sim.use_roster(roster)
+    path.write_bytes(bytes(raw))
+    sim.use_creator_snapshot(path, verify=False)
+    assert path.read_bytes() == bytes(raw)  # unchecked, so installed as-is
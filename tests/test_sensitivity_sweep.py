@@ -0,0 +1,65 @@
+# test_sensitivity_sweep.py
+# sweep_forecast: agrees with predict_agent, with itself point by point, and caps spend
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from sensitivity_sweep import AXES, sweep_forecast
+
+QUERY = "Launch a sustainable beauty brand for Gen Z in May, budget ₹10 lakh, for 6 weeks"
+
+
+@pytest.fixture
+def plan(sim):
+    plan = sim.decompose(QUERY)
+    return plan, sim.eval_agent(plan["evaluate"])
+
+
+def test_task_point_matches_the_forecast(sim, plan):
+    plan, evaluation = plan
+    forecast, basis = sim.forecast_campaign(plan["predict"], evaluation)
+    sweep = sweep_forecast(plan["predict"], evaluation)
+    assert sweep["shape"] == [1] * len(AXES)
+    assert sweep["axes"]["budget_inr"] == [1_000_000] and sweep["axes"]["season"] == ["spring"]
+    assert sweep["surfaces"]["reach"].item() == pytest.approx(basis["unique_reach"])
+    assert sweep["surfaces"]["ctr"].item() == pytest.approx(forecast["forecast"]["ctr"]["p50"])
+
+
+def test_grid_matches_single_point_sweeps(plan):
+    plan, evaluation = plan
+    grid = {
+        "budget_inr": [50_000, 1_000_000],
+        "posts_per_creator": [1, 3],
+        "ctr_uplift": [0.0, 0.004],
+        "season": ["spring", "festive"],
+    }
+    sweep = sweep_forecast(plan["predict"], evaluation, grid=grid)
+    assert sweep["shape"] == [2, 2, 1, 2, 2, 1]
+    for budget, posts, uplift, season in itertools.product(*grid.values()):
+        point = sweep_forecast(plan["predict"], evaluation, grid={
+            "budget_inr": [budget], "posts_per_creator": [posts], "ctr_uplift": [uplift], "season": [season]})
+        index = (grid["budget_inr"].index(budget), grid["posts_per_creator"].index(posts), 0,
+                 grid["ctr_uplift"].index(uplift), grid["season"].index(season), 0)
+        for metric, surface in sweep["surfaces"].items():
+            assert surface[index] == pytest.approx(point["surfaces"][metric].item(), nan_ok=True)
+
+
+def test_budget_caps_spend_and_scales_reach(plan):
+    plan, evaluation = plan
+    sweep = sweep_forecast(plan["predict"], evaluation, grid={"budget_inr": [25_000, 50_000, 10_000_000]})
+    spend = sweep["surfaces"]["spend_inr"].ravel()
+    reach = sweep["surfaces"]["reach"].ravel()
+    assert spend[0] == 25_000 and spend[1] == 50_000 and spend[2] < 10_000_000
+    assert reach[1] == pytest.approx(2 * reach[0])
+    assert sweep["elasticities"]["budget_inr"]["reach"].ravel()[0] == pytest.approx(1.0)
+
+
+def test_as_lists_is_json_ready_and_axes_are_checked(plan):
+    plan, evaluation = plan
+    sweep = sweep_forecast(plan["predict"], evaluation, grid={"posts_per_creator": [0, 1]}, as_lists=True)
+    json.dumps(sweep, allow_nan=False)
+    assert np.shape(sweep["surfaces"]["reach"]) == tuple(sweep["shape"])
+    with pytest.raises(ValueError, match="Unknown sweep axes"):
+        sweep_forecast(plan["predict"], evaluation, grid={"weather": [1]})
@@ -0,0 +1,79 @@
+# test_similarity_index.py
+# SimilarityIndex: LSH candidates against an exact scan, filters and incremental edits
+import pytest
+
+from similarity_index import DEFAULT_BITS, SimilarityIndex, roster_index
+from synthetic_roster import generate_records, generate_store
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SimilarityIndex.from_store(generate_store(3000, seed=11))
+
+
+def ids(results):
+    return [r["candidate_id"] for r in results]
+
+
+def test_lsh_finds_most_of_the_exact_neighbours(index):
+    recall = []
+    for creator_id in index.ids[:40].tolist():
+        approx = index.similar(creator_id, k=10)
+        exact = index.similar(creator_id, k=10, exact=True)
+        assert len(approx) == 10 and creator_id not in ids(approx)
+        scores = [r["similarity"] for r in approx]
+        assert scores == sorted(scores, reverse=True)
+        # Candidates are re-ranked exactly, so no approximate score beats the exact one at its rank
+        assert all(a <= e for a, e in zip(scores, (r["similarity"] for r in exact)))
+        recall.append(len(set(ids(approx)) & set(ids(exact))) / 10)
+    assert sum(recall) / len(recall) >= 0.6
+
+
+def test_filters(index):
+    creator_id = int(index.ids[5])
+    followers = int(index.followers[5])
+    cheaper = index.similar(creator_id, k=10, cheaper=True)
+    assert all(r["followers"] < followers for r in cheaper)
+    capped = index.similar(creator_id, k=10, max_followers=20_000)
+    assert all(r["followers"] <= 20_000 for r in capped)
+    excluded = ids(index.similar(creator_id, k=3))
+    assert not set(excluded) & set(ids(index.similar(creator_id, k=10, exclude=excluded)))
+
+
+def test_complementary_keeps_the_niche_and_orders_by_overlap(index):
+    results = index.complementary(int(index.ids[0]), k=10, min_topic_similarity=0.3)
+    assert results and all(r["topic_similarity"] >= 0.3 for r in results)
+    overlaps = [r["overlap"] for r in results]
+    assert overlaps == sorted(overlaps)
+
+
+def test_add_replace_and_remove():
+    index = SimilarityIndex.from_store(generate_store(500, seed=3))
+    twin = dict(generate_records(500, seed=3)[10], id=10**6, name="Twin", handle="@twin")
+    index.add(twin)
+    assert 10**6 in index and len(index) == 501
+    assert ids(index.similar(10**6, k=1, exact=True)) == [int(index.ids[10])]
+    index.remove(10**6)
+    assert 10**6 not in index and len(index) == 500
+    with pytest.raises(KeyError):
+        index.similar(10**6)
+
+
+def test_bits_are_validated():
+    with pytest.raises(ValueError):
+        SimilarityIndex(bits=0)
+
+
+def test_roster_index_is_shared_per_options(synthetic_roster, sim):
+    default = roster_index()
+    assert roster_index() is default and roster_index(bits=DEFAULT_BITS) is default
+    narrow = roster_index(bits=8, tables=4)
+    assert narrow is not default and (narrow.bits, narrow.tables) == (8, 4)
+    assert roster_index(tables=4, bits=8) is narrow
+
+    twin = dict(synthetic_roster[0], id=10**6, name="Twin", handle="@twin")
+    sim.add_creator(twin)
+    assert 10**6 in default and 10**6 in narrow
+    sim.use_roster(synthetic_roster)
+    rebuilt = roster_index(bits=8, tables=4)
+    assert rebuilt is not narrow and 10**6 not in rebuilt
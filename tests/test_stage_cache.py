@@ -0,0 +1,87 @@
+# test_stage_cache.py
+# StageCache: copies, LRU and TTL eviction, tag invalidation and the SQLite tier
+import stage_cache
+from stage_cache import StageCache, cache_key
+
+
+def test_cache_key_is_order_independent():
+    assert cache_key("eval", {"a": 1, "b": 2}) == cache_key("eval", {"b": 2, "a": 1})
+    assert cache_key("eval", {"a": 1}) != cache_key("predict", {"a": 1})
+
+
+def test_values_are_copies():
+    cache = StageCache()
+    value = {"top": [1, 2]}
+    cache.put("k", value)
+    value["top"].append(3)
+    hit, cached = cache.get("k")
+    assert hit and cached == {"top": [1, 2]}
+    cached["top"].clear()
+    assert cache.get("k")[1] == {"top": [1, 2]}
+
+
+def test_lru_eviction():
+    cache = StageCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1) and cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stage_cache.time, "time", lambda: now[0])
+    cache = StageCache(ttl_s=10)
+    cache.put("k", "v")
+    now[0] += 9
+    assert cache.get("k") == (True, "v")
+    now[0] += 2
+    assert cache.get("k") == (False, None)
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_by_tag():
+    cache = StageCache()
+    cache.put("eval", 1, tags={"roster", "weights"})
+    cache.put("predict", 2, tags={"roster", "creator:5"})
+    cache.put("other", 3, tags={"benchmarks"})
+    assert cache.invalidate({"creator:5"}) == 1
+    assert cache.invalidate({"roster"}) == 1
+    assert cache.get("other") == (True, 3)
+    stats = cache.stats()
+    assert stats["invalidations"] == 2 and stats["entries"] == 1
+
+
+def test_disk_tier_is_shared_and_invalidated(tmp_path):
+    path = str(tmp_path / "cache.db")
+    StageCache(disk_path=path).put("k", {"v": 1}, tags={"roster"})
+    other = StageCache(disk_path=path)
+    assert other.get("k") == (True, {"v": 1})
+    assert other.stats()["disk_hits"] == 1
+    # Tags match whole words only
+    assert StageCache(disk_path=path).invalidate({"rost"}) == 0
+    assert StageCache(disk_path=path).invalidate({"roster"}) == 1
+    assert StageCache(disk_path=path).get("k") == (False, None)
+
+
+def _without_timings(result):
+    return {key: value for key, value in result.items() if key not in ("timestamp", "timings")}
+
+
+def test_run_reuses_stages_until_the_roster_changes(sim):
+    query = "Skincare launch for Gen Z, budget ₹2 lakh, 4 weeks"
+    cache = StageCache()
+    first = sim.run(query, cache=cache, verbose=False)
+    misses = cache.stats()["misses"]
+    assert _without_timings(sim.run(query, cache=cache, verbose=False)) == _without_timings(first)
+    assert cache.stats()["misses"] == misses and cache.stats()["hits"] > 0
+
+    sim.STAGE_CACHE = cache
+    record = dict(sim.REGISTRY.get(first["evaluation"]["top"][0]["candidate_id"]))
+    sim.remove_creator(record["id"])
+    rerun = sim.run(query, cache=cache, verbose=False)
+    assert record["id"] not in [c["candidate_id"] for c in rerun["evaluation"]["top"]]
+    assert _without_timings(rerun) == _without_timings(sim.run(query, verbose=False))
@@ -0,0 +1,62 @@
+# test_streaming.py
+# run(on_event=...): event order and payloads, NDJSON output and streamed worker frames
+import io
+import json
+
+from marketmuse_worker import HEADER, read_frame, serve
+from stage_cache import StageCache
+
+QUERY = "Sustainable skincare for Gen Z, budget ₹2 lakh, 4 weeks"
+ORDER = ["plan", "creators", "overlap", "forecast", "recommendations", "summary"]
+
+
+def _collect(sim, **kwargs):
+    events = []
+    result = sim.run(QUERY, verbose=False, on_event=events.append, **kwargs)
+    return events, result
+
+
+def _without_timings(events):
+    return [{key: value for key, value in event.items() if key != "timings"} for event in events]
+
+
+def test_events_arrive_in_pipeline_order(sim):
+    events, result = _collect(sim)
+    assert [event["event"] for event in events] == ORDER
+    by_name = {event["event"]: event for event in events}
+    assert by_name["plan"]["plan"] == sim.decompose(QUERY)
+    assert by_name["creators"]["top"] == result["evaluation"]["top"]
+    assert by_name["overlap"]["overlap_matrix"] == result["evaluation"]["overlap_matrix"]
+    assert by_name["forecast"]["prediction"] == result["prediction"]
+    assert by_name["recommendations"]["optimization"] == result["optimization"]
+    assert by_name["summary"]["summary"] == result["summary"]
+    assert by_name["summary"]["timings"] == result["timings"]
+    json.dumps(events)
+
+
+def test_cached_run_streams_the_same_events(sim):
+    cache = StageCache()
+    first, _ = _collect(sim, cache=cache)
+    again, _ = _collect(sim, cache=cache)
+    assert cache.stats()["hits"] > 0
+    assert _without_timings(again) == _without_timings(first)
+
+
+def test_ndjson_events_writes_one_line_per_event(sim):
+    stream = io.StringIO()
+    sim.run(QUERY, verbose=False, on_event=sim.ndjson_events(stream))
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ORDER
+
+
+def test_worker_streams_event_frames_before_the_reply():
+    body = json.dumps({"id": 7, "op": "analyze", "query": QUERY, "stream": True}).encode("utf-8")
+    out = io.BytesIO()
+    serve(io.BytesIO(HEADER.pack(len(body)) + body), out)
+    out.seek(0)
+    frames = []
+    while (message := read_frame(out)) is not None:
+        frames.append(message)
+    assert [frame["event"]["event"] for frame in frames[:-1]] == ORDER
+    assert all(frame["id"] == 7 for frame in frames)
+    assert frames[-1]["ok"] is True and frames[-1]["result"]["summary"] == frames[-2]["event"]["summary"]
@@ -0,0 +1,49 @@
+# test_top_k.py
+# Bounded top-K selection must equal a full stable sort, ties included
+import pytest
+
+from records import plain
+
+
+def full_sort(sim, task):
+    """Reference ranking: score everyone, stable sort on the rounded composite"""
+    scored = [(inf, sim.score_creator(inf, task)) for inf in sim.tier_candidates(task.get("tier"))]
+    scored.sort(key=lambda pair: -round(pair[1]["composite"], 2))
+    return [inf["id"] for inf, _ in scored[:task["top_k"]]]
+
+
+@pytest.fixture
+def tied_roster(sim):
+    """Every creator appears four times under new ids, so each score is a four-way tie"""
+    records = []
+    for copy_number in range(4):
+        for inf in sim.INFLUENCERS:
+            records.append(dict(inf, id=inf["id"] + 1000 * copy_number))
+    sim.use_roster(records)
+    return records
+
+
+@pytest.mark.parametrize("top_k", [1, 3, 5, 6, 13, 40, 100])
+@pytest.mark.parametrize("engine", ["python", "columnar"])
+def test_ties_keep_roster_order(tied_roster, sim, engine, top_k):
+    task = {"vertical": "skincare", "audience": "genz", "tier": "mixed", "sustainability_focus": True,
+            "top_k": top_k}
+    ranking = sim.rank_creators(task, engine=engine)
+    assert [r["candidate_id"] for r in ranking["top"]] == full_sort(sim, task)
+    assert ranking["total_evaluated"] == len(tied_roster)
+
+
+def test_top_k_rows_partial_sort():
+    import numpy as np
+    from marketmuse_sim import _top_k_rows
+
+    scores = np.array([5.0, 7.0, 7.0, 1.0, 7.0, 5.0])
+    assert _top_k_rows(scores, 2).tolist() == [1, 2]
+    assert _top_k_rows(scores, 4).tolist() == [1, 2, 4, 0]
+    assert _top_k_rows(scores, 10).tolist() == [1, 2, 4, 0, 5, 3]
+
+
+def test_top_k_must_be_positive(sim):
+    with pytest.raises(ValueError):
+        sim.rank_creators({"vertical": "skincare", "audience": "genz", "top_k": 0})
+    assert plain(sim.eval_agent({"vertical": "skincare", "audience": "genz", "top_k": 1}))["top"]
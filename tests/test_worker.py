@@ -0,0 +1,69 @@
+# test_worker.py
+# Length-prefixed JSON framing and the serve() loop of the resident worker
+import io
+import json
+
+import pytest
+
+import marketmuse_worker
+from marketmuse_worker import HEADER, FrameError, read_frame, serve, write_frame
+
+
+def frame(body):
+    raw = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    return HEADER.pack(len(raw)) + raw
+
+
+def replies(data):
+    stream = io.BytesIO(data)
+    out = []
+    while True:
+        message = read_frame(stream)
+        if message is None:
+            return out
+        out.append(message)
+
+
+def test_frames_round_trip():
+    buffer = io.BytesIO()
+    write_frame(buffer, {"id": 1, "op": "ping"})
+    write_frame(buffer, {"id": 2, "query": "₹5 lakh"})
+    assert replies(buffer.getvalue()) == [{"id": 1, "op": "ping"}, {"id": 2, "query": "₹5 lakh"}]
+
+
+def test_clean_eof_returns_none():
+    assert read_frame(io.BytesIO(b"")) is None
+
+
+def test_eof_mid_frame_raises():
+    with pytest.raises(EOFError):
+        read_frame(io.BytesIO(frame({"id": 1})[:-2]))
+    with pytest.raises(EOFError):
+        read_frame(io.BytesIO(b"\x00\x00"))
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"[1, 2]", b"\xff\xfe"])
+def test_undecodable_frame_leaves_stream_at_next_frame(body):
+    stream = io.BytesIO(frame(body) + frame({"id": 2}))
+    with pytest.raises(FrameError):
+        read_frame(stream)
+    assert read_frame(stream) == {"id": 2}
+
+
+def test_oversized_frame_is_skipped(monkeypatch):
+    monkeypatch.setattr(marketmuse_worker, "MAX_FRAME_BYTES", 16)
+    monkeypatch.setattr(marketmuse_worker, "DISCARD_CHUNK_BYTES", 5)
+    stream = io.BytesIO(frame({"id": 1, "query": "x" * 64}) + frame({"id": 2}))
+    with pytest.raises(FrameError, match="exceeds"):
+        read_frame(stream)
+    assert read_frame(stream) == {"id": 2}
+
+
+def test_serve_replies_to_bad_frames_and_keeps_going():
+    requests = frame(b"{oops") + frame({"id": 1, "op": "ping"}) + frame({"id": 2, "op": "nope"})
+    out = io.BytesIO()
+    serve(io.BytesIO(requests), out)
+    bad, ping, unknown = replies(out.getvalue())
+    assert bad["id"] is None and bad["ok"] is False
+    assert ping["id"] == 1 and ping["ok"] is True and "pid" in ping["result"]
+    assert unknown == {"id": 2, "ok": False, "error": "Unknown op: nope"}